@@ -194,175 +194,342 @@ __all__ = [  # noqa: RUF022 `__all__` is not sorted
 # just skip it for this file.
 # isort:skip_file
 
-# Import pebble explicitly. It's the one module we don't import names from below.
-from . import pebble
-
-# Also import charm explicitly. This is not strictly necessary as the
-# "from .charm" import automatically does that, but be explicit since this
-# import was here previously
-from . import charm
-
-from . import _main
-from . import main as _legacy_main
-
-# Explicitly import names from submodules so users can just "import ops" and
-# then use them as "ops.X".
-from .charm import (
-    ActionEvent,
-    ActionMeta,
-    CharmBase,
-    CharmEvents,
-    CharmMeta,
-    CollectMetricsEvent,
-    CollectStatusEvent,
-    ConfigChangedEvent,
-    ConfigMeta,
-    ContainerBase,
-    ContainerMeta,
-    ContainerStorageMeta,
-    HookEvent,
-    InstallEvent,
-    JujuAssumes,
-    JujuAssumesCondition,
-    LeaderElectedEvent,
-    LeaderSettingsChangedEvent,
-    MetadataLinks,
-    PayloadMeta,
-    PebbleCheckEvent,
-    PebbleCheckFailedEvent,
-    PebbleCheckRecoveredEvent,
-    PebbleCustomNoticeEvent,
-    PebbleNoticeEvent,
-    PebbleReadyEvent,
-    PostSeriesUpgradeEvent,
-    PreSeriesUpgradeEvent,
-    RelationBrokenEvent,
-    RelationChangedEvent,
-    RelationCreatedEvent,
-    RelationDepartedEvent,
-    RelationEvent,
-    RelationJoinedEvent,
-    RelationMeta,
-    RelationRole,
-    RemoveEvent,
-    ResourceMeta,
-    SecretChangedEvent,
-    SecretEvent,
-    SecretExpiredEvent,
-    SecretRemoveEvent,
-    SecretRotateEvent,
-    StartEvent,
-    StopEvent,
-    StorageAttachedEvent,
-    StorageDetachingEvent,
-    StorageEvent,
-    StorageMeta,
-    UpdateStatusEvent,
-    UpgradeCharmEvent,
-    WorkloadEvent,
-)
-
-from .framework import (
-    BoundEvent,
-    BoundStoredState,
-    CommitEvent,
-    EventBase,
-    EventSource,
-    Framework,
-    FrameworkEvents,
-    Handle,
-    HandleKind,
-    LifecycleEvent,
-    NoTypeError,
-    Object,
-    ObjectEvents,
-    PreCommitEvent,
-    PrefixedEvents,
-    Serializable,
-    StoredDict,
-    StoredList,
-    StoredSet,
-    StoredState,
-    StoredStateData,
-)
-
-from .hookcmds import StatusName
-from .jujucontext import JujuContext
-from .jujuversion import JujuVersion
-
-from .model import (
-    ActiveStatus,
-    Application,
-    Binding,
-    BindingMapping,
-    BlockedStatus,
-    CheckInfoMapping,
-    CloudCredential,
-    CloudSpec,
-    ConfigData,
-    Container,
-    ContainerMapping,
-    ErrorStatus,
-    InvalidStatusError,
-    LazyCheckInfo,
-    LazyMapping,
-    LazyNotice,
-    MaintenanceStatus,
-    Model,
-    ModelError,
-    MultiPushPullError,
-    Network,
-    NetworkInterface,
-    OpenedPort,
-    Pod,
-    Port,
-    Relation,
-    RelationData,
-    RelationDataAccessError,
-    RelationDataContent,
-    RelationDataError,
-    RelationDataTypeError,
-    RelationMapping,
-    RelationNotFoundError,
-    RemoteModel,
-    Resources,
-    Secret,
-    SecretInfo,
-    SecretNotFoundError,
-    SecretRotate,
-    ServiceInfoMapping,
-    StatusBase,
-    Storage,
-    StorageMapping,
-    TooManyRelatedAppsError,
-    Unit,
-    UnknownStatus,
-    WaitingStatus,
-)
+import importlib
+from typing import TYPE_CHECKING, Any
 
-# NOTE: don't import testing or Harness here, as that's a test-time concern
-# rather than a runtime concern.
+# Import the legacy ops.main module before "main" is defined below: importing a
+# submodule sets it as an attribute of the package, which would otherwise
+# replace the ops.main() entry point. The module itself is cheap to import.
+from .main import _Main
 
 from .version import version as __version__
 
-try:
-    # Note that ops_tracing vendors charm libs that depend on ops.
-    # We import it last, after all re-exported symbols.
-    import ops_tracing as tracing
-except ImportError:
-    tracing = None
-
+# Most names are imported from their submodules on first use (see __getattr__
+# below), so that "import ops" doesn't import everything that ops can do, for
+# example Pebble and tracing for a machine charm. Type checkers see the imports
+# here instead, so users can still just "import ops" and then use "ops.X".
+if TYPE_CHECKING:
+    from . import pebble
+
+    # Also import charm explicitly. This is not strictly necessary as the
+    # "from .charm" import automatically does that, but be explicit since this
+    # import was here previously
+    from . import charm  # noqa: F401
+
+    from .charm import (
+        ActionEvent,
+        ActionMeta,
+        CharmBase,
+        CharmEvents,
+        CharmMeta,
+        CollectMetricsEvent,
+        CollectStatusEvent,
+        ConfigChangedEvent,
+        ConfigMeta,
+        ContainerBase,
+        ContainerMeta,
+        ContainerStorageMeta,
+        HookEvent,
+        InstallEvent,
+        JujuAssumes,
+        JujuAssumesCondition,
+        LeaderElectedEvent,
+        LeaderSettingsChangedEvent,
+        MetadataLinks,
+        PayloadMeta,
+        PebbleCheckEvent,
+        PebbleCheckFailedEvent,
+        PebbleCheckRecoveredEvent,
+        PebbleCustomNoticeEvent,
+        PebbleNoticeEvent,
+        PebbleReadyEvent,
+        PostSeriesUpgradeEvent,
+        PreSeriesUpgradeEvent,
+        RelationBrokenEvent,
+        RelationChangedEvent,
+        RelationCreatedEvent,
+        RelationDepartedEvent,
+        RelationEvent,
+        RelationJoinedEvent,
+        RelationMeta,
+        RelationRole,
+        RemoveEvent,
+        ResourceMeta,
+        SecretChangedEvent,
+        SecretEvent,
+        SecretExpiredEvent,
+        SecretRemoveEvent,
+        SecretRotateEvent,
+        StartEvent,
+        StopEvent,
+        StorageAttachedEvent,
+        StorageDetachingEvent,
+        StorageEvent,
+        StorageMeta,
+        UpdateStatusEvent,
+        UpgradeCharmEvent,
+        WorkloadEvent,
+    )
+
+    from .framework import (
+        BoundEvent,
+        BoundStoredState,
+        CommitEvent,
+        EventBase,
+        EventSource,
+        Framework,
+        FrameworkEvents,
+        Handle,
+        HandleKind,
+        LifecycleEvent,
+        NoTypeError,
+        Object,
+        ObjectEvents,
+        PreCommitEvent,
+        PrefixedEvents,
+        Serializable,
+        StoredDict,
+        StoredList,
+        StoredSet,
+        StoredState,
+        StoredStateData,
+    )
+
+    from .hookcmds import StatusName
+    from .jujucontext import JujuContext
+    from .jujuversion import JujuVersion
+
+    from .model import (
+        ActiveStatus,
+        Application,
+        Binding,
+        BindingMapping,
+        BlockedStatus,
+        CheckInfoMapping,
+        CloudCredential,
+        CloudSpec,
+        ConfigData,
+        Container,
+        ContainerMapping,
+        ErrorStatus,
+        InvalidStatusError,
+        LazyCheckInfo,
+        LazyMapping,
+        LazyNotice,
+        MaintenanceStatus,
+        Model,
+        ModelError,
+        MultiPushPullError,
+        Network,
+        NetworkInterface,
+        OpenedPort,
+        Pod,
+        Port,
+        Relation,
+        RelationData,
+        RelationDataAccessError,
+        RelationDataContent,
+        RelationDataError,
+        RelationDataTypeError,
+        RelationMapping,
+        RelationNotFoundError,
+        RemoteModel,
+        Resources,
+        Secret,
+        SecretInfo,
+        SecretNotFoundError,
+        SecretRotate,
+        ServiceInfoMapping,
+        StatusBase,
+        Storage,
+        StorageMapping,
+        TooManyRelatedAppsError,
+        Unit,
+        UnknownStatus,
+        WaitingStatus,
+    )
+
+    try:
+        import ops_tracing as tracing
+    except ImportError:
+        tracing = None
 
-class _Main:
-    def __call__(
-        self, charm_class: type[charm.CharmBase], use_juju_for_storage: bool | None = None
-    ):
-        return _main.main(charm_class=charm_class, use_juju_for_storage=use_juju_for_storage)
+# NOTE: don't import testing or Harness here, as that's a test-time concern
+# rather than a runtime concern.
 
-    def main(self, charm_class: type[charm.CharmBase], use_juju_for_storage: bool | None = None):
-        return _legacy_main.main(
-            charm_class=charm_class, use_juju_for_storage=use_juju_for_storage
-        )
+# The public names that are imported lazily, by the submodule they're from.
+_submodule_names: dict[str, tuple[str, ...]] = {
+    'charm': (
+        'ActionEvent',
+        'ActionMeta',
+        'CharmBase',
+        'CharmEvents',
+        'CharmMeta',
+        'CollectMetricsEvent',
+        'CollectStatusEvent',
+        'ConfigChangedEvent',
+        'ConfigMeta',
+        'ContainerBase',
+        'ContainerMeta',
+        'ContainerStorageMeta',
+        'HookEvent',
+        'InstallEvent',
+        'JujuAssumes',
+        'JujuAssumesCondition',
+        'LeaderElectedEvent',
+        'LeaderSettingsChangedEvent',
+        'MetadataLinks',
+        'PayloadMeta',
+        'PebbleCheckEvent',
+        'PebbleCheckFailedEvent',
+        'PebbleCheckRecoveredEvent',
+        'PebbleCustomNoticeEvent',
+        'PebbleNoticeEvent',
+        'PebbleReadyEvent',
+        'PostSeriesUpgradeEvent',
+        'PreSeriesUpgradeEvent',
+        'RelationBrokenEvent',
+        'RelationChangedEvent',
+        'RelationCreatedEvent',
+        'RelationDepartedEvent',
+        'RelationEvent',
+        'RelationJoinedEvent',
+        'RelationMeta',
+        'RelationRole',
+        'RemoveEvent',
+        'ResourceMeta',
+        'SecretChangedEvent',
+        'SecretEvent',
+        'SecretExpiredEvent',
+        'SecretRemoveEvent',
+        'SecretRotateEvent',
+        'StartEvent',
+        'StopEvent',
+        'StorageAttachedEvent',
+        'StorageDetachingEvent',
+        'StorageEvent',
+        'StorageMeta',
+        'UpdateStatusEvent',
+        'UpgradeCharmEvent',
+        'WorkloadEvent',
+    ),
+    'framework': (
+        'BoundEvent',
+        'BoundStoredState',
+        'CommitEvent',
+        'EventBase',
+        'EventSource',
+        'Framework',
+        'FrameworkEvents',
+        'Handle',
+        'HandleKind',
+        'LifecycleEvent',
+        'NoTypeError',
+        'Object',
+        'ObjectEvents',
+        'PreCommitEvent',
+        'PrefixedEvents',
+        'Serializable',
+        'StoredDict',
+        'StoredList',
+        'StoredSet',
+        'StoredState',
+        'StoredStateData',
+    ),
+    'hookcmds': ('StatusName',),
+    'jujucontext': ('JujuContext',),
+    'jujuversion': ('JujuVersion',),
+    'model': (
+        'ActiveStatus',
+        'Application',
+        'Binding',
+        'BindingMapping',
+        'BlockedStatus',
+        'CheckInfoMapping',
+        'CloudCredential',
+        'CloudSpec',
+        'ConfigData',
+        'Container',
+        'ContainerMapping',
+        'ErrorStatus',
+        'InvalidStatusError',
+        'LazyCheckInfo',
+        'LazyMapping',
+        'LazyNotice',
+        'MaintenanceStatus',
+        'Model',
+        'ModelError',
+        'MultiPushPullError',
+        'Network',
+        'NetworkInterface',
+        'OpenedPort',
+        'Pod',
+        'Port',
+        'Relation',
+        'RelationData',
+        'RelationDataAccessError',
+        'RelationDataContent',
+        'RelationDataError',
+        'RelationDataTypeError',
+        'RelationMapping',
+        'RelationNotFoundError',
+        'RemoteModel',
+        'Resources',
+        'Secret',
+        'SecretInfo',
+        'SecretNotFoundError',
+        'SecretRotate',
+        'ServiceInfoMapping',
+        'StatusBase',
+        'Storage',
+        'StorageMapping',
+        'TooManyRelatedAppsError',
+        'Unit',
+        'UnknownStatus',
+        'WaitingStatus',
+    ),
+}
+_lazy_names = {name: module for module, names in _submodule_names.items() for name in names}
+
+# The submodules that "import ops" has always imported, so that code can use
+# them as "ops.X" without importing them itself.
+_lazy_submodules = frozenset({
+    '_main',
+    '_private',
+    'charm',
+    'framework',
+    'hookcmds',
+    'jujucontext',
+    'jujuversion',
+    'log',
+    'model',
+    'pebble',
+    'storage',
+})
+
+if not TYPE_CHECKING:
+    # Only defined at runtime, so that type checkers still report unknown names.
+
+    def __getattr__(name: str) -> Any:
+        if name in _lazy_names:
+            module = importlib.import_module(f'.{_lazy_names[name]}', __name__)
+            value = getattr(module, name)
+        elif name in _lazy_submodules:
+            value = importlib.import_module(f'.{name}', __name__)
+        elif name == 'tracing':
+            try:
+                # Note that ops_tracing vendors charm libs that depend on ops,
+                # which will import the names that they use from here.
+                import ops_tracing as value
+            except ImportError:
+                value = None
+        else:
+            raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+        globals()[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted({*globals(), *__all__, *_lazy_submodules})
 
 
 main = _Main()
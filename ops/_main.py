@@ -16,6 +16,8 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import os
 import shutil
@@ -31,13 +33,20 @@ from . import charm as _charm
 from . import framework as _framework
 from . import model as _model
 from . import storage as _storage
-from ._private import tracer
+from ._private import tracer, yaml
 from .jujucontext import JujuContext
 from .log import setup_root_logging
 from .version import version
 
 CHARM_STATE_FILE = '.unit-state.db'
 
+# Parsed charm metadata, stored next to the CHARM_STATE_FILE.
+_CHARM_META_CACHE_FILE = '.unit-meta-cache.json'
+
+# Storage key for the unit status recorded at the end of a successful dispatch.
+# This is not a handle path, as it's not framework-managed state.
+_UNIT_STATUS_KEY = '#unit-status#'
+
 logger = logging.getLogger()
 
 
@@ -244,6 +253,54 @@ def _should_use_controller_storage(
         return False
 
 
+def _load_charm_meta(charm_root: Path, cache_path: Path) -> _charm.CharmMeta:
+    """Load the charm's metadata, using the cache at cache_path if it's up to date.
+
+    The YAML files only change when the charm is upgraded, and parsing them is a
+    noticeable part of every dispatch for charms with many actions and config
+    options, so the parsed data is saved as JSON, keyed by hashes of the files.
+    """
+    # metadata.yaml is required, but actions.yaml and config.yaml are optional.
+    contents: dict[str, str | None] = {'metadata.yaml': (charm_root / 'metadata.yaml').read_text()}
+    for filename in ('actions.yaml', 'config.yaml'):
+        path = charm_root / filename
+        contents[filename] = path.read_text() if path.exists() else None
+    key = {
+        filename: None if text is None else hashlib.sha256(text.encode()).hexdigest()
+        for filename, text in contents.items()
+    }
+
+    try:
+        cache = json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        cache = None
+    if isinstance(cache, dict) and cache.get('key') == key:
+        return _charm.CharmMeta(cache['metadata'], cache['actions'], cache['config'])
+
+    parsed = {
+        filename: None if text is None else yaml.safe_load(text)
+        for filename, text in contents.items()
+    }
+    cache = {
+        'key': key,
+        'metadata': parsed['metadata.yaml'],
+        'actions': parsed['actions.yaml'],
+        'config': parsed['config.yaml'],
+    }
+    try:
+        data = json.dumps(cache)
+        # YAML has types that JSON doesn't, such as dates and non-string keys,
+        # which wouldn't load back the same, so only cache plain data.
+        if json.loads(data) != cache:
+            raise ValueError('metadata is not JSON-compatible')
+        tmp_path = cache_path.with_name(f'{cache_path.name}.tmp')
+        tmp_path.write_text(data)
+        tmp_path.replace(cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug('Not caching charm metadata: %s', e)
+    return _charm.CharmMeta(cache['metadata'], cache['actions'], cache['config'])
+
+
 class _Abort(Exception):  # noqa: N818
     """Raised when something happens that should interrupt ops execution."""
 
@@ -293,10 +350,6 @@ class _Manager:
             name = str(charm_class)
 
         self._juju_context = juju_context
-        if tracing:
-            tracing._setup(juju_context, name)
-        self._tracing_context = tracer.start_as_current_span('ops.main')
-        self._tracing_context.__enter__()
         self._charm_state_path = charm_state_path
         self._charm_class = charm_class
         if model_backend is None:
@@ -308,6 +361,14 @@ class _Manager:
 
         self._charm_root = self._juju_context.charm_dir
         self._charm_meta = self._load_charm_meta()
+        # Tracing uses the charm name from the metadata, so that it doesn't
+        # need to load the metadata again. This means that the ops.main span
+        # doesn't cover setting up logging or loading the metadata: the tracer
+        # provider can only be created once the charm name is known.
+        if tracing:
+            tracing._setup(juju_context, name, self._charm_meta)
+        self._tracing_context = tracer.start_as_current_span('ops.main')
+        self._tracing_context.__enter__()
         self._use_juju_for_storage = use_juju_for_storage
 
         # Set up dispatcher, framework and charm objects.
@@ -326,7 +387,8 @@ class _Manager:
             raise
 
     def _load_charm_meta(self):
-        return _charm.CharmMeta.from_charm_root(self._charm_root)
+        cache_path = (self._charm_root / self._charm_state_path).parent / _CHARM_META_CACHE_FILE
+        return _load_charm_meta(self._charm_root, cache_path)
 
     def _setup_root_logging(self):
         # For actions, there is a communication channel with the user running the
@@ -407,6 +469,7 @@ class _Manager:
             remote_unit_name=remote_unit_name,
         )
         store = self._make_storage(dispatcher)
+        self._restore_unit_status(store, model)
         framework = self._framework_class(
             store,
             self._charm_root,
@@ -423,6 +486,30 @@ class _Manager:
         self._saved_breakpointhook = framework.set_breakpointhook()
         return framework
 
+    def _restore_unit_status(
+        self, store: _storage.SQLiteStorage | _storage.JujuStorage, model: _model.Model
+    ):
+        """Tell the model which unit status the previous dispatch left in place.
+
+        This lets the unit skip status-set if it sets the same status again,
+        which is common in update-status with collect-status.
+        """
+        # Controller storage costs a hook command per read, which is no cheaper
+        # than the status-set it would save.
+        if not isinstance(store, _storage.SQLiteStorage):
+            return
+        try:
+            name, message = store.load_snapshot(_UNIT_STATUS_KEY)
+        except _storage.NoSnapshotError:
+            return
+        # The status is set immediately, but the state is only committed if the
+        # dispatch succeeds, so a failed dispatch may have changed the status
+        # without the record being updated. Drop the record now, so that it's
+        # only present if the previous dispatch was successful.
+        store.drop_snapshot(_UNIT_STATUS_KEY)
+        store.commit()
+        model.unit._last_status = _model.StatusBase.from_name(name, message)
+
     def _emit(self):
         """Emit the event on the charm."""
         # TODO: Remove the collect_metrics check below as soon as the relevant
@@ -484,6 +571,9 @@ class _Manager:
 
     def _commit(self):
         """Commit the framework and gracefully teardown."""
+        status = self.framework.model.unit._last_status
+        if status is not None and isinstance(self.framework._storage, _storage.SQLiteStorage):
+            self.framework._storage.save_snapshot(_UNIT_STATUS_KEY, [status.name, status.message])
         self.framework.commit()
 
     def _close(self):
@@ -496,6 +586,7 @@ class _Manager:
 
         if self._saved_breakpointhook is not None:
             sys.breakpointhook = self._saved_breakpointhook
+        _model._close_pebble_clients()
         self._tracing_context.__exit__(*sys.exc_info())
         if tracing:
             tracing._shutdown()
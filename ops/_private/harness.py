@@ -33,7 +33,7 @@ import tempfile
 import typing
 import uuid
 import warnings
-from collections.abc import Callable, Iterable, Mapping, Sequence
+from collections.abc import Callable, Generator, Iterable, Mapping, Sequence
 from contextlib import contextmanager
 from io import BytesIO, IOBase, StringIO
 from textwrap import dedent
@@ -3134,6 +3134,29 @@ class _TestingExecProcess:
             )
         return cast('AnyStr', out_value), cast('AnyStr | None', err_value)
 
+    def iter_chunks(self, size: int = 64 * 1024) -> Generator[AnyStr, None, None]:
+        if self.stdout is None:
+            raise TypeError(
+                "can't use iter_chunks() when exec was called with the stdout argument; "
+                'use wait() instead'
+            )
+        if self._is_timeout:
+            raise pebble.TimeoutError(f'timed out waiting for change ({self._timeout} seconds)')
+        while chunk := self.stdout.read(size):
+            yield cast('AnyStr', chunk)
+        if self._exit_code != 0:
+            err_value = self.stderr.read() if self.stderr is not None else None
+            raise pebble.ExecError[AnyStr](
+                self._command,
+                cast('int', self._exit_code),
+                None,
+                cast('AnyStr | None', err_value),
+            )
+
+    def iter_lines(self) -> Generator[AnyStr, None, None]:
+        newline = '\n' if isinstance(self.stdout, io.TextIOBase) else b'\n'
+        yield from pebble._split_lines(self.iter_chunks(), cast('AnyStr', newline))
+
     def send_signal(self, sig: int | str):
         # the process is always terminated when ExecProcess is return in the simulation.
         raise BrokenPipeError('[Errno 32] Broken pipe')
@@ -3162,6 +3185,9 @@ class _TestingPebbleClient:
         self._last_notice_id = 0
         self._changes: dict[str, pebble.Change] = {}
         self._check_infos: dict[str, pebble.CheckInfo] = {}
+        # Set by Scenario from Container.logs. Harness has no way to add log
+        # entries, so with Harness, get_logs() always returns no entries.
+        self._logs: list[pebble.LogEntry] = []
 
     def _handle_exec(self, command_prefix: Sequence[str], handler: ExecHandler):
         prefix = tuple(command_prefix)
@@ -3179,6 +3205,9 @@ class _TestingPebbleClient:
         self._check_connection()
         return pebble.SystemInfo(version='1.0.0')
 
+    def close(self):
+        pass
+
     def get_warnings(
         self,
         select: pebble.WarningState = pebble.WarningState.PENDING,
@@ -3206,8 +3235,13 @@ class _TestingPebbleClient:
     def abort_change(self, change_id: pebble.ChangeID) -> pebble.Change:
         raise NotImplementedError
 
-    def autostart_services(self, timeout: float = 30.0, delay: float = 0.1):
+    def autostart_services(self, timeout: float = 30.0, delay: float = 0.1) -> pebble.ChangeID:
         self._check_connection()
+        services = self._autostart()
+        return self._new_service_change(pebble.ChangeKind.AUTOSTART, services).id
+
+    def _autostart(self) -> list[str]:
+        started: list[str] = []
         for name, service in self._render_services().items():
             # TODO: jam 2021-04-20 This feels awkward that Service.startup might be a string or
             #  might be an enum. Probably should make Service.startup a property rather than an
@@ -3218,6 +3252,8 @@ class _TestingPebbleClient:
                 startup = pebble.ServiceStartup(service.startup)
             if startup == pebble.ServiceStartup.ENABLED:
                 self._service_status[name] = pebble.ServiceStatus.ACTIVE
+                started.append(name)
+        return started
 
     def _new_perform_check(self, info: pebble.CheckInfo) -> pebble.Change:
         now = datetime.datetime.now()
@@ -3238,7 +3274,7 @@ class _TestingPebbleClient:
         self._changes[change.id] = change
         return change
 
-    def replan_services(self, timeout: float = 30.0, delay: float = 0.1):
+    def replan_services(self, timeout: float = 30.0, delay: float = 0.1) -> pebble.ChangeID:
         for name, check in self._render_checks().items():
             if check.startup == pebble.CheckStartup.DISABLED:
                 continue
@@ -3258,7 +3294,9 @@ class _TestingPebbleClient:
                 self._check_infos[name] = info
             if not info.change_id:
                 self._new_perform_check(info)
-        return self.autostart_services(timeout, delay)
+        self._check_connection()
+        services = self._autostart()
+        return self._new_service_change(pebble.ChangeKind.REPLAN, services).id
 
     def _new_service_change(self, kind: pebble.ChangeKind, services: list[str]) -> pebble.Change:
         now = datetime.datetime.now()
@@ -3268,11 +3306,18 @@ class _TestingPebbleClient:
             action = 'Stop'
         elif kind == pebble.ChangeKind.RESTART:
             action = 'Restart'
+        elif kind == pebble.ChangeKind.AUTOSTART:
+            action = 'Autostart'
+        elif kind == pebble.ChangeKind.REPLAN:
+            action = 'Replan'
         else:
             raise ValueError(f'unknown kind {kind}')
-        summary = f'{action} service {services[0]}'
-        if len(services) > 1:
-            summary += f' and {len(services) - 1} more'
+        if services:
+            summary = f'{action} service {services[0]}'
+            if len(services) > 1:
+                summary += f' and {len(services) - 1} more'
+        else:
+            summary = f'{action} - no services'
         change = pebble.Change(
             pebble.ChangeID(str(uuid.uuid4())),
             kind.value,
@@ -3363,7 +3408,8 @@ class _TestingPebbleClient:
         timeout: float = 30.0,
         delay: float = 0.1,
     ) -> pebble.Change:
-        raise NotImplementedError
+        # Changes are made immediately, so there's never anything to wait for.
+        return self.get_change(change_id)
 
     def _update_check_infos_from_plan(self):
         # In testing, the check info has the level, threshold, and startup
@@ -3592,6 +3638,25 @@ class _TestingPebbleClient:
                 'generic-file-error', f'can only read a regular file: "{path}"'
             ) from None
 
+    def pull_many(
+        self, paths: Iterable[str | pathlib.PurePath], *, encoding: str | None = 'utf-8'
+    ) -> dict[str, BinaryIO | TextIO]:
+        files: dict[str, BinaryIO | TextIO] = {}
+        try:
+            for path in paths:
+                path = str(path)
+                if path not in files:
+                    files[path] = self.pull(path, encoding=encoding)
+        except BaseException:
+            for file in files.values():
+                file.close()
+            raise
+        return files
+
+    def pull_to(self, path: str | pathlib.PurePath, local_path: str | os.PathLike[str]):
+        with self.pull(path, encoding=None) as src, open(local_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
     def push(
         self,
         path: str | pathlib.PurePath,
@@ -3646,6 +3711,41 @@ class _TestingPebbleClient:
                 'generic-file-error', f'open {path}.~: not a directory'
             ) from None
 
+    def push_many(
+        self,
+        files: Mapping[str | pathlib.PurePath, ReadableBuffer | pebble.PushSource],
+        *,
+        encoding: str = 'utf-8',
+        make_dirs: bool = False,
+        permissions: int | None = None,
+        user_id: int | None = None,
+        user: str | None = None,
+        group_id: int | None = None,
+        group: str | None = None,
+    ) -> None:
+        # Like Pebble, write all the files that can be written, then report
+        # the first error.
+        first_error: pebble.PathError | None = None
+        for path, source in files.items():
+            own = source if isinstance(source, pebble.PushSource) else pebble.PushSource(source)
+            try:
+                self.push(
+                    path,
+                    typing.cast('ReadableBuffer', own.source),
+                    encoding=encoding,
+                    make_dirs=make_dirs,
+                    permissions=permissions if own.permissions is None else own.permissions,
+                    user_id=user_id if own.user_id is None else own.user_id,
+                    user=user if own.user is None else own.user,
+                    group_id=group_id if own.group_id is None else own.group_id,
+                    group=group if own.group is None else own.group,
+                )
+            except pebble.PathError as e:
+                if first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+
     def list_files(
         self, path: str | pathlib.PurePath, *, pattern: str | None = None, itself: bool = False
     ) -> list[pebble.FileInfo]:
@@ -3901,6 +4001,24 @@ class _TestingPebbleClient:
             message = f'cannot send signal to "{first_service}": invalid signal name "{sig}"'
             raise self._api_error(500, message) from None
 
+    def get_logs(
+        self,
+        services: Iterable[str] | None = None,
+        *,
+        n: int | None = None,
+        follow: bool = False,
+    ) -> Generator[pebble.LogEntry, None, None]:
+        self._check_connection()
+        names = frozenset(services or ())
+        logs = [entry for entry in self._logs if not names or entry.service in names]
+        if n is None:
+            n = 30  # Pebble's default
+        if n >= 0:
+            logs = logs[-n:] if n else []
+        # With follow=True, the real Pebble would wait for new logs, but nothing
+        # writes to the logs in tests, so stop after the existing entries.
+        yield from logs
+
     def get_checks(
         self, level: pebble.CheckLevel | None = None, names: Iterable[str] | None = None
     ) -> list[pebble.CheckInfo]:
@@ -4052,6 +4170,50 @@ class _TestingPebbleClient:
         notices.sort(key=lambda notice: notice.last_repeated)
         return notices
 
+    def wait_notices(
+        self,
+        *,
+        after: pebble.NoticeCursor | datetime.datetime | None = None,
+        timeout: float = 30.0,
+        users: pebble.NoticesUsers | None = None,
+        user_id: int | None = None,
+        types: Iterable[pebble.NoticeType | str] | None = None,
+        keys: Iterable[str] | None = None,
+    ) -> tuple[list[pebble.Notice], pebble.NoticeCursor]:
+        # Nothing can record a notice while the charm is waiting, so this
+        # never waits: it returns the matching notices after the cursor.
+        if isinstance(after, datetime.datetime):
+            after = pebble.NoticeCursor.from_datetime(after)
+        if after is None:
+            after = pebble.NoticeCursor(0)
+        notices = [
+            notice
+            for notice in self.get_notices(users=users, user_id=user_id, types=types, keys=keys)
+            if pebble.NoticeCursor.from_datetime(notice.last_repeated) > after
+        ]
+        if notices:
+            after = pebble.NoticeCursor.from_datetime(notices[-1].last_repeated)
+        return notices, after
+
+    def watch_notices(
+        self,
+        *,
+        after: pebble.NoticeCursor | datetime.datetime | None = None,
+        timeout: float | None = None,
+        users: pebble.NoticesUsers | None = None,
+        user_id: int | None = None,
+        types: Iterable[pebble.NoticeType | str] | None = None,
+        keys: Iterable[str] | None = None,
+    ) -> Generator[pebble.Notice, None, None]:
+        # As for wait_notices, no notices can occur while watching, so stop
+        # once there are no more (rather than blocking forever).
+        if after is None:
+            return
+        notices, _ = self.wait_notices(
+            after=after, users=users, user_id=user_id, types=types, keys=keys
+        )
+        yield from notices
+
     @staticmethod
     def _notice_matches(
         notice: pebble.Notice,
@@ -25,6 +25,8 @@ _TIMESTAMP_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})[Tt ](\d{2}):(\d{2}):(\d{2})
 # Matches [-+]HH:MM
 _TIMEOFFSET_RE = re.compile(r'([-+])(\d{2}):(\d{2})')
 
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
 # Matches n.n<unit> (allow U+00B5 micro symbol as well as U+03BC Greek letter mu)
 _DURATION_RE = re.compile(r'([0-9.]+)([a-zµμ]+)')
 
@@ -67,6 +69,34 @@ def parse_rfc3339(s: str) -> datetime.datetime:
     )
 
 
+def parse_rfc3339_ns(s: str) -> int:
+    """Parse an RFC3339 timestamp to an integer number of nanoseconds since the Unix epoch.
+
+    Unlike :func:`parse_rfc3339`, this keeps the full precision of the
+    timestamps that Go produces, which have up to nine digits for the
+    fractional second.
+    """
+    match = _TIMESTAMP_RE.match(s)
+    if not match:
+        raise ValueError(f'invalid timestamp {s!r}')
+    sfrac = match.group(7)
+    whole = parse_rfc3339(s).replace(microsecond=0)
+    seconds = (whole - _EPOCH) // datetime.timedelta(seconds=1)
+    nanoseconds = int(sfrac[1:10].ljust(9, '0')) if sfrac else 0
+    return seconds * 1_000_000_000 + nanoseconds
+
+
+def format_rfc3339_ns(ns: int) -> str:
+    """Format nanoseconds since the Unix epoch as an RFC3339 UTC timestamp.
+
+    This is the format that Go's time.RFC3339Nano layout parses, with all
+    nine digits of the fractional second.
+    """
+    seconds, nanoseconds = divmod(ns, 1_000_000_000)
+    whole = _EPOCH + datetime.timedelta(seconds=seconds)
+    return f'{whole:%Y-%m-%dT%H:%M:%S}.{nanoseconds:09d}Z'
+
+
 def parse_duration(s: str) -> datetime.timedelta:
     """Parse a formatted Go duration.
 
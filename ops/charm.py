@@ -22,7 +22,7 @@ import logging
 import os
 import pathlib
 import warnings
-from collections.abc import Mapping
+from collections.abc import Callable, Mapping
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -1306,6 +1306,10 @@ class CollectStatusEvent(LifecycleEvent):
                     event.add_status(ops.BlockedStatus('please set "port" config'))
                     return
                 event.add_status(ops.ActiveStatus())
+
+    If working out a component's status is expensive (for example, it requires
+    calls to Pebble), use :meth:`add_cached_status` to only do that work when
+    the inputs to the status have changed since a previous dispatch.
     """  # noqa: D405, D214, D411, D416  Final return confuses docstyle.
 
     def add_status(self, status: model.StatusBase):
@@ -1329,6 +1333,51 @@ class CollectStatusEvent(LifecycleEvent):
                 logger.debug('Adding unit status %s', status, stacklevel=2)
             model_.unit._collected_statuses.append(status)
 
+    def add_cached_status(
+        self, name: str, key: str, get_status: Callable[[], model.StatusBase]
+    ) -> None:
+        """Add a status for evaluation, reusing the previous status if its inputs are unchanged.
+
+        ``key`` should capture all the inputs that ``get_status`` uses to work
+        out the status, for example, a digest of the relevant configuration and
+        relation data. If a status was previously added with the same ``name``
+        and ``key``, that status is added again without calling ``get_status``;
+        otherwise, ``get_status`` is called and the status it returns is added
+        and stored for later dispatches. For example::
+
+            def _on_collect_status(self, event: ops.CollectStatusEvent):
+                key = hashlib.sha256(str(self.config['port']).encode()).hexdigest()
+                event.add_cached_status('webapp', key, self._get_webapp_status)
+
+        Only use this when the status is fully determined by ``key``: a status
+        that depends on something not included in the key (such as whether a
+        workload container can be connected to) will not be refreshed.
+
+        Only the most recent key and status are stored for each ``name``, so
+        the stored data doesn't grow as the key changes. Entries are never
+        pruned, though, so if the charm stops using a ``name``, its last
+        status stays in the charm's stored state.
+
+        Args:
+            name: Name for this status contribution, unique for the charm and
+                the kind of collect-status event (app or unit).
+            key: Cache key for the inputs to the status.
+            get_status: Called without arguments to work out the status when
+                there is no stored status for ``key``.
+        """
+        stored = self.framework._stored
+        cache: dict[str, list[str]] | None = stored['collected_statuses']
+        if cache is None:
+            cache = stored['collected_statuses'] = {}
+        cache_name = f'{self.handle.kind}/{name}'
+        entry = cache.get(cache_name)
+        if entry is not None and entry[0] == key:
+            status = model.StatusBase.from_name(entry[1], entry[2])
+        else:
+            status = get_status()
+        self.add_status(status)
+        cache[cache_name] = [key, status.name, status.message]
+
 
 class CharmEvents(ObjectEvents):
     """Events generated by Juju pertaining to application lifecycle.
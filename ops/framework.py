@@ -34,9 +34,7 @@ from typing import TYPE_CHECKING, Any, Literal, NoReturn, Protocol, TypeVar
 
 import opentelemetry.trace
 
-from . import charm
 from ._private import tracer
-from .model import Model, _ModelBackend
 from .storage import JujuStorage, NoSnapshotError, SQLiteStorage
 
 
@@ -642,6 +640,10 @@ class Framework(Object):
         except NoSnapshotError:
             self._stored = StoredStateData(self, '_stored')
             self._stored['event_count'] = 0
+        if model is not None:
+            # Make the configuration seen in the previous dispatch available
+            # for ConfigData.changed_keys() and ConfigData.diff().
+            model.config._previous = self._stored['config']
 
         # Flag to indicate that we already presented the welcome message in a debugger breakpoint
         self._breakpoint_welcomed: bool = False
@@ -697,6 +699,12 @@ class Framework(Object):
         # Make sure snapshots are saved by instances of StoredStateData. Any possible state
         # modifications in on_commit handlers of instances of other classes will not be persisted.
         self.on.commit.emit()
+        # Record the configuration if the charm read it, so that the next
+        # dispatch can tell which options changed.
+        if self.model is not None:
+            config = self.model.config._lazy_data
+            if config is not None and config != self._stored['config']:
+                self._stored['config'] = dict(config)
         # Save our event count after all events have been emitted.
         self.save_snapshot(self._stored)
         self._storage.commit()
@@ -1530,3 +1538,9 @@ class StoredSet(typing.MutableSet[Any]):
             return NotImplemented
 
     __repr__ = _wrapped_repr  # type: ignore
+
+
+# Imported last to break the circular import: ops.charm and ops.model import
+# names from this module.
+from . import charm  # noqa: E402
+from .model import Model, _ModelBackend  # noqa: E402
@@ -79,6 +79,23 @@ def relation_get(
         unit: The unit to get data for, or ``None`` to get data for the unit
             that triggered the current hook.
     """
+    stdout = _relation_get_json(id, endpoint=endpoint, key=key, unit=unit, app=app)
+    if key is not None:
+        key_result: str = json.loads(stdout)
+        return key_result
+    result: dict[str, str] = json.loads(stdout)
+    return result
+
+
+def _relation_get_json(
+    id: int | None = None,
+    *,
+    endpoint: str | None = None,
+    key: str | None = None,
+    unit: str | None = None,
+    app: bool = False,
+) -> str:
+    """Run relation-get and return the JSON output without decoding it."""
     if key == '-':
         raise ValueError('To get all keys, pass None for the key argument; "-" is not supported.')
     args = ['--format=json']
@@ -96,12 +113,7 @@ def relation_get(
     elif key:
         # The unit is not required when inside a relation hook other than relation-broken.
         args.append(key)
-    stdout = run('relation-get', *args)
-    if key is not None:
-        key_result: str = json.loads(stdout)
-        return key_result
-    result: dict[str, str] = json.loads(stdout)
-    return result
+    return run('relation-get', *args)
 
 
 def relation_ids(name: str) -> list[str]:
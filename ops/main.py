@@ -16,19 +16,37 @@
 
 from __future__ import annotations
 
-from . import _main
-from . import charm as _charm
+from typing import TYPE_CHECKING, Any
 
-# Re-export specific set of symbols that Scenario 6 imports from ops.main
-from ._main import (  # noqa: F401
-    CHARM_STATE_FILE,  # type: ignore[reportUnusedImport]
-    _Dispatcher,  # type: ignore[reportUnusedImport]
-    _get_event_args,  # type: ignore[reportUnusedImport]
-    logger,  # type: ignore[reportUnusedImport]
-)
+# The package is already being imported, so this is cheap, unlike importing
+# ops.charm. Its names are imported on first use, which means that the
+# annotations below can still be resolved at runtime.
+import ops
 
+if TYPE_CHECKING:
+    # Re-export specific set of symbols that Scenario 6 imports from ops.main
+    from ._main import (  # noqa: F401
+        CHARM_STATE_FILE,  # type: ignore[reportUnusedImport]
+        _Dispatcher,  # type: ignore[reportUnusedImport]
+        _get_event_args,  # type: ignore[reportUnusedImport]
+        logger,  # type: ignore[reportUnusedImport]
+    )
 
-def main(charm_class: type[_charm.CharmBase], use_juju_for_storage: bool | None = None):
+# This module is imported by "import ops", so it imports ops._main, and so
+# the rest of ops, only when it's used.
+_main_names = frozenset({'CHARM_STATE_FILE', '_Dispatcher', '_get_event_args', 'logger'})
+
+if not TYPE_CHECKING:
+
+    def __getattr__(name: str) -> Any:
+        if name not in _main_names:
+            raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+        from . import _main
+
+        return getattr(_main, name)
+
+
+def main(charm_class: type[ops.CharmBase], use_juju_for_storage: bool | None = None):
     """Legacy entrypoint to set up the charm and dispatch the observed event.
 
     .. deprecated:: 2.16.0
@@ -36,4 +54,17 @@ def main(charm_class: type[_charm.CharmBase], use_juju_for_storage: bool | None
 
     See `ops.main() <#ops-main-entry-point>`_ for details.
     """
+    from . import _main
+
     return _main.main(charm_class=charm_class, use_juju_for_storage=use_juju_for_storage)
+
+
+class _Main:
+    def __call__(self, charm_class: type[ops.CharmBase], use_juju_for_storage: bool | None = None):
+        from . import _main
+
+        return _main.main(charm_class=charm_class, use_juju_for_storage=use_juju_for_storage)
+
+    def main(self, charm_class: type[ops.CharmBase], use_juju_for_storage: bool | None = None):
+        # The module-level function, not this method.
+        return main(charm_class=charm_class, use_juju_for_storage=use_juju_for_storage)
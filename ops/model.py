@@ -16,12 +16,14 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import contextlib
 import contextvars
 import copy
 import dataclasses
 import datetime
 import enum
+import hashlib
 import ipaddress
 import json
 import logging
@@ -52,7 +54,6 @@ from typing import (
     get_type_hints,
 )
 
-from . import charm as _charm
 from . import hookcmds, pebble
 from ._private import timeconv, tracer, yaml
 from .jujucontext import JujuContext
@@ -73,6 +74,8 @@ K8sSpec = Mapping[str, Any]
 
 _StorageDictType: TypeAlias = 'dict[str, list[Storage] | None]'
 _BindingDictType: TypeAlias = 'dict[str | Relation, Binding]'
+_ConfigValueType: TypeAlias = bool | int | float | str | None
+_ConfigDiffType: TypeAlias = dict[str, tuple[_ConfigValueType, _ConfigValueType]]
 
 _ReadOnlyStatusName = Literal['error', 'unknown']
 _SettableStatusName = Literal['active', 'blocked', 'maintenance', 'waiting']
@@ -380,10 +383,14 @@ class Application:
         self._cache = cache
         self._is_our_app = self.name == self._backend.app_name
         self._status = None
+        # The status most recently read or set in this dispatch, used to skip
+        # redundant status-set calls.
+        self._last_status: StatusBase | None = None
         self._collected_statuses: list[StatusBase] = []
 
     def _invalidate(self):
         self._status = None
+        self._last_status = None
 
     @property
     def status(self) -> StatusBase:
@@ -400,6 +407,11 @@ class Application:
         Alternatively, use the :attr:`collect_app_status <CharmEvents.collect_app_status>`
         event to evaluate and set application status consistently at the end of every hook.
 
+        Setting the status to the value it was last read as or set to in this
+        dispatch doesn't call ``status-set`` again. If the status may have been
+        changed outside ops since then, use :meth:`set_status` with
+        ``force=True`` to set it regardless.
+
         Raises:
             RuntimeError: if setting the status of another application, or if setting the
                 status of this application as a unit that is not the leader.
@@ -426,11 +438,27 @@ class Application:
             return self._status
 
         s = self._backend.status_get(is_app=True)
-        self._status = StatusBase.from_name(s['status'], s['message'])
+        self._status = self._last_status = StatusBase.from_name(s['status'], s['message'])
         return self._status
 
     @status.setter
     def status(self, value: StatusBase):
+        self.set_status(value)
+
+    def set_status(self, value: StatusBase, *, force: bool = False) -> None:
+        """Set the status of the application, like assigning to :attr:`status`.
+
+        Args:
+            value: The new status.
+            force: Call ``status-set`` even if the status was last read as or
+                set to ``value``, in case it was changed outside ops.
+
+        Raises:
+            RuntimeError: if setting the status of another application, or if setting the
+                status of this application as a unit that is not the leader.
+            InvalidStatusError: if setting the status to something that is not a
+                :class:`StatusBase`
+        """
         if not isinstance(value, StatusBase):
             raise InvalidStatusError(
                 f'invalid value provided for application {self} status: {value}'
@@ -448,11 +476,13 @@ class Application:
             )
             raise RuntimeError('cannot set application status as a non-leader unit')
 
-        self._backend.status_set(
-            typing.cast('_SettableStatusName', value.name),  # status_set will validate at runtime
-            value.message,
-            is_app=True,
-        )
+        if force or value != self._last_status:
+            self._backend.status_set(
+                typing.cast('_SettableStatusName', value.name),  # validated at runtime
+                value.message,
+                is_app=True,
+            )
+            self._last_status = value
 
         self._status = value
 
@@ -576,6 +606,10 @@ class Unit:
         self._cache = cache
         self._is_our_unit = self.name == self._backend.unit_name
         self._status = None
+        # The status most recently set for this unit, as far as we know: read or
+        # set in this dispatch, or recorded at the end of the previous one. Used
+        # to skip redundant status-set calls.
+        self._last_status: StatusBase | None = None
         self._collected_statuses: list[StatusBase] = []
 
         if self._is_our_unit and hasattr(meta, 'containers'):
@@ -584,6 +618,7 @@ class Unit:
 
     def _invalidate(self):
         self._status = None
+        self._last_status = None
 
     @property
     def status(self) -> StatusBase:
@@ -598,6 +633,12 @@ class Unit:
         Alternatively, use the :attr:`collect_unit_status <CharmEvents.collect_unit_status>`
         event to evaluate and set unit status consistently at the end of every hook.
 
+        Setting the status to the value it was last read as or set to, in this
+        dispatch or at the end of the previous successful one, doesn't call
+        ``status-set`` again. If the status may have been changed outside ops
+        since then, for example with ``juju exec``, use :meth:`set_status` with
+        ``force=True`` to set it regardless.
+
         Raises:
             RuntimeError: if setting the status of a unit other than the current unit
             InvalidStatusError: if setting the status to something other than
@@ -614,22 +655,39 @@ class Unit:
             return self._status
 
         s = self._backend.status_get(is_app=False)
-        self._status = StatusBase.from_name(s['status'], s['message'])
+        self._status = self._last_status = StatusBase.from_name(s['status'], s['message'])
         return self._status
 
     @status.setter
     def status(self, value: StatusBase):
+        self.set_status(value)
+
+    def set_status(self, value: StatusBase, *, force: bool = False) -> None:
+        """Set the status of the unit, like assigning to :attr:`status`.
+
+        Args:
+            value: The new status.
+            force: Call ``status-set`` even if the status was last read as or
+                set to ``value``, in case it was changed outside ops.
+
+        Raises:
+            RuntimeError: if setting the status of a unit other than the current unit
+            InvalidStatusError: if setting the status to something other than
+                a :class:`StatusBase`
+        """
         if not isinstance(value, StatusBase):
             raise InvalidStatusError(f'invalid value provided for unit {self} status: {value}')
 
         if not self._is_our_unit:
             raise RuntimeError(f'cannot set status for a remote unit {self}')
 
-        self._backend.status_set(
-            typing.cast('_SettableStatusName', value.name),  # status_set will validate at runtime
-            value.message,
-            is_app=False,
-        )
+        if force or value != self._last_status:
+            self._backend.status_set(
+                typing.cast('_SettableStatusName', value.name),  # validated at runtime
+                value.message,
+                is_app=False,
+            )
+            self._last_status = value
         self._status = value
 
     def __repr__(self):
@@ -866,14 +924,14 @@ class _GenericLazyMapping(Mapping[str, _LazyValueType], ABC):
     """
 
     # key-value mapping
-    _lazy_data: dict[str, _LazyValueType] | None = None
+    _lazy_data: Mapping[str, _LazyValueType] | None = None
 
     @abstractmethod
-    def _load(self) -> dict[str, _LazyValueType]:
+    def _load(self) -> Mapping[str, _LazyValueType]:
         raise NotImplementedError()
 
     @property
-    def _data(self) -> dict[str, _LazyValueType]:
+    def _data(self) -> Mapping[str, _LazyValueType]:
         data = self._lazy_data
         if data is None:
             data = self._lazy_data = self._load()
@@ -1825,11 +1883,17 @@ class Relation:
         data: dict[str, Any] = copy.deepcopy(kwargs)
         if decoder is None:
             decoder = json.loads
-        for key, value in sorted(self.data[src].items()):
+        content = self.data[src]
+        # Read the cached databag directly, checking access once rather than
+        # per key, and only decode the values that the class will use.
+        bag = content._data
+        if bag:
+            content._validate_read()
+        for key in sorted(bag):
             if fields is None:
-                data[key] = decoder(value)
+                data[key] = decoder(bag[key])
             elif key in fields:
-                data[fields[key]] = decoder(value)
+                data[fields[key]] = decoder(bag[key])
         return cls(*args, **data)
 
     def save(
@@ -1979,6 +2043,159 @@ class RelationData(Mapping[Unit | Application, 'RelationDataContent']):
     def __repr__(self):
         return repr(self._data)
 
+    def load_all(self, max_workers: int = 4) -> None:
+        """Load all the databags in the relation that this unit can read.
+
+        Each databag is normally loaded with a ``relation-get`` call the first
+        time it's accessed. For a relation with many units, call this before
+        reading all of the databags, to run the ``relation-get`` calls
+        concurrently rather than one after the other::
+
+            relation.data.load_all()
+            addresses = [relation.data[unit].get('address') for unit in relation.units]
+
+        Databags that are already loaded, and databags that this unit is not
+        allowed to read, are skipped. The time taken is recorded in an
+        ``ops.RelationData.load_all`` tracing span.
+
+        Args:
+            max_workers: The maximum number of ``relation-get`` calls to run
+                at the same time.
+        """
+        pending: list[RelationDataContent] = []
+        for content in self._data.values():
+            if content._lazy_data is not None:
+                continue
+            try:
+                content._validate_read()
+            except RelationDataAccessError:
+                continue
+            pending.append(content)
+
+        with tracer.start_as_current_span('ops.RelationData.load_all') as span:
+            span.set_attribute('relation_id', self.relation.id)
+            span.set_attribute('databags', len(pending))
+            if max_workers <= 1 or len(pending) <= 1:
+                for content in pending:
+                    content._lazy_data = content._load()
+                return
+            # Run each call in a copy of this context, so that the hook
+            # command spans are children of this one.
+            contexts = [contextvars.copy_context() for _ in pending]
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(max_workers, len(pending))
+            ) as executor:
+                results = executor.map(
+                    lambda ctx, content: ctx.run(content._load), contexts, pending
+                )
+                for content, data in zip(pending, results, strict=True):
+                    content._lazy_data = data
+
+
+# Patterns used by _CompactDatabag to scan relation-get output.
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# The rest of a JSON string, after the opening quote, up to and including the closing quote.
+_JSON_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+
+class _CompactDatabag(Mapping[str, str]):
+    """A read-only databag that keeps the raw JSON output of ``relation-get``.
+
+    Each value is decoded the first time it's accessed, rather than all up
+    front, so values that are never read (for example, fields that
+    :meth:`Relation.load` doesn't use) are only held as JSON text. Once every
+    value has been decoded, the JSON text is released. Keys are interned, as
+    the same keys are used across all the databags of a relation.
+
+    Use :meth:`from_json` to create one.
+    """
+
+    # Databags with less JSON than this are decoded into a dict as usual.
+    _min_size = 64 * 1024
+
+    __slots__ = ('_offsets', '_raw', '_values')
+
+    def __init__(self, raw: str, offsets: dict[str, int]):
+        self._raw = raw
+        # Maps each key to the index of the first character of its value.
+        self._offsets = offsets
+        self._values: dict[str, str] = {}
+
+    @classmethod
+    def from_json(cls, raw: str) -> _RelationDataContent_Raw | _CompactDatabag:
+        """Return the databag for the given JSON object of strings.
+
+        Small databags, and any JSON this can't scan, are decoded into a dict.
+        """
+        if len(raw) >= cls._min_size:
+            try:
+                offsets = cls._scan(raw)
+            except ValueError:
+                offsets = None
+            if offsets is not None:
+                return cls(raw, offsets)
+        result: _RelationDataContent_Raw = json.loads(raw)
+        return result
+
+    @staticmethod
+    def _scan(raw: str) -> dict[str, int] | None:
+        """Find where each value starts, or return None if the JSON isn't as expected."""
+
+        def skip_whitespace(pos: int) -> int:
+            match = _JSON_WHITESPACE.match(raw, pos)
+            assert match is not None  # The pattern matches the empty string.
+            return match.end()
+
+        offsets: dict[str, int] = {}
+        pos = skip_whitespace(0)
+        if raw[pos : pos + 1] != '{':
+            return None
+        pos = skip_whitespace(pos + 1)
+        if raw[pos : pos + 1] == '}':
+            return offsets if skip_whitespace(pos + 1) == len(raw) else None
+        while True:
+            if raw[pos : pos + 1] != '"':
+                return None
+            key, pos = json.decoder.scanstring(raw, pos + 1)
+            pos = skip_whitespace(pos)
+            if raw[pos : pos + 1] != ':':
+                return None
+            pos = skip_whitespace(pos + 1)
+            if raw[pos : pos + 1] != '"':
+                return None
+            match = _JSON_STRING_REST.match(raw, pos + 1)
+            if match is None:
+                return None
+            offsets[sys.intern(key)] = pos + 1
+            pos = skip_whitespace(match.end())
+            separator = raw[pos : pos + 1]
+            pos = skip_whitespace(pos + 1)
+            if separator == '}':
+                return offsets if pos == len(raw) else None
+            if separator != ',':
+                return None
+
+    def __getitem__(self, key: str) -> str:
+        value = self._values.get(key)
+        if value is None:
+            value, _ = json.decoder.scanstring(self._raw, self._offsets[key])
+            self._values[key] = value
+            if len(self._values) == len(self._offsets):
+                self._raw = ''
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
 
 # We mix in MutableMapping here to get some convenience implementations, but whether it's actually
 # mutable or not is controlled by the flag.
@@ -1998,9 +2215,11 @@ class RelationDataContent(LazyMapping, MutableMapping[str, str]):
         # unrestricted, allowing test code to read/write databags at will.
         return bool(self._backend._hook_is_running)
 
-    def _load(self) -> _RelationDataContent_Raw:
+    def _load(self) -> _RelationDataContent_Raw | _CompactDatabag:
         """Load the data from the current entity / relation."""
         try:
+            # A large databag may be a read-only _CompactDatabag, which
+            # _update_cache turns into a dict before making any changes.
             return self._backend.relation_get(
                 self.relation.id,
                 self._entity.name,
@@ -2119,13 +2338,16 @@ class RelationDataContent(LazyMapping, MutableMapping[str, str]):
         # Don't load data unnecessarily if we're only updating.
         if self._lazy_data is None:
             return
+        cache = self._lazy_data
+        if not isinstance(cache, dict):
+            cache = self._lazy_data = dict(cache)
         for key, value in data.items():
             if value == '':
                 # Match the behavior of Juju, which is that setting the value to an
                 # empty string will remove the key entirely from the relation data.
-                self._data.pop(key, None)
+                cache.pop(key, None)
             else:
-                self._data[key] = value
+                cache[key] = value
 
     def __getitem__(self, key: str) -> str:
         self._validate_read()
@@ -2177,10 +2399,56 @@ class ConfigData(_GenericLazyMapping['bool | int | float | str']):
 
     def __init__(self, backend: _ModelBackend):
         self._backend = backend
+        # The configuration as last observed by the charm in a previous
+        # dispatch, restored by the framework from the unit state.
+        self._previous: dict[str, bool | int | float | str] | None = None
 
     def _load(self) -> dict[str, bool | int | float | str]:
         return self._backend.config_get()
 
+    def changed_keys(self) -> set[str]:
+        """Return the names of the options that changed since the previous dispatch.
+
+        The comparison is against the configuration that the charm last read
+        in a dispatch that completed successfully. An option that was added or
+        removed (unset) counts as changed. If there is no previous
+        configuration recorded (for example, in the first dispatch after the
+        charm was installed or upgraded), every option is reported as changed,
+        so charms can use this to safely skip work for options that are
+        unchanged::
+
+            def _on_config_changed(self, event: ops.ConfigChangedEvent):
+                if self.config.changed_keys() & {'port', 'log-level'}:
+                    self._render_and_push_config()
+
+        Note that the recorded configuration is updated whenever the charm reads
+        its configuration, so if a handler defers an event after reading the
+        configuration, the change will not be reported on the deferred event's
+        re-emission.
+        """
+        return set(self.diff())
+
+    def diff(self) -> _ConfigDiffType:
+        """Return the options that changed since the previous dispatch.
+
+        See :meth:`changed_keys` for details of what is compared.
+
+        Returns:
+            A dict mapping each changed option name to a tuple of
+            ``(previous_value, current_value)``. An option that has been added
+            has a previous value of ``None``, and an option that has been unset
+            has a current value of ``None``.
+        """
+        previous = self._previous or {}
+        current = self._data
+        changes: _ConfigDiffType = {}
+        for key in previous.keys() | current.keys():
+            old = previous.get(key)
+            new = current.get(key)
+            if old != new or type(old) is not type(new):
+                changes[key] = (old, new)
+        return changes
+
 
 class StatusBase:
     """Status values specific to applications and units.
@@ -2531,6 +2799,85 @@ class MultiPushPullError(Exception):
         return f'MultiPushPullError({self.message!r}, {len(self.errors)} errors)'
 
 
+class _LazyLocalFile:
+    """Readable local file that's opened on the first read and closed once fully read."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file: BinaryIO | None = None
+        self._closed = False
+
+    def read(self, size: int = -1) -> bytes:
+        if self._closed:
+            return b''
+        if self._file is None:
+            self._file = open(self._path, 'rb')  # noqa: SIM115
+        data = self._file.read(size)
+        if size < 0 or (size > 0 and not data):
+            self.close()
+        return data
+
+    def close(self):
+        self._closed = True
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _TransferPool:
+    """Runs the Pebble calls for :meth:`Container.push_path` and :meth:`Container.pull_path`.
+
+    If ``max_workers`` is more than one, calls are run concurrently in worker
+    threads, each using its own Pebble connection. Otherwise, each call is run
+    as soon as it's submitted.
+    """
+
+    def __init__(self, max_workers: int):
+        self._executor = (
+            concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+            if max_workers > 1
+            else None
+        )
+
+    def submit(
+        self, func: Callable[..., _T], /, *args: Any, **kwargs: Any
+    ) -> concurrent.futures.Future[_T]:
+        if self._executor is not None:
+            # Run each call in a copy of this context, so that the Pebble
+            # client spans are children of the current one.
+            ctx = contextvars.copy_context()
+            return self._executor.submit(ctx.run, func, *args, **kwargs)
+        future: concurrent.futures.Future[_T] = concurrent.futures.Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    @staticmethod
+    def done(result: _T) -> concurrent.futures.Future[_T]:
+        """Return a future that already has the given result."""
+        future: concurrent.futures.Future[_T] = concurrent.futures.Future()
+        future.set_result(result)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *_: Any):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=exc_type is not None)
+
+
+def _sha256_file(path: str | Path) -> str:
+    """Return the hex SHA-256 digest of a local file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(64 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class Container:
     """Represents a named container in a unit.
 
@@ -2565,6 +2912,8 @@ class Container:
             socket_path = f'/charm/containers/{name}/pebble.socket'
             pebble_client = backend.get_pebble(socket_path)
         self._pebble: pebble.Client = pebble_client
+        # The plan only changes when a layer is added, so it's cached until then.
+        self._plan: pebble.Plan | None = None
 
     def can_connect(self) -> bool:
         """Report whether the Pebble API is reachable in the container.
@@ -2581,7 +2930,15 @@ class Container:
             container = self.unit.get_container("example")
             if not container.can_connect():
                 event.add_status(ops.MaintenanceStatus("Waiting for Pebble..."))
+
+        Calling this often is cheap: if a request to Pebble succeeded in the last
+        couple of seconds, and no request has failed to connect since, Pebble is
+        assumed to be reachable. Otherwise, this only checks that Pebble's socket
+        accepts connections, rather than making an API request.
         """
+        if isinstance(self._pebble, pebble.Client):
+            return self._pebble._can_connect()
+        # Other clients, such as test doubles, are checked with a request.
         try:
             self._pebble.get_system_info()
         except pebble.ConnectionError as e:
@@ -2599,32 +2956,68 @@ class Container:
             return False
         return True
 
-    def autostart(self) -> None:
-        """Autostart all services marked as ``startup: enabled``."""
-        self._pebble.autostart_services()
+    def autostart(self, *, wait: bool = True) -> pebble.ChangeID:
+        """Autostart all services marked as ``startup: enabled``.
 
-    def replan(self) -> None:
-        """Replan all services: restart changed services and start startup-enabled services."""
-        self._pebble.replan_services()
+        Args:
+            wait: If false, don't wait for the services to start; use
+                :func:`ops.pebble.wait_changes` with the returned change ID to
+                wait for this and other containers at the same time.
 
-    def start(self, *service_names: str):
-        """Start given service(s) by name."""
+        Returns:
+            The ID of the autostart change.
+        """
+        return self._pebble.autostart_services(**self._no_wait(wait))
+
+    def replan(self, *, wait: bool = True) -> pebble.ChangeID:
+        """Replan all services: restart changed services and start startup-enabled services.
+
+        Args:
+            wait: If false, don't wait for the services to (re)start; use
+                :func:`ops.pebble.wait_changes` with the returned change ID to
+                wait for this and other containers at the same time. For example::
+
+                    changes = [(c.pebble, c.replan(wait=False)) for c in containers]
+                    pebble.wait_changes(changes)
+
+        Returns:
+            The ID of the replan change.
+        """
+        return self._pebble.replan_services(**self._no_wait(wait))
+
+    def start(self, *service_names: str, wait: bool = True) -> pebble.ChangeID:
+        """Start given service(s) by name.
+
+        Args:
+            service_names: The names of the services to start.
+            wait: If false, don't wait for the services to start; see :meth:`replan`.
+
+        Returns:
+            The ID of the start change.
+        """
         if not service_names:
             raise TypeError('start expected at least 1 argument, got 0')
 
-        self._pebble.start_services(service_names)
+        return self._pebble.start_services(service_names, **self._no_wait(wait))
 
-    def restart(self, *service_names: str):
+    def restart(self, *service_names: str, wait: bool = True) -> pebble.ChangeID:
         """Restart the given service(s) by name.
 
         Listed running services will be stopped and restarted, and listed stopped
         services will be started.
+
+        Args:
+            service_names: The names of the services to restart.
+            wait: If false, don't wait for the services to start; see :meth:`replan`.
+
+        Returns:
+            The ID of the restart change.
         """
         if not service_names:
             raise TypeError('restart expected at least 1 argument, got 0')
 
         try:
-            self._pebble.restart_services(service_names)
+            return self._pebble.restart_services(service_names, **self._no_wait(wait))
         except pebble.APIError as e:
             if e.code != 400:
                 raise e
@@ -2633,15 +3026,29 @@ class Container:
                 s.name for s in self.get_services(*service_names).values() if s.is_running()
             )
             if stop:
+                # The services must be stopped before they can be started again.
                 self._pebble.stop_services(stop)
-            self._pebble.start_services(service_names)
+            return self._pebble.start_services(service_names, **self._no_wait(wait))
+
+    def stop(self, *service_names: str, wait: bool = True) -> pebble.ChangeID:
+        """Stop given service(s) by name.
+
+        Args:
+            service_names: The names of the services to stop.
+            wait: If false, don't wait for the services to stop; see :meth:`replan`.
 
-    def stop(self, *service_names: str):
-        """Stop given service(s) by name."""
+        Returns:
+            The ID of the stop change.
+        """
         if not service_names:
             raise TypeError('stop expected at least 1 argument, got 0')
 
-        self._pebble.stop_services(service_names)
+        return self._pebble.stop_services(service_names, **self._no_wait(wait))
+
+    @staticmethod
+    def _no_wait(wait: bool) -> dict[str, float]:
+        # A timeout of 0 submits the change without waiting for it.
+        return {} if wait else {'timeout': 0}
 
     def add_layer(
         self,
@@ -2649,9 +3056,17 @@ class Container:
         layer: str | pebble.LayerDict | pebble.Layer,
         *,
         combine: bool = False,
-    ):
+        skip_if_unchanged: bool = False,
+    ) -> bool:
         """Dynamically add a new layer onto the Pebble configuration layers.
 
+        To avoid restarting services needlessly, a charm that adds the same
+        layer in every event can skip adding it (and replanning) when it
+        wouldn't change anything::
+
+            if container.add_layer('myapp', layer, combine=True, skip_if_unchanged=True):
+                container.replan()
+
         Args:
             label: Label for new layer (and label of layer to merge with if
                 combining).
@@ -2662,8 +3077,44 @@ class Container:
                 combine is true and the label already exists, the two layers
                 are combined into a single one considering the layer override
                 rules; if the layer doesn't exist, it is added as usual.
+            skip_if_unchanged: If true, don't add the layer if the plan would
+                be the same with the layer added on top of it. The comparison
+                is made locally, using the plan from :meth:`get_plan`.
+
+        Returns:
+            True if the layer was added, False if it was skipped because it
+            wouldn't change the plan.
         """
+        if skip_if_unchanged and self._layer_unchanged(layer):
+            return False
+        self._plan = None
         self._pebble.add_layer(label, layer, combine=combine)
+        return True
+
+    def _layer_unchanged(self, layer: str | pebble.LayerDict | pebble.Layer) -> bool:
+        """Report whether adding the layer on top of the current plan would leave it unchanged.
+
+        When in doubt, such as when the layer has fields that ops doesn't
+        know about, this returns False so that Pebble makes the decision.
+        """
+        if isinstance(layer, str):
+            raw = yaml.safe_load(layer) or {}
+            if not isinstance(raw, dict):
+                return False
+            layer_obj = pebble.Layer(typing.cast('pebble.LayerDict', raw))
+            if layer_obj.to_dict() != raw:
+                return False
+        elif isinstance(layer, dict):
+            layer_obj = pebble.Layer(layer)
+            if layer_obj.to_dict() != layer:
+                return False
+        elif isinstance(layer, pebble.Layer):
+            layer_obj = layer
+        else:
+            return False  # Let the Pebble client raise the error.
+        plan = self.get_plan()
+        new_plan = plan._with_layer(layer_obj)
+        return new_plan is not None and new_plan._same_config(plan)
 
     def get_plan(self) -> pebble.Plan:
         """Get the combined Pebble configuration.
@@ -2671,8 +3122,15 @@ class Container:
         This will immediately reflect changes from any previous
         :meth:`add_layer` calls, regardless of whether :meth:`replan` or
         :meth:`restart` have been called.
+
+        The plan is fetched from Pebble once and cached on this object until
+        a layer is added. Accessing :attr:`pebble` also clears the cache, in
+        case the client is used to change the plan directly.
         """
-        return self._pebble.get_plan()
+        if self._plan is None:
+            self._plan = self._pebble.get_plan()
+        # Return a copy, so that changes to it don't affect the cached plan.
+        return pebble.Plan(copy.deepcopy(self._plan.to_dict()))
 
     def get_services(self, *service_names: str) -> Mapping[str, pebble.ServiceInfo]:
         """Fetch and return a mapping of status information indexed by service name.
@@ -2864,6 +3322,8 @@ class Container:
         self,
         source_path: str | Path | Iterable[str | Path],
         dest_dir: str | PurePath,
+        *,
+        max_workers: int = 1,
     ):
         """Recursively push a local path or files to the remote system.
 
@@ -2910,6 +3370,10 @@ class Container:
                 *contents* placed inside the destination directory.
             dest_dir: Remote destination directory inside which the source
                 dir/files will be placed. This must be an absolute path.
+            max_workers: The maximum number of requests to Pebble to run at
+                the same time, each using its own connection. For trees with
+                many files, a value such as 4 is usually much faster than the
+                default of one request at a time.
         """
         if hasattr(source_path, '__iter__') and not isinstance(source_path, str):
             source_paths = typing.cast('Iterable[str | Path]', source_path)
@@ -2918,19 +3382,107 @@ class Container:
         source_paths = [Path(p) for p in source_paths]
         dest_dir = Path(dest_dir)
 
-        def local_list(source_path: Path) -> list[pebble.FileInfo]:
-            paths = source_path.iterdir() if source_path.is_dir() else [source_path]
-            files = [self._build_fileinfo(f) for f in paths]
-            return files
-
         errors: list[tuple[str, Exception]] = []
+        dirs: dict[Path, Path] = {}
+        files: list[tuple[Path, pebble.FileInfo, Path]] = []
         for source_path in source_paths:
             try:
-                for info in Container._list_recursive(local_list, source_path):
+                for info in Container._list_recursive(self._list_local, source_path):
                     dstpath = self._build_destpath(info.path, source_path, dest_dir)
                     if info.type is pebble.FileType.DIRECTORY:
-                        self.make_dir(dstpath, make_parents=True)
-                        continue
+                        dirs[dstpath] = source_path
+                    else:
+                        files.append((source_path, info, dstpath))
+            except (OSError, pebble.Error) as err:  # noqa: PERF203
+                errors.append((str(source_path), err))
+
+        with _TransferPool(max_workers) as pool:
+            errors.extend(self._push_listed(dirs, files, pool))
+        if errors:
+            raise MultiPushPullError('failed to push one or more files', errors)
+
+    _push_batch_files = 256
+    _push_batch_bytes = 16 * 1024 * 1024
+
+    @staticmethod
+    def _list_local(path: Path) -> list[pebble.FileInfo]:
+        """List a local directory (or a single file) for :meth:`_list_recursive`."""
+        paths = path.iterdir() if path.is_dir() else [path]
+        return [Container._build_fileinfo(p) for p in paths]
+
+    def _push_listed(
+        self,
+        dirs: dict[Path, Path],
+        files: list[tuple[Path, pebble.FileInfo, Path]],
+        pool: _TransferPool | None = None,
+    ) -> list[tuple[str, Exception]]:
+        """Create remote directories and push local files, returning any errors.
+
+        Args:
+            dirs: Maps each remote directory to create to the source path it's reported
+                against in errors.
+            files: (source path reported in errors, local file info, remote path) for
+                each file to push.
+            pool: Runs the requests to Pebble; by default, one at a time.
+        """
+        if pool is None:
+            pool = _TransferPool(1)
+        errors: list[tuple[str, Exception]] = []
+        # Directories are created before pushing any files, so they're created with
+        # the default ownership and permissions. Creating a directory also creates its
+        # parents, so only directories that don't contain another need a request.
+        parents = {parent for path in dirs for parent in path.parents}
+        made = [
+            (source_path, pool.submit(self.make_dir, dstpath, make_parents=True))
+            for dstpath, source_path in dirs.items()
+            if dstpath not in parents
+        ]
+        for source_path, future in made:
+            try:
+                future.result()
+            except (OSError, pebble.Error) as err:  # noqa: PERF203
+                errors.append((str(source_path), err))
+
+        # Files are pushed in batches, each in a single request to Pebble.
+        batch: list[tuple[Path, pebble.FileInfo, Path]] = []
+        batch_size = 0
+        pushed: list[concurrent.futures.Future[list[tuple[str, Exception]]]] = []
+        for source_path, info, dstpath in files:
+            batch.append((source_path, info, dstpath))
+            batch_size += info.size or 0
+            if len(batch) >= self._push_batch_files or batch_size >= self._push_batch_bytes:
+                pushed.append(pool.submit(self._push_batch, batch))
+                batch, batch_size = [], 0
+        if batch:
+            pushed.append(pool.submit(self._push_batch, batch))
+        for future in pushed:
+            errors.extend(future.result())
+        return errors
+
+    def _push_batch(
+        self, batch: list[tuple[Path, pebble.FileInfo, Path]]
+    ) -> list[tuple[str, Exception]]:
+        """Push (source_path, local file info, remote path) files with their ownership and mode."""
+        # Each local file is only opened while its content is being sent.
+        sources = {
+            dstpath: pebble.PushSource(
+                typing.cast('BinaryIO', _LazyLocalFile(info.path)),
+                permissions=info.permissions,
+                user_id=info.user_id,
+                user=info.user,
+                group_id=info.group_id,
+                group=info.group,
+            )
+            for _, info, dstpath in batch
+        }
+        try:
+            self._pebble.push_many(sources, make_dirs=True)
+        except (OSError, pebble.Error):
+            # Push the files one at a time so that each error is reported
+            # against the right source path.
+            errors: list[tuple[str, Exception]] = []
+            for source_path, info, dstpath in batch:
+                try:
                     with open(info.path, 'rb') as src:
                         self.push(
                             dstpath,
@@ -2942,15 +3494,189 @@ class Container:
                             group_id=info.group_id,
                             group=info.group,
                         )
-            except (OSError, pebble.Error) as err:
-                errors.append((str(source_path), err))
+                except (OSError, pebble.Error) as err:  # noqa: PERF203
+                    errors.append((str(source_path), err))
+            return errors
+        finally:
+            for source in sources.values():
+                typing.cast('BinaryIO', source.source).close()
+        return []
+
+    def sync_path(
+        self,
+        source_dir: str | Path,
+        dest_dir: str | PurePath,
+        *,
+        checksum: bool = False,
+        delete: bool = True,
+    ) -> list[str]:
+        """Make a remote directory match the contents of a local directory.
+
+        Only files that differ are pushed, so re-syncing an unchanged tree
+        costs a listing of the remote directory and little else. For example,
+        to keep a rendered configuration tree up to date::
+
+            if container.sync_path(rendered_dir, '/etc/myapp', checksum=True):
+                container.restart('myapp')
+
+        A local file is pushed if there is no remote file at the same path, or
+        the remote file's size, permissions, or owner differ. Otherwise, it's
+        pushed if it was modified more recently than the remote file, or, if
+        ``checksum`` is true, if the SHA-256 checksums of the files differ.
+        Rendering files locally updates their modification time even if the
+        content is the same, so use ``checksum`` to avoid pushing them again.
+
+        Like :meth:`push_path`, only regular files and directories are synced,
+        and syncing is attempted to completion even if errors occur. If any
+        errors occurred, a single :class:`MultiPushPullError` is raised at the
+        end.
+
+        Args:
+            source_dir: Local directory whose *contents* are synced.
+            dest_dir: Remote directory to sync into. It's created if it doesn't
+                exist. This must be an absolute path.
+            checksum: If true, compare the contents of files that otherwise
+                look the same, checksumming the remote files with a single
+                ``sha256sum`` command (per few hundred files) run in the
+                container. If ``sha256sum`` isn't available, all of those
+                files are pushed.
+            delete: If true, remove remote files and directories that don't
+                exist locally. Remote paths that have a different type locally
+                (a file where the local path is a directory, or vice versa) are
+                always replaced.
+
+        Returns:
+            The sorted remote paths that were pushed, created, or removed. An
+            empty list means that the remote directory was already in sync.
+        """
+        source_dir = Path(source_dir)
+        dest_dir = Path(dest_dir)
+
+        # If the local tree can't be listed, stop before removing anything remotely.
+        local: dict[PurePath, pebble.FileInfo] = {}
+        try:
+            if not source_dir.is_dir():
+                raise NotADirectoryError(f'not a directory: {source_dir}')
+            for info in Container._list_recursive(self._list_local, source_dir / '*'):
+                local[Path(info.path).relative_to(source_dir)] = info
+        except OSError as err:
+            raise MultiPushPullError('failed to sync files', [(str(source_dir), err)]) from err
+
+        remote: dict[PurePath, pebble.FileInfo] = {}
+        dest_exists = True
+        try:
+            for info in Container._list_recursive(self.list_files, dest_dir):
+                if info.path == str(dest_dir):
+                    # Listing a file returns the file itself.
+                    err = NotADirectoryError(f'not a directory: {dest_dir}')
+                    raise MultiPushPullError('failed to sync files', [(str(dest_dir), err)])
+                remote[PurePath(info.path).relative_to(dest_dir)] = info
+        except pebble.APIError as err:
+            if err.code != 404:
+                raise MultiPushPullError('failed to sync files', [(str(dest_dir), err)]) from err
+            dest_exists = bool(remote)
+        except pebble.Error as err:
+            raise MultiPushPullError('failed to sync files', [(str(dest_dir), err)]) from err
+
+        def is_dir(info: pebble.FileInfo) -> bool:
+            return info.type is pebble.FileType.DIRECTORY
+
+        def attributes(info: pebble.FileInfo) -> tuple[Any, ...]:
+            return info.size, info.permissions, info.user_id, info.group_id
+
+        remove: list[PurePath] = []
+        for rel, info in sorted(remote.items()):
+            local_info = local.get(rel)
+            if local_info is None and not delete:
+                continue
+            if local_info is not None and is_dir(local_info) == is_dir(info):
+                continue
+            if not any(parent in remove for parent in rel.parents):
+                remove.append(rel)
+        removed = set(remove)
+
+        def is_current(rel: PurePath) -> bool:
+            return rel in remote and not removed.intersection([rel, *rel.parents])
+
+        dirs: dict[Path, Path] = {} if dest_exists else {dest_dir: source_dir}
+        files: list[tuple[Path, pebble.FileInfo, Path]] = []
+        to_check: dict[str, tuple[Path, pebble.FileInfo]] = {}
+        for rel, info in sorted(local.items()):
+            dstpath = dest_dir / rel
+            if is_dir(info):
+                if not is_current(rel):
+                    dirs[dstpath] = Path(info.path)
+                continue
+            remote_info = remote.get(rel)
+            if (
+                remote_info is None
+                or not is_current(rel)
+                or info.type is not pebble.FileType.FILE
+                or attributes(info) != attributes(remote_info)
+            ):
+                files.append((Path(info.path), info, dstpath))
+            elif checksum:
+                to_check[str(dstpath)] = (dstpath, info)
+            elif info.last_modified.timestamp() > remote_info.last_modified.timestamp():
+                files.append((Path(info.path), info, dstpath))
+
+        if to_check:
+            remote_hashes = self._remote_sha256(list(to_check))
+            for path, (dstpath, info) in to_check.items():
+                try:
+                    local_hash = _sha256_file(info.path)
+                except OSError:
+                    local_hash = None  # push_many will report the error
+                if local_hash is None or remote_hashes.get(path) != local_hash:
+                    files.append((Path(info.path), info, dstpath))
+
+        errors: list[tuple[str, Exception]] = []
+        for rel in remove:
+            try:
+                self.remove_path(dest_dir / rel, recursive=True)
+            except pebble.Error as err:  # noqa: PERF203
+                errors.append((str(dest_dir / rel), err))
+        errors.extend(self._push_listed(dirs, files))
         if errors:
-            raise MultiPushPullError('failed to push one or more files', errors)
+            raise MultiPushPullError('failed to sync one or more files', errors)
+
+        changed = [dest_dir / rel for rel in remove]
+        changed.extend(dirs)
+        changed.extend(dstpath for _, _, dstpath in files)
+        return sorted({str(path) for path in changed})
+
+    _checksum_batch_files = 500
+
+    def _remote_sha256(self, paths: list[str]) -> dict[str, str]:
+        """Return the SHA-256 checksums of the given remote files.
+
+        Files that couldn't be checksummed are left out of the result.
+        """
+        hashes: dict[str, str] = {}
+        for i in range(0, len(paths), self._checksum_batch_files):
+            batch = paths[i : i + self._checksum_batch_files]
+            try:
+                stdout, _ = self.exec(['sha256sum', '--', *batch]).wait_output()
+            except pebble.ExecError as err:
+                # Some files couldn't be read; the output has the rest.
+                stdout = typing.cast('str | None', err.stdout) or ''
+            except pebble.Error as err:
+                logger.debug('Could not checksum remote files, pushing them instead: %s', err)
+                break
+            for line in stdout.splitlines():
+                # Names containing a newline or backslash are escaped, and
+                # the line starts with a backslash; those files are pushed.
+                digest, sep, path = line.partition('  ')
+                if sep and not digest.startswith('\\'):
+                    hashes[path] = digest
+        return hashes
 
     def pull_path(
         self,
         source_path: str | PurePath | Iterable[str | PurePath],
         dest_dir: str | Path,
+        *,
+        max_workers: int = 1,
     ):
         """Recursively pull a remote path or files to the local system.
 
@@ -2998,6 +3724,11 @@ class Container:
                 destination directory.
             dest_dir: Local destination directory inside which the source
                 dir/files will be placed.
+            max_workers: The maximum number of requests to Pebble to run at
+                the same time, each using its own connection. This applies
+                to listing directories as well as pulling files. For trees
+                with many files, a value such as 4 is usually much faster than
+                the default of one request at a time.
         """
         if hasattr(source_path, '__iter__') and not isinstance(source_path, str):
             source_paths = typing.cast('Iterable[str | Path]', source_path)
@@ -3006,22 +3737,90 @@ class Container:
         source_paths = [Path(p) for p in source_paths]
         dest_dir = Path(dest_dir)
 
+        # The errors from each request, in order; the requests may run concurrently.
+        results: list[concurrent.futures.Future[list[tuple[str, Exception]]]] = []
+        # Files are pulled in batches, each batch in a single request to Pebble.
+        batch: list[tuple[Path, str, Path]] = []
+        batch_size = 0
+        with _TransferPool(max_workers) as pool:
+            for source_path in source_paths:
+                try:
+                    for info in Container._list_recursive(self.list_files, source_path, pool):
+                        dstpath = self._build_destpath(info.path, source_path, dest_dir)
+                        if info.type is pebble.FileType.DIRECTORY:
+                            dstpath.mkdir(parents=True, exist_ok=True)
+                            continue
+                        dstpath.parent.mkdir(parents=True, exist_ok=True)
+                        if (info.size or 0) >= self._pull_direct_size:
+                            # Stream large files straight into place, rather than
+                            # spooling them to a temporary file and copying that.
+                            results.append(
+                                pool.submit(self._pull_direct, source_path, info.path, dstpath)
+                            )
+                            continue
+                        batch.append((source_path, info.path, dstpath))
+                        batch_size += info.size or 0
+                        full = len(batch) >= self._pull_batch_files
+                        if full or batch_size >= self._pull_batch_bytes:
+                            results.append(pool.submit(self._pull_batch, batch))
+                            batch, batch_size = [], 0
+                except (OSError, pebble.Error) as err:
+                    results.append(_TransferPool.done([(str(source_path), err)]))
+            results.append(pool.submit(self._pull_batch, batch))
+            errors = [error for result in results for error in result.result()]
+        if errors:
+            raise MultiPushPullError('failed to pull one or more files', errors)
+
+    _pull_batch_files = 64
+    _pull_batch_bytes = 16 * 1024 * 1024
+    _pull_direct_size = 256 * 1024
+
+    def _pull_direct(
+        self, source_path: Path, path: str, dstpath: Path
+    ) -> list[tuple[str, Exception]]:
+        """Pull a single remote file straight to the local path; return any error."""
+        try:
+            self._pebble.pull_to(path, dstpath)
+        except (OSError, pebble.Error) as err:
+            return [(str(source_path), err)]
+        return []
+
+    def _pull_batch(self, batch: list[tuple[Path, str, Path]]) -> list[tuple[str, Exception]]:
+        """Pull a batch of (source_path, remote path, local path) files; return any errors."""
+        if not batch:
+            return []
         errors: list[tuple[str, Exception]] = []
-        for source_path in source_paths:
-            try:
-                for info in Container._list_recursive(self.list_files, source_path):
-                    dstpath = self._build_destpath(info.path, source_path, dest_dir)
-                    if info.type is pebble.FileType.DIRECTORY:
-                        dstpath.mkdir(parents=True, exist_ok=True)
-                        continue
-                    dstpath.parent.mkdir(parents=True, exist_ok=True)
-                    with self.pull(info.path, encoding=None) as src:
+        try:
+            files = self._pebble.pull_many([path for _, path, _ in batch], encoding=None)
+        except pebble.PathError:
+            # At least one of the files can't be pulled: pull them one at a
+            # time so that each error is reported against the right path.
+            for source_path, path, dstpath in batch:
+                try:
+                    with self.pull(path, encoding=None) as src:
                         with dstpath.open(mode='wb') as dst:
                             shutil.copyfileobj(src, dst)
-            except (OSError, pebble.Error) as err:
-                errors.append((str(source_path), err))
-        if errors:
-            raise MultiPushPullError('failed to pull one or more files', errors)
+                except (OSError, pebble.Error) as err:  # noqa: PERF203
+                    errors.append((str(source_path), err))
+            return errors
+        except (OSError, pebble.Error) as err:
+            source_paths = dict.fromkeys(str(source_path) for source_path, _, _ in batch)
+            return [(source_path, err) for source_path in source_paths]
+
+        try:
+            for source_path, path, dstpath in batch:
+                src = files[path]
+                # The same remote file may be pulled to more than one place.
+                src.seek(0)
+                try:
+                    with dstpath.open(mode='wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                except OSError as err:
+                    errors.append((str(source_path), err))
+        finally:
+            for src in files.values():
+                src.close()
+        return errors
 
     @staticmethod
     def _build_fileinfo(path: str | Path) -> pebble.FileInfo:
@@ -3066,7 +3865,9 @@ class Container:
 
     @staticmethod
     def _list_recursive(
-        list_func: Callable[[Path], Iterable[pebble.FileInfo]], path: Path
+        list_func: Callable[[Path], Iterable[pebble.FileInfo]],
+        path: Path,
+        pool: _TransferPool | None = None,
     ) -> Generator[pebble.FileInfo, None, None]:
         """Recursively lists all files under path using the given list_func.
 
@@ -3074,18 +3875,38 @@ class Container:
             list_func: Function taking 1 Path argument that returns a list of FileInfo objects
                 representing files residing directly inside the given path.
             path: Filepath to recursively list.
+            pool: If provided, the subdirectories of each directory are listed
+                using the pool while the directory's entries are yielded.
         """
         if path.name == '*':
             # ignore trailing '/*' that we just use for determining how to build paths
             # at destination
             path = path.parent
 
-        for info in list_func(path):
+        yield from Container._list_entries(list_func, list(list_func(path)), pool)
+
+    @staticmethod
+    def _list_entries(
+        list_func: Callable[[Path], Iterable[pebble.FileInfo]],
+        infos: list[pebble.FileInfo],
+        pool: _TransferPool | None,
+    ) -> Generator[pebble.FileInfo, None, None]:
+        """Yield the given directory entries, recursing into subdirectories."""
+        listings: dict[str, concurrent.futures.Future[list[pebble.FileInfo]]] = {}
+        if pool is not None:
+            for info in infos:
+                if info.type is pebble.FileType.DIRECTORY:
+                    listings[info.path] = pool.submit(
+                        lambda path: list(list_func(path)), Path(info.path)
+                    )
+        for info in infos:
             if info.type is pebble.FileType.DIRECTORY:
                 # Yield the directory to ensure empty directories are created, then
                 # all of the contained files.
                 yield info
-                yield from Container._list_recursive(list_func, Path(info.path))
+                listing = listings.get(info.path)
+                entries = list(list_func(Path(info.path))) if listing is None else listing.result()
+                yield from Container._list_entries(list_func, entries, pool)
             elif info.type in (pebble.FileType.FILE, pebble.FileType.SYMLINK):
                 yield info
             else:
@@ -3342,6 +4163,8 @@ class Container:
     @property
     def pebble(self) -> pebble.Client:
         """The low-level :class:`ops.pebble.Client` instance for this container."""
+        # The client may be used to add layers, so the cached plan can't be trusted.
+        self._plan = None
         return self._pebble
 
 
@@ -3529,6 +4352,29 @@ def _format_action_result_dict(
     return output_
 
 
+# The Pebble clients for this process, by socket path. All the Container objects
+# for a workload share a client, so that they share its pool of connections.
+_pebble_clients: dict[str, pebble.Client] = {}
+
+
+def _get_pebble_client(socket_path: str) -> pebble.Client:
+    """Return the shared Pebble client for the given socket path, creating it if needed."""
+    client = _pebble_clients.get(socket_path)
+    if client is None:
+        # A client doesn't connect until it's used, so if another thread
+        # creates one at the same time, the one that isn't stored is harmless.
+        client = _pebble_clients.setdefault(socket_path, pebble.Client(socket_path=socket_path))
+    return client
+
+
+def _close_pebble_clients():
+    """Close the shared Pebble clients' connections, and forget the clients."""
+    clients = list(_pebble_clients.values())
+    _pebble_clients.clear()
+    for client in clients:
+        client.close()
+
+
 class _ModelBackend:
     """Represents the connection between the Model representation and talking to Juju.
 
@@ -3661,7 +4507,7 @@ class _ModelBackend:
         is_app: bool,
         *,
         relation_name: str | None = None,
-    ) -> _RelationDataContent_Raw:
+    ) -> _RelationDataContent_Raw | _CompactDatabag:
         if not isinstance(is_app, bool):
             raise TypeError('is_app parameter to relation_get must be a boolean')
 
@@ -3678,9 +4524,10 @@ class _ModelBackend:
             unit=member_name,
             app=is_app,
         ):
-            return hookcmds.relation_get(
+            stdout = hookcmds._relation._relation_get_json(
                 relation_id, endpoint=relation_name, unit=member_name, app=is_app
             )
+        return _CompactDatabag.from_json(stdout)
 
     def relation_set(
         self,
@@ -3931,8 +4778,12 @@ class _ModelBackend:
             hookcmds._utils.run(*cmd)
 
     def get_pebble(self, socket_path: str) -> pebble.Client:
-        """Create a pebble.Client instance from given socket path."""
-        return pebble.Client(socket_path=socket_path)
+        """Get the pebble.Client instance for the given socket path.
+
+        The client is shared by everything in this process that uses the same
+        socket path, and is closed when the charm finishes handling the event.
+        """
+        return _get_pebble_client(socket_path)
 
     def planned_units(self) -> int:
         """Count of "planned" units that will run this application.
@@ -4371,3 +5222,8 @@ class CloudSpec:
             skip_tls_verify=o.skip_tls_verify,
             is_controller_cloud=o.is_controller_cloud,
         )
+
+
+# Imported last to break the circular import: ops.charm imports ops.framework,
+# which imports names from this module.
+from . import charm as _charm  # noqa: E402
@@ -31,9 +31,14 @@ For a command-line interface for local testing, see ``test/pebble_cli.py``.
 
 from __future__ import annotations
 
+import asyncio
 import binascii
 import builtins
+import codecs
+import collections
+import concurrent.futures
 import contextlib
+import contextvars
 import copy
 import dataclasses
 import datetime
@@ -46,7 +51,9 @@ import json
 import logging
 import os
 import pathlib
+import re
 import select
+import selectors
 import shutil
 import signal
 import socket
@@ -59,13 +66,14 @@ import urllib.error
 import urllib.parse
 import urllib.request
 import warnings
-from collections.abc import Callable, Generator, Iterable, Mapping, Sequence
+from collections.abc import AsyncGenerator, Callable, Generator, Iterable, Mapping, Sequence
 from typing import (
     IO,
     TYPE_CHECKING,
     Any,
     AnyStr,
     BinaryIO,
+    ClassVar,
     Generic,
     Literal,
     Protocol,
@@ -73,8 +81,6 @@ from typing import (
     TypedDict,
 )
 
-import websocket
-
 from ._private import timeconv, tracer, yaml
 
 # Public as these are used in the Container.add_layer signature
@@ -212,10 +218,10 @@ _ServiceInfoDict = TypedDict(
 
 
 class _BodyHandler(Protocol):
-    def __call__(self, data: bytearray, done: bool = False) -> None: ...
+    def __call__(self, data: memoryview, done: bool = False) -> None: ...
 
 
-_HeaderHandler = Callable[[bytearray], None]
+_HeaderHandler = Callable[[memoryview], None]
 
 # tempfile.NamedTemporaryFile has an odd interface because of that
 # 'name' attribute, so we need to make a Protocol for it.
@@ -224,7 +230,7 @@ _HeaderHandler = Callable[[bytearray], None]
 class _Tempfile(Protocol):
     name = ''
 
-    def write(self, data: bytearray): ...
+    def write(self, data: memoryview): ...
 
     def close(self): ...
 
@@ -339,6 +345,8 @@ if TYPE_CHECKING:
         },
     )
 
+    _LogEntryDict = TypedDict('_LogEntryDict', {'time': str, 'service': str, 'message': str})
+
 
 class _WebSocket(Protocol):
     sock: socket.socket | None
@@ -368,12 +376,15 @@ class _UnixSocketConnection(http.client.HTTPConnection):
     """Implementation of HTTPConnection that connects to a named Unix socket."""
 
     def __init__(
-        self, host: str, socket_path: str, timeout: _NotProvidedFlag | float = _not_provided
+        self,
+        host: str,
+        socket_path: str,
+        timeout: _NotProvidedFlag | float | None = _not_provided,
     ):
         if timeout is _not_provided:
             super().__init__(host)
         else:
-            assert isinstance(timeout, (int, float)), timeout  # type guard for pyright
+            assert timeout is None or isinstance(timeout, (int, float)), timeout  # type guard
             super().__init__(host, timeout=timeout)
         self.socket_path = socket_path
 
@@ -387,20 +398,143 @@ class _UnixSocketConnection(http.client.HTTPConnection):
             self.sock.settimeout(self.timeout)
 
 
+class _PooledResponse(http.client.HTTPResponse):
+    """HTTPResponse that hands its connection back to the pool once the body is consumed."""
+
+    _release: Callable[[bool], None] | None = None
+
+    def _close_conn(self):
+        # Called by http.client once the body has been read to the end, at which
+        # point the connection is ready for the next request.
+        super()._close_conn()  # type: ignore
+        self._done(reusable=True)
+
+    def close(self):
+        if self.fp is not None:
+            # Closed before the body was fully read: the unread remainder would
+            # corrupt the next response, so the connection can't be reused.
+            self._done(reusable=False)
+        super().close()
+
+    def _done(self, reusable: bool):
+        release, self._release = self._release, None
+        if release is not None:
+            release(reusable)
+
+
+def _can_resend(method: str, data: object) -> bool:
+    """Report whether a request may be sent again after its connection was dropped.
+
+    Pebble may have acted on the request before the connection was dropped, so
+    only idempotent requests are sent again, and only if the body can be replayed.
+    """
+    return method in ('GET', 'HEAD') and (data is None or isinstance(data, bytes))
+
+
 class _UnixSocketHandler(urllib.request.AbstractHTTPHandler):
-    """Implementation of HTTPHandler that uses a named Unix socket."""
+    """Implementation of HTTPHandler that uses a named Unix socket.
 
-    def __init__(self, socket_path: str):
+    Connections are kept alive (HTTP/1.1) and reused for later requests. Up to
+    ``max_idle`` idle connections are kept; concurrent callers each get their
+    own connection. If ``max_idle`` is zero, each request uses a new connection
+    that's closed when the response has been read.
+
+    A pooled connection the server has closed in the meantime -- for example,
+    because Pebble restarted along with its container -- is transparently
+    replaced by a new one. If that's only found out after the request was
+    sent, only GET and HEAD requests are sent again.
+    """
+
+    def __init__(self, socket_path: str, max_idle: int = 4):
         super().__init__()
         self.socket_path = socket_path
+        self.max_idle = max_idle
+        self._idle: list[_UnixSocketConnection] = []
+        self._lock = threading.Lock()
 
     def http_open(self, req: urllib.request.Request):
         """Override http_open to use a Unix socket connection (instead of TCP)."""
-        return self.do_open(
-            _UnixSocketConnection,  # type:ignore
-            req,
-            socket_path=self.socket_path,
-        )
+        if self.max_idle <= 0:
+            return self.do_open(
+                _UnixSocketConnection,  # type:ignore
+                req,
+                socket_path=self.socket_path,
+            )
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update({k: v for k, v in req.headers.items() if k not in headers})
+        headers = {name.title(): value for name, value in headers.items()}
+        can_retry = _can_resend(req.get_method(), req.data)
+
+        conn, reused = self._acquire(req.timeout)
+        while True:
+            try:
+                conn.request(
+                    req.get_method(),
+                    req.selector,
+                    req.data,  # type: ignore
+                    headers,
+                    encode_chunked=req.has_header('Transfer-encoding'),
+                )
+                response = typing.cast('_PooledResponse', conn.getresponse())
+            except (BrokenPipeError, ConnectionResetError) as e:
+                # RemoteDisconnected is a ConnectionResetError too.
+                conn.close()
+                if reused and can_retry:
+                    logger.debug('Pebble connection was closed, reconnecting: %s', e)
+                    conn, reused = self._new_connection(req.timeout), False
+                    continue
+                raise urllib.error.URLError(e) from None
+            except OSError as e:
+                conn.close()
+                raise urllib.error.URLError(e) from None
+            break
+
+        response._release = lambda reusable: self._release(conn, reusable)
+        # Match the attributes urllib's do_open sets on the response.
+        response.url = req.get_full_url()
+        response.msg = response.reason  # type: ignore
+        return response
+
+    def _new_connection(self, timeout: float) -> _UnixSocketConnection:
+        conn = _UnixSocketConnection('localhost', self.socket_path, timeout=timeout)  # type: ignore
+        conn.response_class = _PooledResponse
+        return conn
+
+    def _acquire(self, timeout: float) -> tuple[_UnixSocketConnection, bool]:
+        """Return an idle connection if there's a usable one, else a new one."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn = self._idle.pop()
+            sock = conn.sock
+            if sock is not None:
+                # An idle connection should have nothing to read; if it's
+                # readable, the server has closed it (or it's in a bad state).
+                readable, _, _ = select.select([sock], [], [], 0)
+                if readable:
+                    conn.close()
+                    continue
+                sock.settimeout(timeout)
+            conn.timeout = timeout
+            return conn, True
+        return self._new_connection(timeout), False
+
+    def _release(self, conn: _UnixSocketConnection, reusable: bool):
+        if reusable:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    return
+        conn.close()
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
 
 
 def _format_timeout(timeout: float) -> str:
@@ -412,19 +546,6 @@ def _format_timeout(timeout: float) -> str:
     return f'{timeout:.3f}s'
 
 
-def _start_thread(target: Callable[..., Any], *args: Any, **kwargs: Any) -> threading.Thread:
-    """Helper to simplify starting a thread.
-
-    The thread is marked as daemon so that exec I/O threads can never keep
-    the interpreter alive at exit, even when teardown is missed (for
-    example, if wait() is never called and the server holds the websockets
-    open).
-    """
-    thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
-    thread.start()
-    return thread
-
-
 def _force_close_websocket(ws: _WebSocket):
     """Close a websocket so that reads and writes blocked on it unblock.
 
@@ -680,6 +801,8 @@ class Warning:
 class TaskProgress:
     """Task progress object."""
 
+    __slots__ = ('done', 'label', 'total')
+
     def __init__(
         self,
         label: str,
@@ -713,6 +836,18 @@ class TaskID(str):
 class Task:
     """Task object."""
 
+    __slots__ = (
+        '_ready_time',
+        '_spawn_time',
+        'data',
+        'id',
+        'kind',
+        'log',
+        'progress',
+        'status',
+        'summary',
+    )
+
     def __init__(
         self,
         id: TaskID,
@@ -731,28 +866,53 @@ class Task:
         self.status = status
         self.log = log
         self.progress = progress
-        self.spawn_time = spawn_time
-        self.ready_time = ready_time
+        self._spawn_time: datetime.datetime | str = spawn_time
+        self._ready_time: datetime.datetime | str | None = ready_time
         self.data = data or {}
 
+    # Timestamps from from_dict are kept as strings until they're first used,
+    # as parsing them dominates the cost of listing many changes.
+
+    @property
+    def spawn_time(self) -> datetime.datetime:
+        """Time this task was created."""
+        if isinstance(self._spawn_time, str):
+            self._spawn_time = timeconv.parse_rfc3339(self._spawn_time)
+        return self._spawn_time
+
+    @spawn_time.setter
+    def spawn_time(self, spawn_time: datetime.datetime):
+        self._spawn_time = spawn_time
+
+    @property
+    def ready_time(self) -> datetime.datetime | None:
+        """Time this task became ready, or ``None`` if it isn't ready yet."""
+        if isinstance(self._ready_time, str):
+            self._ready_time = timeconv.parse_rfc3339(self._ready_time)
+        return self._ready_time
+
+    @ready_time.setter
+    def ready_time(self, ready_time: datetime.datetime | None):
+        self._ready_time = ready_time
+
     @classmethod
     def from_dict(cls, d: _TaskDict) -> Task:
         """Create new Task object from dict parsed from JSON."""
-        return cls(
+        task = cls(
             id=TaskID(d['id']),
             kind=d['kind'],
             summary=d['summary'],
             status=d['status'],
             log=d.get('log') or [],
             progress=TaskProgress.from_dict(d['progress']),
-            spawn_time=timeconv.parse_rfc3339(d['spawn-time']),
-            ready_time=(
-                timeconv.parse_rfc3339(d['ready-time'])  # type: ignore
-                if d.get('ready-time')
-                else None
-            ),
+            spawn_time=datetime.datetime.min,
+            ready_time=None,
             data=d.get('data') or {},
         )
+        # Parsed lazily by the spawn_time and ready_time properties.
+        task._spawn_time = d['spawn-time']
+        task._ready_time = d.get('ready-time') or None
+        return task
 
     def __repr__(self):
         return (
@@ -779,6 +939,19 @@ class ChangeID(str):
 class Change:
     """Change object."""
 
+    __slots__ = (
+        '_ready_time',
+        '_spawn_time',
+        'data',
+        'err',
+        'id',
+        'kind',
+        'ready',
+        'status',
+        'summary',
+        'tasks',
+    )
+
     def __init__(
         self,
         id: ChangeID,
@@ -799,14 +972,39 @@ class Change:
         self.tasks = tasks
         self.ready = ready
         self.err = err
-        self.spawn_time = spawn_time
-        self.ready_time = ready_time
+        self._spawn_time: datetime.datetime | str = spawn_time
+        self._ready_time: datetime.datetime | str | None = ready_time
         self.data = data or {}
 
+    # Timestamps from from_dict are kept as strings until they're first used,
+    # as parsing them dominates the cost of listing many changes.
+
+    @property
+    def spawn_time(self) -> datetime.datetime:
+        """Time this change was created."""
+        if isinstance(self._spawn_time, str):
+            self._spawn_time = timeconv.parse_rfc3339(self._spawn_time)
+        return self._spawn_time
+
+    @spawn_time.setter
+    def spawn_time(self, spawn_time: datetime.datetime):
+        self._spawn_time = spawn_time
+
+    @property
+    def ready_time(self) -> datetime.datetime | None:
+        """Time this change became ready, or ``None`` if it isn't ready yet."""
+        if isinstance(self._ready_time, str):
+            self._ready_time = timeconv.parse_rfc3339(self._ready_time)
+        return self._ready_time
+
+    @ready_time.setter
+    def ready_time(self, ready_time: datetime.datetime | None):
+        self._ready_time = ready_time
+
     @classmethod
     def from_dict(cls, d: _ChangeDict) -> Change:
         """Create new Change object from dict parsed from JSON."""
-        return cls(
+        change = cls(
             id=ChangeID(d['id']),
             kind=d['kind'],
             summary=d['summary'],
@@ -814,14 +1012,14 @@ class Change:
             tasks=[Task.from_dict(t) for t in d.get('tasks') or []],
             ready=d['ready'],
             err=d.get('err'),
-            spawn_time=timeconv.parse_rfc3339(d['spawn-time']),
-            ready_time=(
-                timeconv.parse_rfc3339(d['ready-time'])  # type: ignore
-                if d.get('ready-time')
-                else None
-            ),
+            spawn_time=datetime.datetime.min,
+            ready_time=None,
             data=d.get('data') or {},
         )
+        # Parsed lazily by the spawn_time and ready_time properties.
+        change._spawn_time = d['spawn-time']
+        change._ready_time = d.get('ready-time') or None
+        return change
 
     def __repr__(self):
         return (
@@ -918,6 +1116,43 @@ class Plan:
             return self.to_dict() == other.to_dict()
         return NotImplemented
 
+    def _with_layer(self, layer: Layer) -> Plan | None:
+        """Return a copy of this plan with layer added on top, following Pebble's override rules.
+
+        Returns None if the result can't be worked out locally, for example
+        because an item in the layer has a missing or invalid ``override``.
+        """
+        plan = Plan(copy.deepcopy(self.to_dict()))
+        for existing, added in (
+            (plan.services, layer.services),
+            (plan.checks, layer.checks),
+            (plan.log_targets, layer.log_targets),
+        ):
+            for name, original in added.items():
+                item = copy.deepcopy(original)
+                if item.override == 'merge' and name in existing:
+                    existing[name]._merge(item)  # type: ignore
+                elif item.override in ('merge', 'replace'):
+                    existing[name] = item  # type: ignore
+                else:
+                    return None
+        return plan
+
+    def _same_config(self, other: Plan) -> bool:
+        """Report whether two plans configure the same things, ignoring override fields."""
+
+        def config(plan: Plan) -> dict[str, dict[str, dict[str, Any]]]:
+            result: dict[str, dict[str, dict[str, Any]]] = {}
+            for section, items in plan.to_dict().items():
+                items = typing.cast('dict[str, dict[str, Any]]', items)
+                result[section] = {
+                    name: {k: v for k, v in item.items() if k != 'override'}
+                    for name, item in items.items()
+                }
+            return result
+
+        return config(self) == config(other)
+
 
 class Layer:
     """Represents a Pebble configuration layer.
@@ -1088,6 +1323,8 @@ class ServiceStatus(enum.Enum):
 class ServiceInfo:
     """Service status information."""
 
+    __slots__ = ('current', 'name', 'startup')
+
     def __init__(
         self,
         name: str,
@@ -1506,6 +1743,17 @@ class CheckInfo:
     to drive health checks.
     """
 
+    __slots__ = (
+        'change_id',
+        'failures',
+        'level',
+        'name',
+        'startup',
+        'status',
+        'successes',
+        'threshold',
+    )
+
     def __init__(
         self,
         name: str,
@@ -1612,6 +1860,7 @@ class ChangeKind(enum.Enum):
     START = 'start'
     STOP = 'stop'
     RESTART = 'restart'
+    AUTOSTART = 'autostart'
     REPLAN = 'replan'
     EXEC = 'exec'
     RECOVER_CHECK = 'recover-check'
@@ -1721,6 +1970,88 @@ class Notice:
         )
 
 
+@dataclasses.dataclass(frozen=True, order=True)
+class NoticeCursor:
+    """A position in Pebble's notices, for :meth:`Client.wait_notices`.
+
+    Pebble records notice times with nanosecond precision, but
+    :class:`datetime.datetime` only has microsecond precision, so a position
+    taken from :attr:`Notice.last_repeated` could return the same notice
+    again. A cursor keeps the full precision.
+
+    ``str(cursor)`` is the cursor as an RFC 3339 timestamp, which
+    :meth:`from_rfc3339` converts back, for example, to store the cursor
+    between hooks.
+    """
+
+    timestamp_ns: int
+    """Nanoseconds since the Unix epoch; notices last repeated after this time are new."""
+
+    @classmethod
+    def from_rfc3339(cls, s: str) -> NoticeCursor:
+        """Create a cursor from an RFC 3339 timestamp, keeping up to nanosecond precision."""
+        return cls(timeconv.parse_rfc3339_ns(s))
+
+    @classmethod
+    def from_datetime(cls, dt: datetime.datetime) -> NoticeCursor:
+        """Create a cursor from a datetime (a naive datetime is in local time)."""
+        epoch = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+        delta = dt.astimezone(datetime.timezone.utc) - epoch
+        return cls(delta // datetime.timedelta(microseconds=1) * 1000)
+
+    def __str__(self) -> str:
+        return timeconv.format_rfc3339_ns(self.timestamp_ns)
+
+
+@dataclasses.dataclass(frozen=True)
+class LogEntry:
+    """A single line of a service's output, as returned by :meth:`Client.get_logs`."""
+
+    time: datetime.datetime
+    """The time that the service wrote the line."""
+
+    service: str
+    """The name of the service that wrote the line."""
+
+    message: str
+    """The line that the service wrote, including the trailing newline, if any."""
+
+    @classmethod
+    def from_dict(cls, d: _LogEntryDict) -> LogEntry:
+        """Create new LogEntry object from dict parsed from JSON."""
+        return cls(
+            time=timeconv.parse_rfc3339(d['time']),
+            service=d['service'],
+            message=d['message'],
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class PushSource:
+    """The content of a file to write with :meth:`Client.push_many`, and its metadata.
+
+    Metadata fields that are None use the value passed to :meth:`Client.push_many`.
+    """
+
+    source: str | bytes | BinaryIO | TextIO
+    """The data to write, as for :meth:`Client.push`."""
+
+    permissions: int | None = None
+    """Permissions (mode) to create the file with."""
+
+    user_id: int | None = None
+    """User ID (UID) for the file."""
+
+    user: str | None = None
+    """Username for the file."""
+
+    group_id: int | None = None
+    """Group ID (GID) for the file."""
+
+    group: str | None = None
+    """Group name for the file."""
+
+
 class ExecProcess(Generic[AnyStr]):
     """Represents a process started by :meth:`Client.exec`.
 
@@ -1729,6 +2060,10 @@ class ExecProcess(Generic[AnyStr]):
     attributes directly. Alternatively, users can pass stdin/stdout/stderr to
     :meth:`Client.exec`.
 
+    No background threads are started: the process's input and output are
+    transferred by whichever thread is waiting on it, in :meth:`wait` or
+    :meth:`wait_output`, or reading from or writing to the streams above.
+
     This class should not be instantiated directly, only via
     :meth:`Client.exec`.
     """
@@ -1771,9 +2106,7 @@ class ExecProcess(Generic[AnyStr]):
         command: list[str],
         encoding: str | None,
         change_id: ChangeID,
-        cancel_stdin: Callable[[], None] | None,
-        cancel_reader: int | None,
-        threads: list[threading.Thread],
+        exec_io: _ExecIO,
     ):
         self.stdin = stdin
         self.stdout = stdout
@@ -1786,9 +2119,7 @@ class ExecProcess(Generic[AnyStr]):
         self._command = command
         self._encoding = encoding
         self._change_id = change_id
-        self._cancel_stdin = cancel_stdin
-        self._cancel_reader = cancel_reader
-        self._threads = threads
+        self._io = exec_io
         self._waited = False
 
     def __del__(self):
@@ -1811,41 +2142,33 @@ class ExecProcess(Generic[AnyStr]):
             if exit_code != 0:
                 raise ExecError(self._command, exit_code, None, None)
 
-    def _wait(self) -> int:
+    def _wait(self, *, read_output: bool = False) -> int:
         self._waited = True
         timeout = self._timeout
+        deadline = None
         if timeout is not None:
             # A bit more than the command timeout to ensure that happens first
             timeout += 1
+            deadline = time.time() + timeout
         try:
+            # Transfer the process's I/O until Pebble has sent all of its
+            # output, then wait for the change (which is then done or about
+            # to be) to pick up the exit code.
+            if not self._io.finish(read_output=read_output, deadline=deadline):
+                raise TimeoutError(
+                    f'timed out waiting for change {self._change_id} ({timeout} seconds)'
+                )
+            if deadline is not None:
+                timeout = max(deadline - time.time(), 0)
             change = self._client.wait_change(self._change_id, timeout=timeout)
         except BaseException:
             # The wait failed or was interrupted, for example because the
-            # change didn't finish before the client-side timeout above. The
-            # I/O threads may still be blocked on their websockets, so tear
-            # the connections down to unblock them, and reap the threads
-            # before propagating the error, otherwise they're left running
-            # and at interpreter shutdown block the join of non-daemon
-            # threads (#2556).
+            # change didn't finish before the client-side timeout above, so
+            # tear the connections down before propagating the error (#2556).
             self._teardown_after_error()
             raise
 
-        # If stdin reader thread is running, stop it
-        if self._cancel_stdin is not None:
-            self._cancel_stdin()
-            self._cancel_stdin = None
-
-        # Wait for all threads to finish (e.g., message barrier sent)
-        for thread in self._threads:
-            thread.join()
-
-        # If we opened a cancel_reader pipe, close the read side now (write
-        # side was already closed by _cancel_stdin()). Clear it afterwards so
-        # that a second call to _wait() (e.g. wait() then wait_output()) can't
-        # close the same fd again, matching _teardown_after_error().
-        if self._cancel_reader is not None:
-            os.close(self._cancel_reader)
-            self._cancel_reader = None
+        self._io.close()
 
         # Close websockets (shutdown doesn't send CLOSE message or wait for response).
         self._control_ws.shutdown()
@@ -1862,34 +2185,15 @@ class ExecProcess(Generic[AnyStr]):
         return exit_code
 
     def _teardown_after_error(self):
-        # If stdin reader thread is running, stop it.
-        if self._cancel_stdin is not None:
-            self._cancel_stdin()
-            self._cancel_stdin = None
-
-        # Unlike the success path, close the websockets before joining the
-        # I/O threads: the server hasn't finished the exec, so the threads
-        # are still blocked reading from the websockets and would never
-        # finish on their own.
+        # Unlike the success path, the server hasn't finished the exec, so
+        # shut the connections down rather than just closing our end, so
+        # that any other thread blocked reading from them is woken up.
+        self._io.close()
         _force_close_websocket(self._control_ws)
         _force_close_websocket(self._stdio_ws)
         if self._stderr_ws is not None:
             _force_close_websocket(self._stderr_ws)
 
-        for thread in self._threads:
-            # With the websockets closed the threads exit almost immediately;
-            # the timeout is belt-and-braces (they're daemon threads, so even
-            # a leak here can't block interpreter shutdown).
-            thread.join(timeout=1.0)
-            if thread.is_alive():
-                logger.warning('exec I/O thread did not finish after error in wait')
-
-        # If we opened a cancel_reader pipe, close the read side now (write
-        # side was already closed by _cancel_stdin()).
-        if self._cancel_reader is not None:
-            os.close(self._cancel_reader)
-            self._cancel_reader = None
-
     def wait_output(self) -> tuple[AnyStr, AnyStr | None]:
         """Wait for the process to finish and return tuple of (stdout, stderr).
 
@@ -1916,14 +2220,12 @@ class ExecProcess(Generic[AnyStr]):
                 out = io.BytesIO()
                 err = io.BytesIO() if self.stderr is not None else None
 
-            t = _start_thread(shutil.copyfileobj, self.stdout, out)
-            self._threads.append(t)
+            exit_code: int = self._wait(read_output=True)
 
+            # All the output has been received, so this doesn't block.
+            shutil.copyfileobj(self.stdout, out)
             if self.stderr is not None:
-                t = _start_thread(shutil.copyfileobj, self.stderr, err)
-                self._threads.append(t)
-
-            exit_code: int = self._wait()
+                shutil.copyfileobj(self.stderr, err)
 
             out_value = typing.cast('AnyStr', out.getvalue())
             err_value = typing.cast('AnyStr', err.getvalue()) if err is not None else None
@@ -1932,6 +2234,84 @@ class ExecProcess(Generic[AnyStr]):
 
             return (out_value, err_value)
 
+    def iter_chunks(self, size: int = 64 * 1024) -> Generator[AnyStr, None, None]:
+        """Yield the process's standard output as it arrives, then wait for the process to finish.
+
+        Unlike :meth:`wait_output`, the output isn't accumulated in memory:
+        it's only received from Pebble as the chunks are consumed, so a slow
+        consumer slows the process down rather than output building up.
+
+        If the stderr argument wasn't passed to :meth:`Client.exec` and
+        ``combine_stderr`` was ``False``, the process's standard error is
+        collected in memory while iterating, and is included in the
+        :class:`ExecError` if the process exits with a non-zero exit code.
+
+        The process is only waited on once all of its output has been
+        consumed. To stop iterating early, call :meth:`wait_output` to
+        receive the rest of the output and wait for the process.
+
+        Args:
+            size: Maximum size of each chunk, in bytes (or characters, if an
+                encoding was passed to :meth:`Client.exec`).
+
+        Raises:
+            ChangeError: if there was an error starting or running the process.
+            ExecError: if the process exits with a non-zero exit code.
+            TypeError: if :meth:`Client.exec` was called with the ``stdout`` argument.
+        """
+        if self.stdout is None:
+            raise TypeError(
+                "can't use iter_chunks() when exec was called with the stdout argument; "
+                'use wait() instead'
+            )
+        if self.stderr is not None:
+            # Don't let the process block on writing to stderr while we're
+            # only reading stdout.
+            self._io.stream(typing.cast('_WebSocket', self._stderr_ws)).background = True
+
+        # Read from the underlying reader rather than through TextIOWrapper,
+        # which blocks until it has read size characters.
+        reader = typing.cast('_WebsocketReader', getattr(self.stdout, 'buffer', self.stdout))
+        decoder = None
+        if self._encoding is not None:
+            decoder = codecs.getincrementaldecoder(self._encoding)()
+        while True:
+            data = typing.cast('bytes', reader.read1(size))
+            if decoder is None:
+                if not data:
+                    break
+                yield typing.cast('AnyStr', data)
+                continue
+            text = decoder.decode(data, final=not data)
+            if text:
+                yield typing.cast('AnyStr', text)
+            if not data:
+                break
+
+        with self._client._start_span('pebble wait'):
+            exit_code = self._wait(read_output=True)
+            if exit_code != 0:
+                err = None
+                if self.stderr is not None:
+                    err = typing.cast('AnyStr', self.stderr.read())
+                raise ExecError[AnyStr](self._command, exit_code, None, err)
+
+    def iter_lines(self) -> Generator[AnyStr, None, None]:
+        r"""Yield each line of the process's standard output, then wait for the process to finish.
+
+        Lines are yielded as they arrive, without their trailing newline. Only
+        the newline character is removed, so a line ending in ``\r\n`` keeps its
+        ``\r``. See :meth:`iter_chunks` for details, which this uses to read
+        the output.
+
+        Raises:
+            ChangeError: if there was an error starting or running the process.
+            ExecError: if the process exits with a non-zero exit code.
+            TypeError: if :meth:`Client.exec` was called with the ``stdout`` argument.
+        """
+        newline = typing.cast('AnyStr', '\n' if self._encoding is not None else b'\n')
+        yield from _split_lines(self.iter_chunks(), newline)
+
     def send_signal(self, sig: int | str):
         """Send the given signal to the running process.
 
@@ -1951,6 +2331,27 @@ class ExecProcess(Generic[AnyStr]):
             self._control_ws.send(msg)
 
 
+def _split_lines(chunks: Iterable[AnyStr], newline: AnyStr) -> Generator[AnyStr, None, None]:
+    """Yield the lines in chunks of output, without their trailing newline.
+
+    Each chunk is only searched once, and the parts of a line that span
+    several chunks are only joined once the line is complete.
+    """
+    empty = newline[:0]
+    pending: list[AnyStr] = []
+    for chunk in chunks:
+        start = 0
+        while (end := chunk.find(newline, start)) >= 0:
+            pending.append(chunk[start:end])
+            yield empty.join(pending)
+            pending.clear()
+            start = end + len(newline)
+        if start < len(chunk):
+            pending.append(chunk[start:])
+    if pending:
+        yield empty.join(pending)
+
+
 def _has_fileno(f: Any) -> bool:
     """Return ``True`` if the file-like object has a valid fileno() method."""
     try:
@@ -1962,51 +2363,412 @@ def _has_fileno(f: Any) -> bool:
         return False
 
 
-def _reader_to_websocket(
-    reader: _WebsocketReader,
-    ws: _WebSocket,
-    encoding: str,
-    cancel_reader: int | None = None,
-    bufsize: int = 16 * 1024,
-):
-    """Read reader through to EOF and send each chunk read to the websocket."""
-    try:
-        while True:
-            if cancel_reader is not None:
-                # Wait for either a read to be ready or the caller to cancel stdin.
-                # If the reader is also ready, drain it first so a cancel that
-                # arrives before this thread runs doesn't drop pending input.
-                result = select.select([cancel_reader, reader], [], [])
-                if reader not in result[0]:
-                    break
+_END_MESSAGE = '{"command":"end"}'  # Sent as a TEXT frame to signal EOF.
+
+# Flag to make a socket send() return rather than block if the socket's
+# buffer is full (websocket-client's own send methods always block).
+_MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+
+
+class _ExecStream:
+    """The state of one of an exec's websockets, as multiplexed by :class:`_ExecIO`."""
+
+    def __init__(self, ws: _WebSocket):
+        self.ws = ws
+
+        # Output from the process: if receiving is true, each message is
+        # written to writer if that's set, otherwise buffered in chunks for
+        # a _WebsocketReader. Unless background is true, output for a reader
+        # is only received while it's waiting for it.
+        self.receiving = False
+        self.writer: IO[Any] | None = None
+        self.encoding: str | None = None
+        self.chunks: collections.deque[bytes] = collections.deque()
+        self.background = False
+        self.eof = False
+
+        # Input for the process: messages queued by a _WebsocketWriter or
+        # read from source, and the unsent part of the frame being sent.
+        self.source: IO[Any] | None = None
+        self.source_encoding = 'utf-8'
+        self.source_selectable = False
+        self.outgoing: collections.deque[str | bytes] = collections.deque()
+        self.outgoing_size = 0
+        self.frame = memoryview(b'')
+        self.send_failed = False
+
+    @property
+    def sending(self) -> bool:
+        return bool(self.outgoing or self.frame)
+
+
+class _ExecIO:
+    """Single-threaded I/O for the websockets of a process started by :meth:`Client.exec`.
+
+    Rather than a thread per stream, a selector multiplexes the websockets
+    (and stdin, if it was passed to exec and can be selected on). The I/O is
+    done by whichever thread is blocked waiting on the process, in
+    :meth:`run_until`: if several threads are waiting, for example one
+    writing to stdin and another reading stdout, one of them does the I/O
+    for all of them while the others wait for it to make progress.
+    """
+
+    _bufsize = 16 * 1024
+    _high_water = 64 * 1024  # Don't queue more than this much input per websocket.
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._streams: dict[_WebSocket, _ExecStream] = {}
+        # Created on first use, so a process that's never waited on has
+        # nothing to release.
+        self._selector: selectors.BaseSelector | None = None
+        self._registered: dict[Any, int] = {}
+        # Used to wake up the thread blocked in select() when another thread
+        # has queued input or is waiting for output.
+        self._wake_reader: socket.socket | None = None
+        self._wake_writer: socket.socket | None = None
+        self._wanted: collections.Counter[_ExecStream] = collections.Counter()
+        self._polling = False
+        self.closed = False
+
+    def __del__(self):
+        # For example, if the process was never waited on.
+        if not self._polling:
+            self._release()
+
+    def stream(self, ws: _WebSocket) -> _ExecStream:
+        """Return the stream for the given websocket, adding it if needed."""
+        stream = self._streams.get(ws)
+        if stream is None:
+            stream = self._streams[ws] = _ExecStream(ws)
+        return stream
+
+    def add_output(
+        self, ws: _WebSocket, writer: IO[Any] | None = None, encoding: str | None = None
+    ) -> _ExecStream:
+        """Receive the process's output from ws, writing it to writer if set."""
+        stream = self.stream(ws)
+        stream.receiving = True
+        stream.writer = writer
+        stream.encoding = encoding
+        return stream
+
+    def add_input(self, ws: _WebSocket, source: IO[Any], encoding: str | None):
+        """Send source through to EOF to ws, as the process's input."""
+        stream = self.stream(ws)
+        stream.source = source
+        if encoding is not None:
+            stream.source_encoding = encoding
+        # Readers without a file descriptor (like io.BytesIO) are always
+        # "ready"; regular files are too, and are rejected by some selectors.
+        stream.source_selectable = _has_fileno(source)
+
+    def send(self, stream: _ExecStream, message: str | bytes):
+        """Send a message to the websocket, blocking until it has been sent."""
+        with self._cond:
+            self._queue(stream, message)
+        self.run_until(lambda: not stream.sending or stream.send_failed)
+
+    def finish(self, *, read_output: bool, deadline: float | None) -> bool:
+        """Do the process's I/O until Pebble has sent all its output.
+
+        Output for a :class:`_WebsocketReader` is only received (and
+        buffered) if read_output is true, otherwise it's left for the caller
+        to read. If there's no output to receive, this sends all of the
+        process's input.
+
+        Returns False if the deadline was reached first.
+        """
+        outputs = [s for s in self._streams.values() if s.receiving and (read_output or s.writer)]
+        if outputs:
+            return self.run_until(lambda: all(s.eof for s in outputs), outputs, deadline)
+        inputs = list(self._streams.values())
+        return self.run_until(
+            lambda: all(s.send_failed or (s.source is None and not s.sending) for s in inputs),
+            (),
+            deadline,
+        )
+
+    def run_until(
+        self,
+        done: Callable[[], bool],
+        wanted: Iterable[_ExecStream] = (),
+        deadline: float | None = None,
+    ) -> bool:
+        """Do I/O until done() returns true, the deadline is reached, or this is closed.
+
+        Output is received for the wanted streams (and streams with a writer),
+        and input is sent for all streams.
+
+        Returns False if the deadline was reached first.
+        """
+        with self._cond:
+            self._wanted.update(wanted)
+            try:
+                if self._polling:
+                    self._wake()
+                while not done() and not self.closed:
+                    timeout = None
+                    if deadline is not None:
+                        timeout = deadline - time.time()
+                        if timeout <= 0:
+                            return False
+                    if self._polling:
+                        # Another thread is doing the I/O, wait for it to make progress.
+                        if not self._cond.wait(timeout):
+                            return done()
+                        continue
+                    self._polling = True
+                    try:
+                        progressed = self._step(timeout)
+                    finally:
+                        self._polling = False
+                        if self.closed:
+                            self._release()
+                        self._cond.notify_all()
+                    if not progressed and timeout is not None:
+                        return done()  # Timed out waiting for I/O.
+                return True
+            finally:
+                self._wanted.subtract(wanted)
+
+    def close(self):
+        """Stop doing I/O and release the selector; waiting threads return immediately."""
+        with self._cond:
+            if self.closed:
+                return
+            self.closed = True
+            if self._polling:
+                # The polling thread will release the resources when it's done.
+                self._wake()
+            else:
+                self._release()
+            self._cond.notify_all()
+
+    def _release(self):
+        if self._selector is not None:
+            self._selector.close()
+        if self._wake_reader is not None:
+            self._wake_reader.close()
+        if self._wake_writer is not None:
+            self._wake_writer.close()
+
+    def _wake(self):
+        if self._wake_writer is None:
+            return
+        try:
+            self._wake_writer.send(b'\0')
+        except OSError:
+            pass  # The buffer is full, so a wakeup is already pending.
+
+    def _step(self, timeout: float | None) -> bool:
+        """Do one round of I/O, waiting at most timeout for any to be ready.
+
+        Called with the lock held, which is released while waiting. Returns
+        False if no I/O was done.
+        """
+        if self._selector is None:
+            self._selector = selectors.DefaultSelector()
+            self._wake_reader, self._wake_writer = socket.socketpair()
+            self._wake_reader.setblocking(False)
+            self._wake_writer.setblocking(False)
+        progressed = False
+        interest: dict[Any, tuple[_ExecStream | None, int]] = {
+            self._wake_reader: (None, selectors.EVENT_READ),
+        }
+        for stream in self._streams.values():
+            if stream.source is not None and not stream.source_selectable:
+                progressed |= self._read_source(stream)
+            receive = (
+                stream.receiving
+                and not stream.eof
+                and (stream.writer is not None or stream.background or self._wanted[stream] > 0)
+            )
+            send = stream.sending and not stream.send_failed
+            sock = stream.ws.sock
+            if sock is None:
+                # Not backed by a socket that can be selected on, so fall back
+                # to the websocket's blocking methods.
+                if send:
+                    self._send_blocking(stream)
+                    progressed = True
+                if receive:
+                    self._receive(stream)
+                    progressed = True
+            else:
+                events = 0
+                if receive:
+                    events |= selectors.EVENT_READ
+                if send:
+                    events |= selectors.EVENT_WRITE
+                if events:
+                    interest[sock] = (stream, events)
+            if (
+                stream.source is not None
+                and stream.source_selectable
+                and stream.outgoing_size < self._high_water
+            ):
+                interest[stream.source] = (stream, selectors.EVENT_READ)
+
+        for fileobj in list(self._registered):
+            if fileobj not in interest:
+                self._selector.unregister(fileobj)
+                del self._registered[fileobj]
+        for fileobj, (stream, events) in interest.items():
+            registered = self._registered.get(fileobj)
+            if registered == events:
+                continue
+            try:
+                if registered is None:
+                    self._selector.register(fileobj, events)
+                else:
+                    self._selector.modify(fileobj, events)
+            except (OSError, ValueError) as e:
+                assert stream is not None
+                if fileobj is stream.source:
+                    # For example, epoll doesn't support regular files.
+                    stream.source_selectable = False
+                else:
+                    logger.debug('exec websocket closed: %s', e)
+                    stream.eof = True
+                    self._send_failed(stream, e)
+                self._registered.pop(fileobj, None)
+                progressed = True
+                continue
+            self._registered[fileobj] = events
+
+        self._cond.release()
+        try:
+            ready = self._selector.select(0 if progressed else timeout)
+        finally:
+            self._cond.acquire()
+
+        for key, mask in ready:
+            if key.fileobj is self._wake_reader:
+                self._drain_wakeups()
+                continue
+            stream, _ = interest[key.fileobj]
+            assert stream is not None
+            if key.fileobj is stream.source:
+                self._read_source(stream, once=True)
+                continue
+            if mask & selectors.EVENT_WRITE:
+                self._send_nonblocking(stream)
+            if mask & selectors.EVENT_READ:
+                self._receive(stream)
+        return progressed or bool(ready)
+
+    def _drain_wakeups(self):
+        assert self._wake_reader is not None
+        try:
+            while self._wake_reader.recv(4096):
+                pass
+        except OSError:
+            pass  # Nothing more to read.
 
-            chunk = reader.read(bufsize)
+    def _queue(self, stream: _ExecStream, message: str | bytes):
+        if stream.send_failed:
+            return
+        stream.outgoing.append(message)
+        stream.outgoing_size += len(message)
+
+    def _read_source(self, stream: _ExecStream, once: bool = False) -> bool:
+        """Read from stream's source and queue what's read; return True if anything was."""
+        source = stream.source
+        read = False
+        while source is not None and stream.outgoing_size < self._high_water:
+            try:
+                chunk = getattr(source, 'read1', source.read)(self._bufsize)
+            except OSError as e:
+                logger.debug('exec stdin forwarder stopped: %s', e)
+                stream.source = None
+                return True
+            read = True
             if not chunk:
+                self._queue(stream, _END_MESSAGE)
+                stream.source = None
                 break
             if isinstance(chunk, str):
-                chunk = chunk.encode(encoding)
-            ws.send_binary(chunk)
+                chunk = chunk.encode(stream.source_encoding)
+            self._queue(stream, chunk)
+            if once:
+                break
+        return read
 
-        ws.send('{"command":"end"}')  # Send "end" command as TEXT frame to signal EOF
-    except (websocket.WebSocketException, OSError) as e:
-        # The websocket or cancel pipe was closed underneath us (for example,
-        # because the exec failed and ExecProcess._wait tore the connection
-        # down), so there's nowhere to send the rest of the input to.
-        logger.debug('exec stdin forwarder stopped: %s', e)
+    def _send_blocking(self, stream: _ExecStream):
+        while stream.outgoing:
+            message = stream.outgoing.popleft()
+            stream.outgoing_size -= len(message)
+            try:
+                if isinstance(message, str):
+                    stream.ws.send(message)
+                else:
+                    stream.ws.send_binary(message)
+            except Exception as e:
+                self._send_failed(stream, e)
+                return
 
+    def _send_nonblocking(self, stream: _ExecStream):
+        import websocket
+
+        while True:
+            if not stream.frame:
+                if not stream.outgoing:
+                    return
+                message = stream.outgoing.popleft()
+                stream.outgoing_size -= len(message)
+                opcode = (
+                    websocket.ABNF.OPCODE_TEXT
+                    if isinstance(message, str)
+                    else websocket.ABNF.OPCODE_BINARY
+                )
+                frame = websocket.ABNF.create_frame(message, opcode)
+                stream.frame = memoryview(frame.format())
+            sock = stream.ws.sock
+            try:
+                if sock is None:
+                    raise websocket.WebSocketConnectionClosedException('socket is already closed.')
+                sent = sock.send(stream.frame, _MSG_DONTWAIT)
+            except BlockingIOError:
+                return  # Wait until the socket is writable again.
+            except Exception as e:
+                self._send_failed(stream, e)
+                return
+            stream.frame = stream.frame[sent:]
+
+    def _send_failed(self, stream: _ExecStream, e: Exception):
+        import websocket
+
+        # The websocket was closed underneath us (for example, because the
+        # exec failed and ExecProcess._wait tore the connection down), so
+        # there's nowhere to send the rest of the input to.
+        if isinstance(e, (websocket.WebSocketException, OSError)):
+            logger.debug('exec input stream closed: %s', e)
+        else:
+            logger.warning('Error sending exec input: %s', e)
+        stream.send_failed = True
+        stream.source = None
+        stream.outgoing.clear()
+        stream.outgoing_size = 0
+        stream.frame = memoryview(b'')
+
+    def _receive(self, stream: _ExecStream):
+        """Receive a message from the websocket, handling it as process output."""
+        import websocket
 
-def _websocket_to_writer(ws: _WebSocket, writer: _WebsocketWriter, encoding: str | None):
-    """Receive messages from websocket (until end signal) and write to writer."""
-    while True:
         try:
-            chunk = ws.recv()
-        except (websocket.WebSocketException, OSError) as e:
+            chunk = stream.ws.recv()
+        except Exception as e:
             # The websocket was closed underneath us (for example, because
             # the exec failed and ExecProcess._wait tore the connection
-            # down): treat it as end-of-stream rather than crashing the
-            # thread.
-            logger.debug('exec output forwarder stopped: %s', e)
-            break
+            # down): treat it as end-of-file. The error that caused the
+            # teardown is reported by wait()/wait_output().
+            if isinstance(e, (websocket.WebSocketException, OSError)):
+                logger.debug('exec output stream closed: %s', e)
+            else:
+                logger.warning('Error receiving exec output: %s', e)
+            stream.eof = True
+            return
 
         if isinstance(chunk, str):
             try:
@@ -2014,25 +2776,31 @@ def _websocket_to_writer(ws: _WebSocket, writer: _WebsocketWriter, encoding: str
             except ValueError:
                 # Garbage sent, try to keep going
                 logger.warning('Cannot decode I/O command (invalid JSON)')
-                continue
+                return
             command = payload.get('command')
             if command != 'end':
                 # A command we don't recognize, keep going
                 logger.warning('Invalid I/O command %r', command)
-                continue
-            # Received "end" command (EOF signal), stop thread
-            break
+                return
+            # Received "end" command (EOF signal)
+            stream.eof = True
+            return
 
-        if encoding is not None:
-            chunk = chunk.decode(encoding)
-        writer.write(chunk)
+        if stream.writer is None:
+            stream.chunks.append(chunk)
+        elif stream.encoding is not None:
+            stream.writer.write(chunk.decode(stream.encoding))
+        else:
+            stream.writer.write(chunk)
 
 
 class _WebsocketWriter(io.BufferedIOBase):
     """A writable file-like object that sends what's written to it to a websocket."""
 
-    def __init__(self, ws: _WebSocket):
+    def __init__(self, ws: _WebSocket, exec_io: _ExecIO | None = None):
         self.ws = ws
+        self._io = exec_io if exec_io is not None else _ExecIO()
+        self._stream = self._io.stream(ws)
 
     def writable(self):
         """Denote this file-like object as writable."""
@@ -2042,7 +2810,7 @@ class _WebsocketWriter(io.BufferedIOBase):
         """Write chunk to the websocket."""
         if not isinstance(chunk, bytes):
             raise TypeError(f'value to write must be bytes, not {type(chunk).__name__}')
-        self.ws.send_binary(chunk)
+        self._io.send(self._stream, chunk)
         return len(chunk)
 
     def close(self):
@@ -2058,18 +2826,17 @@ class _WebsocketWriter(io.BufferedIOBase):
         """
         if self.closed:
             return
-        try:
-            self.ws.send('{"command":"end"}')
-        except websocket.WebSocketConnectionClosedException:
-            pass
+        self._io.send(self._stream, _END_MESSAGE)
         super().close()
 
 
 class _WebsocketReader(io.BufferedIOBase):
     """A readable file-like object whose reads come from a websocket."""
 
-    def __init__(self, ws: _WebSocket):
+    def __init__(self, ws: _WebSocket, exec_io: _ExecIO | None = None):
         self.ws = ws
+        self._io = exec_io if exec_io is not None else _ExecIO()
+        self._stream = self._io.add_output(ws)
         self.remaining = b''
         self.eof = False
 
@@ -2083,35 +2850,15 @@ class _WebsocketReader(io.BufferedIOBase):
             # Calling read() multiple times after EOF should still return EOF
             return b''
 
-        while not self.remaining:
-            try:
-                chunk = self.ws.recv()
-            except (websocket.WebSocketException, OSError) as e:
-                # The websocket was closed underneath us (for example,
-                # because the exec failed and ExecProcess._wait tore the
-                # connection down): treat it as end-of-file. The error that
-                # caused the teardown is reported by wait()/wait_output().
-                logger.debug('exec output stream closed: %s', e)
-                self.eof = True
-                return b''
-
-            if isinstance(chunk, str):
-                try:
-                    payload = json.loads(chunk)
-                except ValueError:
-                    # Garbage sent, try to keep going
-                    logger.warning('Cannot decode I/O command (invalid JSON)')
-                    continue
-                command = payload.get('command')
-                if command != 'end':
-                    # A command we don't recognize, keep going
-                    logger.warning('Invalid I/O command %r', command)
-                    continue
-                # Received "end" command, return EOF designator
+        if not self.remaining:
+            stream = self._stream
+            self._io.run_until(lambda: bool(stream.chunks) or stream.eof, (stream,))
+            if not stream.chunks:
+                # Received "end" command, the websocket was closed, or the
+                # process was waited on: return EOF designator.
                 self.eof = True
                 return b''
-
-            self.remaining = chunk
+            self.remaining = stream.chunks.popleft()
 
         if n < 0:
             n = len(self.remaining)
@@ -2243,12 +2990,24 @@ class Client:
     methods like :meth:`start_services` and :meth:`replan_services` mentioned above, and it's not
     for the command execution timeout defined in method :meth:`Client.exec`.
 
+    The default opener keeps connections to Pebble open between requests and
+    reuses them, reconnecting if Pebble has closed them (for example, because the
+    container restarted). Use :meth:`close` to close idle connections.
+
     ``socket_path`` is available as the ``pebble.socket_path`` attribute in every tracing span
     emitted by the client. This is useful for distinguishing spans where multiple Pebble daemons
     are used.
     """
 
     _chunk_size = 8192
+    _read_chunk_size = 64 * 1024
+
+    # After a request reaches Pebble, assume it's still up for this many seconds,
+    # unless a request fails to connect in the meantime (see _can_connect). This is
+    # tracked per socket path and shared with AsyncClient, so that a failure seen by
+    # any client of the same Pebble is taken into account.
+    _alive_ttl = 2.0
+    _alive_times: ClassVar[dict[str, float]] = {}
 
     def __init__(
         self,
@@ -2283,6 +3042,15 @@ class Client:
         opener.add_handler(urllib.request.HTTPErrorProcessor())
         return opener
 
+    def close(self):
+        """Close any idle connections to Pebble that the client is keeping open.
+
+        The client remains usable: later requests open new connections as needed.
+        """
+        for handler in self.opener.handlers:
+            if isinstance(handler, _UnixSocketHandler):
+                handler.close()
+
     # we need to cast the return type depending on the request params
     def _request(
         self,
@@ -2332,8 +3100,13 @@ class Client:
         query: dict[str, Any] | None = None,
         headers: dict[str, Any] | None = None,
         data: bytes | Generator[bytes, Any, Any] | None = None,
+        *,
+        timeout: float | _NotProvidedFlag | None = _not_provided,
     ) -> http.client.HTTPResponse:
-        """Make a request to the Pebble server; return the raw HTTPResponse object."""
+        """Make a request to the Pebble server; return the raw HTTPResponse object.
+
+        The ``timeout`` defaults to :attr:`timeout`; ``None`` means no timeout.
+        """
         url = self.base_url + path
         if query:
             url = f'{url}?{urllib.parse.urlencode(query, doseq=True)}'
@@ -2342,9 +3115,12 @@ class Client:
             headers = {}
         request = urllib.request.Request(url, method=method, data=data, headers=headers)  # noqa: S310
 
+        if isinstance(timeout, _NotProvidedFlag):
+            timeout = self.timeout
         try:
-            response = self.opener.open(request, timeout=self.timeout)
+            response = self.opener.open(request, timeout=timeout)
         except urllib.error.HTTPError as e:
+            self._set_alive(self.socket_path, True)
             with e:  # close the underlying tempfile so it doesn't leak
                 code = e.code
                 status = e.reason
@@ -2357,6 +3133,7 @@ class Client:
                     message = f'{type(e2).__name__} - {e2}'
             raise APIError(body, code, status, message) from None
         except urllib.error.URLError as e:
+            self._set_alive(self.socket_path, False)
             if e.args and isinstance(e.args[0], FileNotFoundError):
                 raise ConnectionError(
                     f'Could not connect to Pebble: socket not found at {self.socket_path!r} '
@@ -2364,13 +3141,46 @@ class Client:
                 ) from None
             raise ConnectionError(e.reason) from e
 
+        self._set_alive(self.socket_path, True)
         return response
 
-    def get_system_info(self) -> SystemInfo:
-        """Get system info."""
-        with self._start_span('pebble get_system_info'):
-            resp = self._request('GET', '/v1/system-info')
-            return SystemInfo.from_dict(resp['result'])
+    @classmethod
+    def _set_alive(cls, socket_path: str, alive: bool):
+        """Record whether a request to the Pebble at socket_path just reached it."""
+        if alive:
+            cls._alive_times[socket_path] = time.monotonic()
+        else:
+            cls._alive_times.pop(socket_path, None)
+
+    def _can_connect(self) -> bool:
+        """Report whether Pebble is up, without making an API request if possible.
+
+        If a request reached Pebble in the last ``_alive_ttl`` seconds, and no
+        request has failed to connect since, Pebble is assumed to be up.
+        Otherwise, this only checks that the socket accepts a connection.
+        """
+        alive_time = self._alive_times.get(self.socket_path)
+        if alive_time is not None and time.monotonic() - alive_time < self._alive_ttl:
+            return True
+        with self._start_span('pebble can_connect'):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+            except OSError as e:
+                logger.debug('Pebble API is not ready; cannot connect to socket: %s', e)
+                self._set_alive(self.socket_path, False)
+                return False
+            finally:
+                sock.close()
+        self._set_alive(self.socket_path, True)
+        return True
+
+    def get_system_info(self) -> SystemInfo:
+        """Get system info."""
+        with self._start_span('pebble get_system_info'):
+            resp = self._request('GET', '/v1/system-info')
+            return SystemInfo.from_dict(resp['result'])
 
     def get_warnings(self, select: WarningState = WarningState.PENDING) -> list[Warning]:
         """Get list of warnings in given state (pending or all)."""
@@ -2534,17 +3344,7 @@ class Client:
         delay: float,
     ) -> ChangeID:
         with self._start_span(f'pebble {action}_services') as span:
-            if isinstance(services, (str, bytes)) or not hasattr(services, '__iter__'):
-                raise TypeError(
-                    f'services must be of type Iterable[str], not {type(services).__name__}'
-                )
-
-            services = list(services)
-            for s in services:
-                if not isinstance(s, str):
-                    raise TypeError(f'service names must be str, not {type(s).__name__}')
-
-            body = {'action': action, 'services': services}
+            body = {'action': action, 'services': self._services_list(services)}
             span.set_attributes(body)
             resp = self._request('POST', '/v1/services', body=body)
             change_id = ChangeID(resp['change'])
@@ -2554,6 +3354,18 @@ class Client:
                     raise ChangeError(change.err, change)
             return change_id
 
+    @staticmethod
+    def _services_list(services: Iterable[str]) -> list[str]:
+        if isinstance(services, (str, bytes)) or not hasattr(services, '__iter__'):
+            raise TypeError(
+                f'services must be of type Iterable[str], not {type(services).__name__}'
+            )
+        services = list(services)
+        for s in services:
+            if not isinstance(s, str):
+                raise TypeError(f'service names must be str, not {type(s).__name__}')
+        return services
+
     def wait_change(
         self,
         change_id: ChangeID,
@@ -2642,18 +3454,21 @@ class Client:
 
         raise TimeoutError(f'timed out waiting for change {change_id} ({timeout} seconds)')
 
+    @staticmethod
+    def _checks_tuple(checks: Iterable[str]) -> tuple[str, ...]:
+        if isinstance(checks, str) or not hasattr(checks, '__iter__'):
+            raise TypeError(
+                f'checks must be of type Iterable[str], not {type(checks).__name__}',
+            )
+        checks = tuple(checks)
+        for chk in checks:
+            if not isinstance(chk, str):
+                raise TypeError(f'check names must be str, not {type(chk).__name__}')
+        return checks
+
     def _checks_action(self, action: str, checks: Iterable[str]) -> list[str]:
         with self._start_span(f'pebble {action}_checks') as span:
-            if isinstance(checks, str) or not hasattr(checks, '__iter__'):
-                raise TypeError(
-                    f'checks must be of type Iterable[str], not {type(checks).__name__}',
-                )
-
-            checks = tuple(checks)
-            for chk in checks:
-                if not isinstance(chk, str):
-                    raise TypeError(f'check names must be str, not {type(chk).__name__}')
-
+            checks = self._checks_tuple(checks)
             span.set_attribute('checks', checks)
             body = {'action': action, 'checks': checks}
             resp = self._request('POST', '/v1/checks', body=body)
@@ -2675,27 +3490,29 @@ class Client:
                 raise TypeError(f'label must be a str, not {type(label).__name__}')
             span.set_attribute('label', label)
             span.set_attribute('combine', combine)
-
-            if isinstance(layer, str):
-                layer_yaml = layer
-            elif isinstance(layer, dict):
-                layer_yaml = Layer(layer).to_yaml()
-            elif isinstance(layer, Layer):
-                layer_yaml = layer.to_yaml()
-            else:
-                raise TypeError(
-                    f'layer must be str, dict, or pebble.Layer, not {type(layer).__name__}'
-                )
-
-            body = {
-                'action': 'add',
-                'combine': combine,
-                'label': label,
-                'format': 'yaml',
-                'layer': layer_yaml,
-            }
+            body = self._add_layer_body(label, layer, combine)
             self._request('POST', '/v1/layers', body=body)
 
+    @staticmethod
+    def _add_layer_body(label: str, layer: str | LayerDict | Layer, combine: bool):
+        if isinstance(layer, str):
+            layer_yaml = layer
+        elif isinstance(layer, dict):
+            layer_yaml = Layer(layer).to_yaml()
+        elif isinstance(layer, Layer):
+            layer_yaml = layer.to_yaml()
+        else:
+            raise TypeError(
+                f'layer must be str, dict, or pebble.Layer, not {type(layer).__name__}'
+            )
+        return {
+            'action': 'add',
+            'combine': combine,
+            'label': label,
+            'format': 'yaml',
+            'layer': layer_yaml,
+        }
+
     def get_plan(self) -> Plan:
         """Get the Pebble plan (contains combined layer configuration)."""
         with self._start_span('pebble get_plan'):
@@ -2752,49 +3569,179 @@ class Client:
                 'path': path,
             }
             span.set_attribute('path', path)
-            headers = {'Accept': 'multipart/form-data'}
-            response = self._request_raw('GET', '/v1/files', query, headers)
+            parser = self._read_files(query)
+            try:
+                return self._pulled_file(parser, path, encoding)
+            finally:
+                parser.remove_files()
 
-            options = self._ensure_content_type(response.headers, 'multipart/form-data')
-            boundary = options.get('boundary', '')
-            if not boundary:
-                raise ProtocolError(f'invalid boundary {boundary!r}')
+    @typing.overload
+    def pull_many(
+        self, paths: Iterable[str | pathlib.PurePath], *, encoding: None
+    ) -> dict[str, BinaryIO]: ...
 
-            parser = _FilesParser(boundary)
+    @typing.overload
+    def pull_many(
+        self, paths: Iterable[str | pathlib.PurePath], *, encoding: str = 'utf-8'
+    ) -> dict[str, TextIO]: ...
+
+    def pull_many(
+        self, paths: Iterable[str | pathlib.PurePath], *, encoding: str | None = 'utf-8'
+    ) -> dict[str, BinaryIO] | dict[str, TextIO]:
+        """Read the content of several files from the remote system in a single request.
+
+        Use each returned object as a context manager, otherwise ``close()``
+        must be called manually to avoid memory leaks.
+
+        Args:
+            paths: Paths of the files to read from the remote system.
+            encoding: Encoding to use for decoding the files' bytes to str,
+                or ``None`` to specify no decoding.
+
+        Returns:
+            A dict mapping each path to a readable file-like object, as
+            returned by :meth:`pull`.
+
+        Raises:
+            PathError: If there was an error reading any of the files, for
+                example, if a file doesn't exist or is a directory. The error
+                is for the first such path, and no files are returned.
+        """
+        paths = list(dict.fromkeys(str(path) for path in paths))
+        if not paths:
+            return {}
+        with self._start_span('pebble pull_many') as span:
+            query = {
+                'action': 'read',
+                'path': paths,
+            }
+            span.set_attribute('paths', paths)
+            parser = self._read_files(query)
             try:
-                while True:
-                    chunk = response.read(self._chunk_size)
-                    if not chunk:
-                        break
-                    parser.feed(chunk)
+                return self._pulled_files(parser, paths, encoding)
+            finally:
+                parser.remove_files()
+
+    def pull_to(self, path: str | pathlib.PurePath, local_path: str | os.PathLike[str]):
+        """Read a file from the remote system, writing its content to a local file.
+
+        The content is streamed to disk as it's received, so this is more
+        efficient than :meth:`pull` for copying large files. It's written to a
+        temporary file in the same directory, which replaces ``local_path``
+        once the whole file has been read, so ``local_path`` is never left
+        partially written.
 
-                resp = parser.get_response()
-                if resp is None:
-                    raise ProtocolError('no "response" field in multipart body')
-                self._raise_on_path_error(resp, path)
-
-                filenames = parser.filenames()
-                if not filenames:
-                    raise ProtocolError('no file content in multipart response')
-                elif len(filenames) > 1:
-                    raise ProtocolError('single file request resulted in a multi-file response')
-
-                filename = filenames[0]
-                if filename != path:
-                    raise ProtocolError(f'path not expected: {filename!r}')
-                return parser.get_file(path, encoding)
+        Args:
+            path: Path of the file to read from the remote system.
+            local_path: Path of the local file to write, which is created or
+                replaced.
+
+        Raises:
+            PathError: If there was an error reading the file at path, for
+                example, if the file doesn't exist or is a directory. The local
+                file isn't created or changed in that case.
+        """
+        path = str(path)
+        with self._start_span('pebble pull_to') as span:
+            query = {
+                'action': 'read',
+                'path': path,
+            }
+            span.set_attribute('path', path)
+            parser = self._read_files(query, {path: os.fspath(local_path)})
+            try:
+                self._commit_pulled_to(parser, path)
             finally:
                 parser.remove_files()
 
+    @classmethod
+    def _commit_pulled_to(cls, parser: _FilesParser, path: str):
+        resp = parser.get_response()
+        if resp is None:
+            raise ProtocolError('no "response" field in multipart body')
+        cls._raise_on_path_error(resp, path)
+        if parser.filenames() != [path]:
+            raise ProtocolError(f'paths not expected: {parser.filenames()!r}')
+        parser.commit_files()
+
+    def _read_files(
+        self, query: dict[str, Any], destinations: Mapping[str, str] | None = None
+    ) -> _FilesParser:
+        """Make a files read request, returning the parser fed with the whole response.
+
+        The caller must call the parser's ``remove_files`` when done with it.
+        """
+        headers = {'Accept': 'multipart/form-data'}
+        response = self._request_raw('GET', '/v1/files', query, headers)
+
+        options = self._ensure_content_type(response.headers, 'multipart/form-data')
+        boundary = options.get('boundary', '')
+        if not boundary:
+            raise ProtocolError(f'invalid boundary {boundary!r}')
+
+        parser = _FilesParser(boundary, destinations)
+        # Read into a reusable buffer; the parser copies out what it needs.
+        buffer = bytearray(self._read_chunk_size)
+        try:
+            with memoryview(buffer) as view:
+                while n := response.readinto(buffer):
+                    parser.feed(view[:n])
+        except BaseException:
+            parser.remove_files()
+            raise
+        return parser
+
+    @classmethod
+    def _pulled_files(
+        cls, parser: _FilesParser, paths: list[str], encoding: str | None
+    ) -> dict[str, Any]:
+        """Return the files from a fully-fed multipart pull response for several paths."""
+        resp = parser.get_response()
+        if resp is None:
+            raise ProtocolError('no "response" field in multipart body')
+        cls._raise_on_path_errors(resp, paths)
+
+        filenames = set(parser.filenames())
+        if filenames != set(paths):
+            raise ProtocolError(f'paths not expected: {sorted(filenames ^ set(paths))!r}')
+        return {path: parser.get_file(path, encoding) for path in paths}
+
+    @classmethod
+    def _pulled_file(
+        cls, parser: _FilesParser, path: str, encoding: str | None
+    ) -> BinaryIO | TextIO:
+        """Return the single file from a fully-fed multipart pull response."""
+        resp = parser.get_response()
+        if resp is None:
+            raise ProtocolError('no "response" field in multipart body')
+        cls._raise_on_path_error(resp, path)
+
+        filenames = parser.filenames()
+        if not filenames:
+            raise ProtocolError('no file content in multipart response')
+        elif len(filenames) > 1:
+            raise ProtocolError('single file request resulted in a multi-file response')
+
+        filename = filenames[0]
+        if filename != path:
+            raise ProtocolError(f'path not expected: {filename!r}')
+        return parser.get_file(path, encoding)
+
     @staticmethod
     def _raise_on_path_error(resp: _FilesResponse, path: str):
+        Client._raise_on_path_errors(resp, [path])
+
+    @staticmethod
+    def _raise_on_path_errors(resp: _FilesResponse, paths: Iterable[str]):
+        """Raise the error for the first of paths that failed or is missing from resp."""
         result = resp['result'] or []  # in case it's null instead of []
-        paths = {item['path']: item for item in result}
-        if path not in paths:
-            raise ProtocolError(f'path not found in response metadata: {resp}')
-        error = paths[path].get('error')
-        if error:
-            raise PathError(error['kind'], error['message'])
+        items = {item['path']: item for item in result}
+        for path in paths:
+            if path not in items:
+                raise ProtocolError(f'path not found in response metadata: {resp}')
+            error = items[path].get('error')
+            if error:
+                raise PathError(error['kind'], error['message'])
 
     def push(
         self,
@@ -2858,6 +3805,101 @@ class Client:
             # we need to cast the Dict[Any, Any] to _FilesResponse
             self._raise_on_path_error(typing.cast('_FilesResponse', resp), path)
 
+    def push_many(
+        self,
+        files: Mapping[str | pathlib.PurePath, _IOSource | PushSource],
+        *,
+        encoding: str = 'utf-8',
+        make_dirs: bool = False,
+        permissions: int | None = None,
+        user_id: int | None = None,
+        user: str | None = None,
+        group_id: int | None = None,
+        group: str | None = None,
+    ):
+        """Write content to several file paths on the remote system in a single request.
+
+        The request body is streamed: each source is only read when it's
+        sent, so file-like sources can be opened lazily.
+
+        For example, to write a script and its configuration::
+
+            client.push_many({
+                '/opt/app/run': pebble.PushSource(script, permissions=0o755),
+                '/opt/app/config.yaml': config,
+            }, user='app', group='app')
+
+        Args:
+            files: A dict mapping each path to write on the remote system to
+                its source of data, as for :meth:`push`. To give a file its
+                own permissions or ownership, use a :class:`PushSource`.
+            encoding: Encoding to use for encoding str sources to bytes, as for
+                :meth:`push`.
+            make_dirs: If true, create parent directories if they don't exist.
+            permissions: Permissions (mode) to create the files with.
+            user_id: User ID (UID) for the files.
+            user: Username for the files.
+            group_id: Group ID (GID) for the files.
+            group: Group name for the files.
+
+        Raises:
+            PathError: If there was an error writing any of the files. Pebble
+                still writes the other files; the error is for the first such
+                path.
+        """
+        if not files:
+            return
+        with self._start_span('pebble push_many') as span:
+            info = self._make_auth_dict(permissions, user_id, user, group_id, group)
+            if make_dirs:
+                info['make-dirs'] = True
+            span.set_attributes(info)
+            span.set_attribute('paths', [str(path) for path in files])
+            metadata, sources = self._push_many_request(files, info)
+            data, content_type = self._encode_multipart_files(
+                metadata, list(sources.items()), encoding
+            )
+
+            headers = {
+                'Accept': 'application/json',
+                'Content-Type': content_type,
+            }
+            response = self._request_raw('POST', '/v1/files', None, headers, data)
+            self._ensure_content_type(response.headers, 'application/json')
+            resp = typing.cast('_FilesResponse', json.loads(response.read()))
+            self._raise_on_path_errors(resp, sources)
+
+    @staticmethod
+    def _push_many_request(
+        files: Mapping[str | pathlib.PurePath, _IOSource | PushSource], info: _AuthDict
+    ) -> tuple[dict[str, Any], dict[str, _IOSource]]:
+        """Return the metadata for a push_many request, and the source of each path.
+
+        Args:
+            files: The files argument to push_many.
+            info: The metadata for files that don't have their own.
+        """
+        entries: list[dict[str, Any]] = []
+        sources: dict[str, _IOSource] = {}
+        for path, source in files.items():
+            path = str(path)
+            entry: dict[str, Any] = {**info, 'path': path}
+            if isinstance(source, PushSource):
+                entry.update(
+                    Client._make_auth_dict(
+                        source.permissions,
+                        source.user_id,
+                        source.user,
+                        source.group_id,
+                        source.group,
+                    )
+                )
+                sources[path] = source.source
+            else:
+                sources[path] = source
+            entries.append(entry)
+        return {'action': 'write', 'files': entries}, sources
+
     @staticmethod
     def _make_auth_dict(
         permissions: int | None,
@@ -2881,17 +3923,15 @@ class Client:
 
     def _encode_multipart(
         self, metadata: dict[str, Any], path: str, source: _IOSource, encoding: str
+    ):
+        return self._encode_multipart_files(metadata, [(path, source)], encoding)
+
+    def _encode_multipart_files(
+        self, metadata: dict[str, Any], files: list[tuple[str, _IOSource]], encoding: str
     ):
         # Python's stdlib mime/multipart handling is screwy and doesn't handle
         # binary properly, so roll our own.
-        if isinstance(source, str):
-            source_io: _AnyStrFileLikeIO = io.StringIO(source)
-        elif isinstance(source, bytes):
-            source_io: _AnyStrFileLikeIO = io.BytesIO(source)
-        else:
-            source_io: _AnyStrFileLikeIO = source
         boundary = binascii.hexlify(os.urandom(16))
-        path_escaped = path.replace('"', '\\"').encode('utf-8')
         content_type = f'multipart/form-data; boundary="{boundary.decode("utf-8")}"'
 
         def generator() -> Generator[bytes, None, None]:
@@ -2904,25 +3944,38 @@ class Client:
                 b'\r\n',
                 json.dumps(metadata).encode('utf-8'),
                 b'\r\n',
-                b'--',
-                boundary,
-                b'\r\n',
-                b'Content-Type: application/octet-stream\r\n',
-                b'Content-Disposition: form-data; name="files"; filename="',
-                path_escaped,
-                b'"\r\n',
-                b'\r\n',
             ])
 
-            content: str | bytes = source_io.read(self._chunk_size)
-            while content:
-                if isinstance(content, str):
-                    content = content.encode(encoding)
-                yield content
-                content = source_io.read(self._chunk_size)
+            # Each source is only read when its part is reached, so the
+            # body is streamed rather than built up in memory.
+            for path, source in files:
+                if isinstance(source, str):
+                    source_io: _AnyStrFileLikeIO = io.StringIO(source)
+                elif isinstance(source, bytes):
+                    source_io: _AnyStrFileLikeIO = io.BytesIO(source)
+                else:
+                    source_io: _AnyStrFileLikeIO = source
+                path_escaped = path.replace('"', '\\"').encode('utf-8')
+                yield b''.join([
+                    b'--',
+                    boundary,
+                    b'\r\n',
+                    b'Content-Type: application/octet-stream\r\n',
+                    b'Content-Disposition: form-data; name="files"; filename="',
+                    path_escaped,
+                    b'"\r\n',
+                    b'\r\n',
+                ])
+
+                content: str | bytes = source_io.read(self._chunk_size)
+                while content:
+                    if isinstance(content, str):
+                        content = content.encode(encoding)
+                    yield content
+                    content = source_io.read(self._chunk_size)
+                yield b'\r\n'
 
             yield b''.join([
-                b'\r\n',
                 b'--',
                 boundary,
                 b'--\r\n',
@@ -3262,6 +4315,8 @@ class Client:
             change_id = resp['change']
             task_id = resp['result']['task-id']
 
+            import websocket
+
             stderr_ws: _WebSocket | None = None
             connected: list[_WebSocket] = []
             try:
@@ -3281,39 +4336,24 @@ class Client:
                 change = self.wait_change(ChangeID(change_id))
                 if change.err:
                     raise ChangeError(change.err, change) from e
+                self._set_alive(self.socket_path, False)
                 raise ConnectionError(f'unexpected error connecting to websockets: {e}') from e
 
-            cancel_stdin: Callable[[], None] | None = None
-            cancel_reader: int | None = None
-            threads: list[threading.Thread] = []
+            exec_io = _ExecIO()
 
             if stdin is not None:
-                if _has_fileno(stdin):
-                    # Create a pipe so _reader_to_websocket can select() on the
-                    # reader as well as this cancel_reader; when we write anything
-                    # to cancel_writer it'll trigger the select and end the thread.
-                    cancel_reader, cancel_writer = os.pipe()
-
-                    def _cancel_stdin():
-                        os.write(cancel_writer, b'x')  # doesn't matter what we write
-                        os.close(cancel_writer)
-
-                    cancel_stdin = _cancel_stdin
-
-                t = _start_thread(_reader_to_websocket, stdin, stdio_ws, encoding, cancel_reader)
-                threads.append(t)
+                exec_io.add_input(stdio_ws, stdin, encoding)
                 process_stdin = None
             else:
-                process_stdin = _WebsocketWriter(stdio_ws)
+                process_stdin = _WebsocketWriter(stdio_ws, exec_io)
                 if encoding is not None:
                     process_stdin = io.TextIOWrapper(process_stdin, encoding=encoding, newline='')  # type: ignore
 
             if stdout is not None:
-                t = _start_thread(_websocket_to_writer, stdio_ws, stdout, encoding)
-                threads.append(t)
+                exec_io.add_output(stdio_ws, stdout, encoding)
                 process_stdout = None
             else:
-                process_stdout = _WebsocketReader(stdio_ws)
+                process_stdout = _WebsocketReader(stdio_ws, exec_io)
                 if encoding is not None:
                     process_stdout = io.TextIOWrapper(
                         process_stdout,  # type: ignore
@@ -3323,12 +4363,11 @@ class Client:
 
             process_stderr = None
             if not combine_stderr:
+                ws = typing.cast('_WebSocket', stderr_ws)
                 if stderr is not None:
-                    t = _start_thread(_websocket_to_writer, stderr_ws, stderr, encoding)
-                    threads.append(t)
+                    exec_io.add_output(ws, stderr, encoding)
                 else:
-                    ws = typing.cast('_WebSocket', stderr_ws)
-                    process_stderr = _WebsocketReader(ws)
+                    process_stderr = _WebsocketReader(ws, exec_io)
                     if encoding is not None:
                         process_stderr = io.TextIOWrapper(
                             process_stderr,  # type: ignore
@@ -3348,19 +4387,26 @@ class Client:
                 command=command,
                 encoding=encoding,
                 change_id=ChangeID(change_id),
-                cancel_stdin=cancel_stdin,
-                cancel_reader=cancel_reader,
-                threads=threads,
+                exec_io=exec_io,
             )
             return process
 
     def _connect_websocket(self, task_id: str, websocket_id: str) -> _WebSocket:
+        # websocket-client is only needed for exec, so it's imported where it's
+        # used, to keep it out of the import time of charms that don't use exec.
+        import websocket
+
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         # Set socket timeout to a short timeout during connection phase, in
         # case the Pebble side times out (5s), so this side doesn't hang. See:
         # https://github.com/canonical/operator/issues/1246
         sock.settimeout(self.timeout)
-        sock.connect(self.socket_path)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            self._set_alive(self.socket_path, False)
+            raise
         url = self._websocket_url(task_id, websocket_id)
         ws: _WebSocket = websocket.WebSocket(skip_utf8_validation=True)  # type: ignore
         ws.connect(url, socket=sock)
@@ -3387,15 +4433,7 @@ class Client:
                 currently running.
         """
         with self._start_span('pebble send_signal') as span:
-            if isinstance(services, (str, bytes)) or not hasattr(services, '__iter__'):
-                raise TypeError(
-                    f'services must be of type Iterable[str], not {type(services).__name__}'
-                )
-            services = list(services)
-            for s in services:
-                if not isinstance(s, str):
-                    raise TypeError(f'service names must be str, not {type(s).__name__}')
-
+            services = self._services_list(services)
             if isinstance(sig, int):
                 sig = signal.Signals(sig).name
 
@@ -3406,6 +4444,64 @@ class Client:
             span.set_attributes(body)
             self._request('POST', '/v1/signals', body=body)
 
+    def get_logs(
+        self,
+        services: Iterable[str] | None = None,
+        *,
+        n: int | None = None,
+        follow: bool = False,
+    ) -> Generator[LogEntry, None, None]:
+        """Get the most recent output of the named services, one line at a time.
+
+        Log entries are parsed one at a time as they're read from Pebble, so
+        this uses the same amount of memory however many logs there are. For
+        example, to check whether a service has recently crashed::
+
+            logs = client.get_logs(['myapp'], n=100)
+            if any('panic:' in entry.message for entry in logs):
+                ...
+
+        Args:
+            services: Names of the services to get the logs of. If not
+                provided or empty, get the logs of all the services.
+            n: Number of the most recent log entries to get, across all the
+                services. If not provided, Pebble returns the last 30 entries;
+                use -1 to get all the logs that Pebble has kept.
+            follow: If true, after yielding the recent log entries, wait for
+                and yield new entries as the services write them. This only
+                ends when the generator is closed, or if Pebble closes the
+                connection, and waiting for new entries has no timeout.
+        """
+        query = self._logs_query(services, n, follow)
+        with self._start_span('pebble get_logs') as span:
+            span.set_attributes(query)
+            if follow:
+                # New logs may not be written for a long time.
+                response = self._request_raw('GET', '/v1/logs', query, timeout=None)
+            else:
+                response = self._request_raw('GET', '/v1/logs', query)
+        try:
+            while line := response.readline():
+                if line.strip():
+                    yield LogEntry.from_dict(json.loads(line))
+        finally:
+            response.close()
+
+    @classmethod
+    def _logs_query(
+        cls, services: Iterable[str] | None, n: int | None, follow: bool
+    ) -> dict[str, Any]:
+        query: dict[str, Any] = {}
+        if services is not None:
+            services = cls._services_list(services)
+            if services:
+                query['services'] = ','.join(services)
+        if n is not None:
+            query['n'] = n
+        if follow:
+            query['follow'] = 'true'
+        return query
+
     def get_checks(
         self, level: CheckLevel | None = None, names: Iterable[str] | None = None
     ) -> list[CheckInfo]:
@@ -3522,10 +4618,9 @@ class Client:
         user (notices whose ``user_id`` matches the requester UID as well as
         public notices).
 
-        Note that the "after" filter is not yet implemented, as it's not
-        needed right now and it's hard to implement correctly with Python's
-        datetime type, which only has microsecond precision (and Go's Time
-        type has nanosecond precision).
+        To only get notices that have occurred (or repeated) since an earlier
+        call, or to wait for new notices, use :meth:`wait_notices` or
+        :meth:`watch_notices`.
 
         Args:
             users: Change which users' notices to return (instead of returning
@@ -3536,21 +4631,180 @@ class Client:
             keys: Filter for notices with any of the specified keys.
         """
         with self._start_span('pebble get_notices') as span:
-            query: dict[str, str | list[str]] = {}
-            if users is not None:
-                query['users'] = users.value
-            if user_id is not None:
-                query['user-id'] = str(user_id)
-            if types is not None:
-                types_value = [(t.value if isinstance(t, NoticeType) else t) for t in types]
-                query['types'] = types_value
-            if keys is not None:
-                keys = list(keys)
-                query['keys'] = keys
+            query = self._notices_query(users=users, user_id=user_id, types=types, keys=keys)
             span.set_attributes(query)
             resp = self._request('GET', '/v1/notices', query)
             return [Notice.from_dict(info) for info in resp['result']]
 
+    def wait_notices(
+        self,
+        *,
+        after: NoticeCursor | datetime.datetime | None = None,
+        timeout: float = 30.0,
+        users: NoticesUsers | None = None,
+        user_id: int | None = None,
+        types: Iterable[NoticeType | str] | None = None,
+        keys: Iterable[str] | None = None,
+    ) -> tuple[list[Notice], NoticeCursor]:
+        """Wait for notices that occurred (or repeated) after a cursor, and match the filters.
+
+        This returns as soon as there are any such notices, or an empty list
+        if there are none after ``timeout`` seconds, along with the cursor to
+        pass as ``after`` to the next call. For example::
+
+            cursor = None
+            while True:
+                notices, cursor = client.wait_notices(after=cursor, keys=['example.com/a'])
+                for notice in notices:
+                    ...
+
+        Args:
+            after: Only return notices last repeated after this. If not set,
+                all notices that match the filters are returned immediately
+                (or, if there are none, the first to occur). A datetime only
+                has microsecond precision, so use the returned
+                :class:`NoticeCursor` to avoid getting a notice twice.
+            timeout: Maximum time in seconds to wait for a notice.
+            users: Change which users' notices to return (instead of returning
+                notices for the current user).
+            user_id: Filter for notices for the specified user, including
+                public notices (only works for Pebble admins).
+            types: Filter for notices with any of the specified types.
+            keys: Filter for notices with any of the specified keys.
+
+        Returns:
+            A tuple of the notices, in the order they were last repeated,
+            and the cursor for the last of them (or ``after``, if there were
+            none).
+        """
+        with self._start_span('pebble wait_notices') as span:
+            query = self._wait_notices_query(
+                after=after, users=users, user_id=user_id, types=types, keys=keys
+            )
+            span.set_attributes(query)
+            deadline = time.time() + timeout
+
+            # Hit the notices endpoint every Client.timeout-1 seconds to avoid
+            # long requests, as for wait_change.
+            while True:
+                this_timeout = min(deadline - time.time(), max(self.timeout - 1, 1))
+                if this_timeout <= 0:
+                    return [], self._notices_cursor([], after)
+                this_query = {**query, 'timeout': _format_timeout(this_timeout)}
+                resp = self._request('GET', '/v1/notices', this_query)
+                if resp['result']:
+                    return self._parse_notices(resp['result'], after)
+
+    def watch_notices(
+        self,
+        *,
+        after: NoticeCursor | datetime.datetime | None = None,
+        timeout: float | None = None,
+        users: NoticesUsers | None = None,
+        user_id: int | None = None,
+        types: Iterable[NoticeType | str] | None = None,
+        keys: Iterable[str] | None = None,
+    ) -> Generator[Notice, None, None]:
+        """Yield notices that match the filters as they occur (or repeat).
+
+        Each notice is only fetched and parsed once: this waits for new
+        notices using Pebble's long-polling, with :meth:`wait_notices`.
+
+        Args:
+            after: Yield notices last repeated after this. If not set, only
+                notices that occur (or repeat) after watching starts are
+                yielded.
+            timeout: Stop after this many seconds. If not set, the caller
+                must stop iterating when it's done.
+            users: Change which users' notices to return (instead of returning
+                notices for the current user).
+            user_id: Filter for notices for the specified user, including
+                public notices (only works for Pebble admins).
+            types: Filter for notices with any of the specified types.
+            keys: Filter for notices with any of the specified keys.
+        """
+        types = list(types) if types is not None else None
+        keys = list(keys) if keys is not None else None
+        if after is None:
+            # Start after the existing notices: only their times are needed.
+            with self._start_span('pebble watch_notices') as span:
+                query = self._notices_query(users=users, user_id=user_id, types=types, keys=keys)
+                span.set_attributes(query)
+                resp = self._request('GET', '/v1/notices', query)
+                after = self._notices_cursor(resp['result'], None)
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            this_timeout = 30.0
+            if deadline is not None:
+                this_timeout = min(deadline - time.time(), this_timeout)
+                if this_timeout <= 0:
+                    return
+            notices, after = self.wait_notices(
+                after=after,
+                timeout=this_timeout,
+                users=users,
+                user_id=user_id,
+                types=types,
+                keys=keys,
+            )
+            yield from notices
+
+    @classmethod
+    def _wait_notices_query(
+        cls,
+        *,
+        after: NoticeCursor | datetime.datetime | None,
+        users: NoticesUsers | None,
+        user_id: int | None,
+        types: Iterable[NoticeType | str] | None,
+        keys: Iterable[str] | None,
+    ) -> dict[str, str | list[str]]:
+        query = cls._notices_query(users=users, user_id=user_id, types=types, keys=keys)
+        if isinstance(after, datetime.datetime):
+            after = NoticeCursor.from_datetime(after)
+        if after is not None:
+            query['after'] = str(after)
+        return query
+
+    @staticmethod
+    def _notices_cursor(
+        notices: list[_NoticeDict], after: NoticeCursor | datetime.datetime | None
+    ) -> NoticeCursor:
+        """Return the cursor for the last of the notices (or for after, if there are none)."""
+        if notices:
+            return max(NoticeCursor.from_rfc3339(n['last-repeated']) for n in notices)
+        if isinstance(after, datetime.datetime):
+            return NoticeCursor.from_datetime(after)
+        return after if after is not None else NoticeCursor(0)
+
+    @classmethod
+    def _parse_notices(
+        cls, notices: list[_NoticeDict], after: NoticeCursor | datetime.datetime | None
+    ) -> tuple[list[Notice], NoticeCursor]:
+        parsed = [Notice.from_dict(info) for info in notices]
+        return parsed, cls._notices_cursor(notices, after)
+
+    @staticmethod
+    def _notices_query(
+        *,
+        users: NoticesUsers | None,
+        user_id: int | None,
+        types: Iterable[NoticeType | str] | None,
+        keys: Iterable[str] | None,
+    ) -> dict[str, str | list[str]]:
+        query: dict[str, str | list[str]] = {}
+        if users is not None:
+            query['users'] = users.value
+        if user_id is not None:
+            query['user-id'] = str(user_id)
+        if types is not None:
+            types_value = [(t.value if isinstance(t, NoticeType) else t) for t in types]
+            query['types'] = types_value
+        if keys is not None:
+            keys = list(keys)
+            query['keys'] = keys
+        return query
+
     def get_identities(self) -> dict[str, Identity]:
         """Get all identities in Pebble.
 
@@ -3597,54 +4851,1343 @@ class Client:
             self._request('POST', '/v1/identities', body=body)
 
 
-class _FilesParser:
-    """A limited purpose multi-part parser backed by files for memory efficiency."""
+def wait_changes(
+    changes: Iterable[tuple[Client, ChangeID]],
+    timeout: float | None = 30.0,
+    delay: float = 0.1,
+) -> list[Change]:
+    """Wait for several changes, possibly on different Pebble servers, to be ready.
 
-    def __init__(self, boundary: bytes | str):
-        self._response: _FilesResponse | None = None  # externally managed
-        self._part_type: Literal['response', 'files'] | None = None  # externally managed
-        self._headers: email.message.Message | None = None  # externally managed
-        self._files: dict[str, _Tempfile] = {}
+    The changes are waited for at the same time, so this takes as long as the
+    slowest change rather than the total time of all the changes. For example,
+    to replan the services in several containers::
 
-        # Prepare the MIME multipart boundary line patterns.
-        if isinstance(boundary, str):
-            boundary = boundary.encode()
+        changes = [(c.pebble, c.replan(wait=False)) for c in containers]
+        pebble.wait_changes(changes)
 
-        # State vars, as we may enter the feed() function multiple times.
-        self._response_data = bytearray()
+    Args:
+        changes: Pairs of the client to use and the ID of the change to wait for.
+        timeout: Maximum time in seconds to wait for each change to be ready.
+            It may be ``None``, in which case wait_changes never times out.
+        delay: If polling, this is the delay in seconds between attempts.
 
-        self._max_lookahead = 8 * 1024 * 1024
+    Returns:
+        The Change objects being waited on, in the same order as ``changes``.
 
-        self._parser = _MultipartParser(
-            boundary, self._process_header, self._process_body, max_lookahead=self._max_lookahead
-        )
+    Raises:
+        TimeoutError: If the maximum timeout is reached for any of the changes.
+        ChangeError: If any of the changes failed. If several failed, this is
+            the error from the first of them in ``changes``.
+    """
+    changes = list(changes)
+    if len(changes) <= 1:
+        results = [client.wait_change(change_id, timeout, delay) for client, change_id in changes]
+    else:
+        # Wait for each change in a copy of this context, so that the
+        # wait_change spans are children of the current span.
+        contexts = [contextvars.copy_context() for _ in changes]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(changes)) as executor:
+            futures = [
+                executor.submit(ctx.run, client.wait_change, change_id, timeout, delay)
+                for ctx, (client, change_id) in zip(contexts, changes, strict=True)
+            ]
+        results = [future.result() for future in futures]
+    for change in results:
+        if change.err:
+            raise ChangeError(change.err, change)
+    return results
 
-        # RFC 2046 says that the boundary string needs to be preceded by a CRLF.
-        # Unfortunately, the request library's header parsing logic strips off one of
-        # these, so we'll prime the parser buffer with that missing sequence.
-        self._parser.feed(b'\r\n')
 
-    def _process_header(self, data: bytearray):
-        parser = email.parser.BytesFeedParser()
-        parser.feed(data)
-        self._headers = parser.close()
+class _AsyncResponse:
+    """A response from Pebble read from an asyncio stream.
 
-        content_disposition = self._headers.get_content_disposition()
-        if content_disposition != 'form-data':
-            raise ProtocolError(f'unexpected content disposition: {content_disposition!r}')
+    The body must be read to the end (or the response closed) before the
+    connection can be used for another request.
+    """
 
-        name = self._headers.get_param('name', header='content-disposition')
-        if name == 'files':
-            filename = self._headers.get_filename()
-            if filename is None:
-                raise ProtocolError('multipart "files" part missing filename')
-            self._prepare_tempfile(filename)
+    def __init__(
+        self,
+        status: int,
+        reason: str,
+        headers: http.client.HTTPMessage,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        timeout: float | None,
+        release: Callable[[asyncio.StreamReader, asyncio.StreamWriter], None],
+        *,
+        head_only: bool = False,
+    ):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._reader = reader
+        self._writer = writer
+        self._timeout = timeout
+        self._release = release
+
+        self._chunked = 'chunked' in headers.get('Transfer-Encoding', '').lower()
+        self._chunk_left: int | None = None
+        length = headers.get('Content-Length')
+        self._length: int | None = None
+        if head_only or status in (http.HTTPStatus.NO_CONTENT, http.HTTPStatus.NOT_MODIFIED):
+            self._length = 0
+            self._chunked = False
+        elif not self._chunked and length is not None:
+            self._length = int(length)
+        self._will_close = 'close' in headers.get('Connection', '').lower() or (
+            not self._chunked and self._length is None
+        )
+        self._done = False
+        # Body data read by readline() that's after the line it returned.
+        self._buffer = bytearray()
+        if self._length == 0:
+            self._finish()
+
+    async def read(self, amt: int = -1) -> bytes:
+        """Read up to amt bytes of the body (all of it if amt is negative).
+
+        Returns an empty bytes object once the body has been read.
+        """
+        if amt < 0:
+            chunks: list[bytes] = []
+            while chunk := await self.read(65536):
+                chunks.append(chunk)
+            return b''.join(chunks)
+        if self._buffer:
+            data = bytes(self._buffer[:amt])
+            del self._buffer[:amt]
+            return data
+        return await self._read_timed(amt)
+
+    async def readline(self) -> bytes:
+        """Read one line of the body, including its trailing newline, if any.
+
+        Returns an empty bytes object once the body has been read.
+        """
+        start = 0
+        while (end := self._buffer.find(b'\n', start)) < 0:
+            start = len(self._buffer)
+            chunk = await self._read_timed(65536)
+            if not chunk:
+                end = len(self._buffer) - 1
+                break
+            self._buffer += chunk
+        line = bytes(self._buffer[: end + 1])
+        del self._buffer[: end + 1]
+        return line
+
+    async def _read_timed(self, amt: int) -> bytes:
+        if self._done:
+            return b''
+        try:
+            return await asyncio.wait_for(self._read(amt), self._timeout)
+        except asyncio.TimeoutError:
+            self.close()
+            raise builtins.TimeoutError('timed out reading response from Pebble') from None
+        except BaseException:
+            self.close()
+            raise
+
+    async def _read(self, amt: int) -> bytes:
+        if self._chunked:
+            if not self._chunk_left:
+                line = await self._reader.readline()
+                self._chunk_left = int(line.split(b';', 1)[0].strip(), 16)
+                if self._chunk_left == 0:
+                    # Skip any trailers, up to and including the final blank line.
+                    while (await self._reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    self._finish()
+                    return b''
+            data = await self._reader.read(min(amt, self._chunk_left))
+            if not data:
+                raise http.client.IncompleteRead(data)
+            self._chunk_left -= len(data)
+            if self._chunk_left == 0:
+                await self._reader.readexactly(2)  # the CRLF after the chunk data
+            return data
+
+        if self._length is None:
+            data = await self._reader.read(amt)
+            if not data:
+                self._finish()
+            return data
+
+        data = await self._reader.read(min(amt, self._length))
+        if not data:
+            raise http.client.IncompleteRead(data, self._length)
+        self._length -= len(data)
+        if self._length == 0:
+            self._finish()
+        return data
+
+    def _finish(self):
+        self._done = True
+        if self._will_close:
+            self._writer.close()
+        else:
+            self._release(self._reader, self._writer)
+
+    def close(self):
+        """Close the response, closing the connection if the body wasn't fully read."""
+        if not self._done:
+            self._done = True
+            self._writer.close()
+
+
+class AsyncClient:
+    """Pebble API client for use with :mod:`asyncio`.
+
+    This has the same methods as :class:`Client`, except that they're
+    coroutines, so that a charm can drive several workloads concurrently from
+    a single event loop. For example::
+
+        async def replan_all(containers: list[ops.Container]):
+            clients = [pebble.AsyncClient(c.pebble.socket_path) for c in containers]
+            await asyncio.gather(*(client.replan_services() for client in clients))
+
+    Requests are sent over asyncio Unix socket streams, and connections are
+    kept open and reused for later requests; use :meth:`close` (or use the
+    client as an async context manager) to close them. Connections belong to
+    the event loop that opened them: a client used from a new event loop
+    opens new connections.
+
+    The websocket library that :meth:`Client.exec` uses is blocking, so
+    :meth:`exec` starts and waits on the command in worker threads; see
+    :class:`AsyncExecProcess`.
+
+    Errors are reported in the same way as for :class:`Client`, and the
+    ``timeout`` parameter likewise applies to each step of a request (such as
+    sending part of the body, or waiting for the response), not to the whole
+    request or to waiting for changes.
+    """
+
+    _chunk_size = 8192
+    _read_chunk_size = 64 * 1024
+    _max_idle = 4
+
+    def __init__(self, socket_path: str, base_url: str = 'http://localhost', timeout: float = 5.0):
+        if not isinstance(socket_path, str):
+            raise TypeError(f'`socket_path` should be a string, not: {type(socket_path)}')
+        self.socket_path = socket_path
+        self.base_url = base_url
+        self.timeout = timeout
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._idle_loop: asyncio.AbstractEventLoop | None = None
+        self._sync_client: Client | None = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        await self.close()
+
+    async def close(self):
+        """Close any idle connections to Pebble that the client is keeping open."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+        if self._sync_client is not None:
+            self._sync_client.close()
+
+    _start_span = Client._start_span
+    _encode_multipart = Client._encode_multipart
+    _encode_multipart_files = Client._encode_multipart_files
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Make a JSON request to the Pebble server; return the decoded JSON body."""
+        headers = {'Accept': 'application/json'}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        response = await self._request_raw(method, path, query, headers, data)
+        return await self._read_json(response)
+
+    @staticmethod
+    async def _read_json(response: _AsyncResponse) -> dict[str, Any]:
+        """Read and decode a JSON response body, closing the response if that fails."""
+        try:
+            Client._ensure_content_type(response.headers, 'application/json')
+            raw_resp: dict[str, Any] = json.loads(await response.read())
+            return raw_resp
+        finally:
+            response.close()
+
+    async def _request_raw(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, Any] | None = None,
+        headers: dict[str, Any] | None = None,
+        data: bytes | Generator[bytes, Any, Any] | None = None,
+    ) -> _AsyncResponse:
+        """Make a request to the Pebble server; return the response with the body unread."""
+        target = urllib.parse.urlsplit(self.base_url + path).path
+        if query:
+            target = f'{target}?{urllib.parse.urlencode(query, doseq=True)}'
+        lines = [f'{method} {target} HTTP/1.1', 'Host: localhost']
+        for name, value in (headers or {}).items():
+            lines.append(f'{name.title()}: {value}')
+        if isinstance(data, bytes):
+            lines.append(f'Content-Length: {len(data)}')
+        elif data is not None:
+            lines.append('Transfer-Encoding: chunked')
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        can_retry = _can_resend(method, data)
+        reader, writer, reused = await self._acquire()
+        while True:
+            try:
+                response = await self._send(reader, writer, method, head, data)
+            except asyncio.TimeoutError:
+                writer.close()
+                raise builtins.TimeoutError('timed out waiting for Pebble') from None
+            except (BrokenPipeError, ConnectionResetError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                if reused and can_retry:
+                    logger.debug('Pebble connection was closed, reconnecting: %s', e)
+                    reader, writer = await self._connect()
+                    reused = False
+                    continue
+                Client._set_alive(self.socket_path, False)
+                raise ConnectionError(f'Pebble closed the connection: {e}') from e
+            except OSError as e:
+                writer.close()
+                Client._set_alive(self.socket_path, False)
+                raise ConnectionError(e) from e
+            except BaseException:
+                writer.close()
+                raise
+            break
+        Client._set_alive(self.socket_path, True)
+
+        if response.status >= 400:
+            try:
+                body: dict[str, Any] = json.loads(await response.read())
+                message: str = body['result']['message']
+            except (OSError, ValueError, KeyError) as e:
+                # Will only happen on read error or if Pebble sends invalid JSON.
+                body: dict[str, Any] = {}
+                message = f'{type(e).__name__} - {e}'
+            finally:
+                response.close()
+            raise APIError(body, response.status, response.reason, message)
+        return response
+
+    async def _send(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        method: str,
+        head: bytes,
+        data: bytes | Generator[bytes, Any, Any] | None,
+    ) -> _AsyncResponse:
+        # Like the sync client's socket timeout, the timeout applies to each
+        # step rather than the whole request, so large uploads don't time out.
+        writer.write(head)
+        if isinstance(data, bytes):
+            writer.write(data)
+        elif data is not None:
+            # The body may be read from files, so read it outside the event loop.
+            while (chunk := await asyncio.to_thread(next, data, None)) is not None:
+                if chunk:
+                    writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                    await asyncio.wait_for(writer.drain(), self.timeout)
+            writer.write(b'0\r\n\r\n')
+        await asyncio.wait_for(writer.drain(), self.timeout)
+        return await asyncio.wait_for(self._read_head(reader, writer, method), self.timeout)
+
+    async def _read_head(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str
+    ) -> _AsyncResponse:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('connection closed before response was received')
+        try:
+            version, status, reason = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+            if not version.startswith('HTTP/'):
+                raise ValueError(version)
+            code = int(status)
+        except ValueError:
+            raise ProtocolError(f'invalid HTTP status line {status_line!r}') from None
+        header_lines: list[bytes] = []
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            header_lines.append(line)
+        headers = typing.cast(
+            'http.client.HTTPMessage',
+            email.parser.Parser(_class=http.client.HTTPMessage).parsestr(
+                b''.join(header_lines).decode('latin-1')
+            ),
+        )
+        return _AsyncResponse(
+            code,
+            reason,
+            headers,
+            reader,
+            writer,
+            self.timeout,
+            self._release,
+            head_only=method == 'HEAD',
+        )
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_unix_connection(self.socket_path), self.timeout
+            )
+        except FileNotFoundError:
+            Client._set_alive(self.socket_path, False)
+            raise ConnectionError(
+                f'Could not connect to Pebble: socket not found at {self.socket_path!r} '
+                '(container restarted?)'
+            ) from None
+        except asyncio.TimeoutError:
+            Client._set_alive(self.socket_path, False)
+            raise ConnectionError('timed out connecting to Pebble') from None
+        except OSError as e:
+            Client._set_alive(self.socket_path, False)
+            raise ConnectionError(e) from e
+
+    async def _acquire(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """Return an idle connection if there's a usable one, else a new one."""
+        if self._idle_loop is not asyncio.get_running_loop():
+            # Streams can't be used from another event loop.
+            self._idle = []
+            self._idle_loop = asyncio.get_running_loop()
+        while self._idle:
+            reader, writer = self._idle.pop()
+            # An idle connection should have nothing to read; if it's at EOF
+            # or has data buffered, the server has closed it.
+            if reader.at_eof() or writer.is_closing() or reader._buffer:  # type: ignore
+                writer.close()
+                continue
+            return reader, writer, True
+        reader, writer = await self._connect()
+        return reader, writer, False
+
+    def _release(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self._idle) < self._max_idle:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def get_system_info(self) -> SystemInfo:
+        """Get system info."""
+        with self._start_span('pebble get_system_info'):
+            resp = await self._request('GET', '/v1/system-info')
+            return SystemInfo.from_dict(resp['result'])
+
+    async def get_warnings(self, select: WarningState = WarningState.PENDING) -> list[Warning]:
+        """Get list of warnings in given state (pending or all)."""
+        with self._start_span('pebble get_warnings') as span:
+            query = {'select': select.value}
+            span.set_attributes(query)
+            resp = await self._request('GET', '/v1/warnings', query)
+            return [Warning.from_dict(w) for w in resp['result']]
+
+    async def ack_warnings(self, timestamp: datetime.datetime) -> int:
+        """Acknowledge warnings up to given timestamp, return number acknowledged."""
+        with self._start_span('pebble ack_warnings'):
+            body = {'action': 'okay', 'timestamp': timestamp.isoformat()}
+            resp = await self._request('POST', '/v1/warnings', body=body)
+            return resp['result']
+
+    async def get_changes(
+        self,
+        select: ChangeState = ChangeState.IN_PROGRESS,
+        service: str | None = None,
+    ) -> list[Change]:
+        """Get list of changes in given state, filter by service name if given."""
+        with self._start_span('pebble get_changes') as span:
+            query: dict[str, str | int] = {'select': select.value}
+            if service is not None:
+                query['for'] = service
+            span.set_attributes(query)
+            resp = await self._request('GET', '/v1/changes', query)
+            return [Change.from_dict(c) for c in resp['result']]
+
+    async def get_change(self, change_id: ChangeID) -> Change:
+        """Get single change by ID."""
+        with self._start_span('pebble get_change'):
+            resp = await self._request('GET', f'/v1/changes/{change_id}')
+            return Change.from_dict(resp['result'])
+
+    async def abort_change(self, change_id: ChangeID) -> Change:
+        """Abort change with given ID."""
+        with self._start_span('pebble abort_change'):
+            body = {'action': 'abort'}
+            resp = await self._request('POST', f'/v1/changes/{change_id}', body=body)
+            return Change.from_dict(resp['result'])
+
+    async def autostart_services(self, timeout: float = 30.0, delay: float = 0.1) -> ChangeID:
+        """Start the startup-enabled services and wait for them to be started.
+
+        See :meth:`Client.autostart_services`.
+        """
+        return await self._services_action('autostart', [], timeout, delay)
+
+    async def replan_services(self, timeout: float = 30.0, delay: float = 0.1) -> ChangeID:
+        """Replan by (re)starting changed and startup-enabled services and checks.
+
+        See :meth:`Client.replan_services`.
+        """
+        return await self._services_action('replan', [], timeout, delay)
+
+    async def start_services(
+        self, services: Iterable[str], timeout: float = 30.0, delay: float = 0.1
+    ) -> ChangeID:
+        """Start services by name and wait for them to be started.
+
+        See :meth:`Client.start_services`.
+        """
+        return await self._services_action('start', services, timeout, delay)
+
+    async def stop_services(
+        self, services: Iterable[str], timeout: float = 30.0, delay: float = 0.1
+    ) -> ChangeID:
+        """Stop services by name and wait for them to be stopped.
+
+        See :meth:`Client.stop_services`.
+        """
+        return await self._services_action('stop', services, timeout, delay)
+
+    async def restart_services(
+        self, services: Iterable[str], timeout: float = 30.0, delay: float = 0.1
+    ) -> ChangeID:
+        """Restart services by name and wait for them to be started.
+
+        See :meth:`Client.restart_services`.
+        """
+        return await self._services_action('restart', services, timeout, delay)
+
+    async def _services_action(
+        self,
+        action: str,
+        services: Iterable[str],
+        timeout: float | None,
+        delay: float,
+    ) -> ChangeID:
+        with self._start_span(f'pebble {action}_services') as span:
+            body = {'action': action, 'services': Client._services_list(services)}
+            span.set_attributes(body)
+            resp = await self._request('POST', '/v1/services', body=body)
+            change_id = ChangeID(resp['change'])
+            if timeout:
+                change = await self.wait_change(change_id, timeout=timeout, delay=delay)
+                if change.err:
+                    raise ChangeError(change.err, change)
+            return change_id
+
+    async def wait_change(
+        self,
+        change_id: ChangeID,
+        timeout: float | None = 30.0,
+        delay: float = 0.1,
+    ) -> Change:
+        """Wait for the given change to be ready.
+
+        See :meth:`Client.wait_change`.
+
+        Raises:
+            TimeoutError: If the maximum timeout is reached.
+        """
+        with self._start_span('pebble wait_change'):
+            try:
+                return await self._wait_change_using_wait(change_id, timeout)
+            except NotImplementedError:
+                # Pebble server doesn't support wait endpoint, fall back to polling
+                return await self._wait_change_using_polling(change_id, timeout, delay)
+
+    async def _wait_change_using_wait(self, change_id: ChangeID, timeout: float | None):
+        """Wait for a change to be ready using the wait-change API."""
+        deadline = time.time() + timeout if timeout is not None else 0
+
+        # Hit the wait endpoint every timeout-1 seconds to avoid long requests.
+        while True:
+            this_timeout = max(self.timeout - 1, 1)  # minimum of 1 second
+            if timeout is not None:
+                time_remaining = deadline - time.time()
+                if time_remaining <= 0:
+                    break
+                this_timeout = min(time_remaining, this_timeout)
+
+            try:
+                return await self._wait_change(change_id, this_timeout)
+            except builtins.TimeoutError:
+                # Catch timeout from wait endpoint and loop to check deadline.
+                pass
+
+        raise TimeoutError(f'timed out waiting for change {change_id} ({timeout} seconds)')
+
+    async def _wait_change(self, change_id: ChangeID, timeout: float | None = None) -> Change:
+        """Call the wait-change API endpoint directly."""
+        query: dict[str, Any] = {}
+        if timeout is not None:
+            query['timeout'] = _format_timeout(timeout)
+
+        try:
+            resp = await self._request('GET', f'/v1/changes/{change_id}/wait', query)
+        except APIError as e:
+            if e.code == 404:
+                raise NotImplementedError(
+                    'server does not implement wait-change endpoint'
+                ) from None
+            if e.code == 504:
+                raise TimeoutError(
+                    f'timed out waiting for change {change_id} ({timeout} seconds)'
+                ) from None
+            raise
+
+        return Change.from_dict(resp['result'])
+
+    async def _wait_change_using_polling(
+        self, change_id: ChangeID, timeout: float | None, delay: float
+    ):
+        """Wait for a change to be ready by polling the get-change API."""
+        deadline = time.time() + timeout if timeout is not None else 0
+
+        while timeout is None or time.time() < deadline:
+            change = await self.get_change(change_id)
+            if change.ready:
+                return change
+
+            await asyncio.sleep(delay)
+
+        raise TimeoutError(f'timed out waiting for change {change_id} ({timeout} seconds)')
+
+    async def add_layer(
+        self, label: str, layer: str | LayerDict | Layer, *, combine: bool = False
+    ):
+        """Dynamically add a new layer onto the Pebble configuration layers.
+
+        See :meth:`Client.add_layer`.
+        """
+        with self._start_span('pebble add_layer') as span:
+            if not isinstance(label, str):
+                raise TypeError(f'label must be a str, not {type(label).__name__}')
+            span.set_attribute('label', label)
+            span.set_attribute('combine', combine)
+            body = Client._add_layer_body(label, layer, combine)
+            await self._request('POST', '/v1/layers', body=body)
+
+    async def get_plan(self) -> Plan:
+        """Get the Pebble plan (contains combined layer configuration)."""
+        with self._start_span('pebble get_plan'):
+            resp = await self._request('GET', '/v1/plan', {'format': 'yaml'})
+            return Plan(resp['result'])
+
+    async def get_services(self, names: Iterable[str] | None = None) -> list[ServiceInfo]:
+        """Get the service status for the configured services.
+
+        If names is specified, only fetch the service status for the services
+        named.
+        """
+        with self._start_span('pebble get_services') as span:
+            query = None
+            if names is not None:
+                names = list(names)
+                query = {'names': ','.join(names)}
+                span.set_attribute('names', names)
+            resp = await self._request('GET', '/v1/services', query)
+            return [ServiceInfo.from_dict(info) for info in resp['result']]
+
+    @typing.overload
+    async def pull(self, path: str | pathlib.PurePath, *, encoding: None) -> BinaryIO: ...
+
+    @typing.overload
+    async def pull(self, path: str | pathlib.PurePath, *, encoding: str = 'utf-8') -> TextIO: ...
+
+    async def pull(
+        self, path: str | pathlib.PurePath, *, encoding: str | None = 'utf-8'
+    ) -> BinaryIO | TextIO:
+        """Read a file's content from the remote system.
+
+        See :meth:`Client.pull`. The returned file object is a regular
+        (blocking) file; its content has already been received from Pebble.
+        """
+        path = str(path)
+        with self._start_span('pebble pull') as span:
+            query = {
+                'action': 'read',
+                'path': path,
+            }
+            span.set_attribute('path', path)
+            parser = await self._read_files(query)
+            try:
+                return Client._pulled_file(parser, path, encoding)
+            finally:
+                parser.remove_files()
+
+    @typing.overload
+    async def pull_many(
+        self, paths: Iterable[str | pathlib.PurePath], *, encoding: None
+    ) -> dict[str, BinaryIO]: ...
+
+    @typing.overload
+    async def pull_many(
+        self, paths: Iterable[str | pathlib.PurePath], *, encoding: str = 'utf-8'
+    ) -> dict[str, TextIO]: ...
+
+    async def pull_many(
+        self, paths: Iterable[str | pathlib.PurePath], *, encoding: str | None = 'utf-8'
+    ) -> dict[str, BinaryIO] | dict[str, TextIO]:
+        """Read the content of several files from the remote system in a single request.
+
+        See :meth:`Client.pull_many`.
+        """
+        paths = list(dict.fromkeys(str(path) for path in paths))
+        if not paths:
+            return {}
+        with self._start_span('pebble pull_many') as span:
+            query = {
+                'action': 'read',
+                'path': paths,
+            }
+            span.set_attribute('paths', paths)
+            parser = await self._read_files(query)
+            try:
+                return Client._pulled_files(parser, paths, encoding)
+            finally:
+                parser.remove_files()
+
+    async def pull_to(self, path: str | pathlib.PurePath, local_path: str | os.PathLike[str]):
+        """Read a file from the remote system, writing its content to a local file.
+
+        See :meth:`Client.pull_to`. The local file is written with ordinary
+        (blocking) calls.
+        """
+        path = str(path)
+        with self._start_span('pebble pull_to') as span:
+            query = {
+                'action': 'read',
+                'path': path,
+            }
+            span.set_attribute('path', path)
+            parser = await self._read_files(query, {path: os.fspath(local_path)})
+            try:
+                Client._commit_pulled_to(parser, path)
+            finally:
+                parser.remove_files()
+
+    async def _read_files(
+        self, query: dict[str, Any], destinations: Mapping[str, str] | None = None
+    ) -> _FilesParser:
+        """Make a files read request, returning the parser fed with the whole response."""
+        headers = {'Accept': 'multipart/form-data'}
+        response = await self._request_raw('GET', '/v1/files', query, headers)
+        try:
+            options = Client._ensure_content_type(response.headers, 'multipart/form-data')
+            boundary = options.get('boundary', '')
+            if not boundary:
+                raise ProtocolError(f'invalid boundary {boundary!r}')
+
+            parser = _FilesParser(boundary, destinations)
+            try:
+                while chunk := await response.read(self._read_chunk_size):
+                    parser.feed(chunk)
+            except BaseException:
+                parser.remove_files()
+                raise
+            return parser
+        finally:
+            response.close()
+
+    async def push(
+        self,
+        path: str | pathlib.PurePath,
+        source: _IOSource,
+        *,
+        encoding: str = 'utf-8',
+        make_dirs: bool = False,
+        permissions: int | None = None,
+        user_id: int | None = None,
+        user: str | None = None,
+        group_id: int | None = None,
+        group: str | None = None,
+    ):
+        """Write content to a given file path on the remote system.
+
+        See :meth:`Client.push`. If ``source`` is a file-like object, it's
+        read with ordinary (blocking) calls.
+        """
+        path = str(path)
+        with self._start_span('pebble push') as span:
+            info = Client._make_auth_dict(permissions, user_id, user, group_id, group)
+            info['path'] = path
+            if make_dirs:
+                info['make-dirs'] = True
+            span.set_attributes(info)
+            metadata = {
+                'action': 'write',
+                'files': [info],
+            }
+
+            data, content_type = self._encode_multipart(metadata, path, source, encoding)
+
+            headers = {
+                'Accept': 'application/json',
+                'Content-Type': content_type,
+            }
+            response = await self._request_raw('POST', '/v1/files', None, headers, data)
+            resp = await self._read_json(response)
+            Client._raise_on_path_error(typing.cast('_FilesResponse', resp), path)
+
+    async def push_many(
+        self,
+        files: Mapping[str | pathlib.PurePath, _IOSource | PushSource],
+        *,
+        encoding: str = 'utf-8',
+        make_dirs: bool = False,
+        permissions: int | None = None,
+        user_id: int | None = None,
+        user: str | None = None,
+        group_id: int | None = None,
+        group: str | None = None,
+    ):
+        """Write content to several file paths on the remote system in a single request.
+
+        See :meth:`Client.push_many`.
+        """
+        if not files:
+            return
+        with self._start_span('pebble push_many') as span:
+            info = Client._make_auth_dict(permissions, user_id, user, group_id, group)
+            if make_dirs:
+                info['make-dirs'] = True
+            span.set_attributes(info)
+            span.set_attribute('paths', [str(path) for path in files])
+            metadata, sources = Client._push_many_request(files, info)
+            data, content_type = self._encode_multipart_files(
+                metadata, list(sources.items()), encoding
+            )
+
+            headers = {
+                'Accept': 'application/json',
+                'Content-Type': content_type,
+            }
+            response = await self._request_raw('POST', '/v1/files', None, headers, data)
+            resp = typing.cast('_FilesResponse', await self._read_json(response))
+            Client._raise_on_path_errors(resp, sources)
+
+    async def list_files(
+        self, path: str | pathlib.PurePath, *, pattern: str | None = None, itself: bool = False
+    ) -> list[FileInfo]:
+        """Return list of directory entries from given path on remote system.
+
+        See :meth:`Client.list_files`.
+        """
+        path = str(path)
+        with self._start_span('pebble list_files') as span:
+            query = {'path': path}
+            if pattern:
+                query['pattern'] = pattern
+            if itself:
+                query['itself'] = 'true'
+            span.set_attributes(query)
+            query['action'] = 'list'
+            resp = await self._request('GET', '/v1/files', query)
+            result: list[_FileInfoDict] = resp['result'] or []  # in case it's null instead of []
+            return [FileInfo.from_dict(d) for d in result]
+
+    async def make_dir(
+        self,
+        path: str | pathlib.PurePath,
+        *,
+        make_parents: bool = False,
+        permissions: int | None = None,
+        user_id: int | None = None,
+        user: str | None = None,
+        group_id: int | None = None,
+        group: str | None = None,
+    ):
+        """Create a directory on the remote system with the given attributes.
+
+        See :meth:`Client.make_dir`.
+        """
+        path = str(path)
+        with self._start_span('pebble make_dir') as span:
+            info = Client._make_auth_dict(permissions, user_id, user, group_id, group)
+            info['path'] = path
+            if make_parents:
+                info['make-parents'] = True
+            span.set_attributes(info)
+            body = {
+                'action': 'make-dirs',
+                'dirs': [info],
+            }
+            resp = await self._request('POST', '/v1/files', None, body)
+            Client._raise_on_path_error(typing.cast('_FilesResponse', resp), path)
+
+    async def remove_path(self, path: str | pathlib.PurePath, *, recursive: bool = False):
+        """Remove a file or directory on the remote system.
+
+        See :meth:`Client.remove_path`.
+        """
+        path = str(path)
+        with self._start_span('pebble remove_path') as span:
+            info: dict[str, Any] = {'path': path}
+            if recursive:
+                info['recursive'] = True
+            span.set_attributes(info)
+            body = {
+                'action': 'remove',
+                'paths': [info],
+            }
+            resp = await self._request('POST', '/v1/files', None, body)
+            Client._raise_on_path_error(typing.cast('_FilesResponse', resp), path)
+
+    async def exec(self, command: list[str], **kwargs: Any) -> AsyncExecProcess[Any]:
+        """Execute the given command on the remote system.
+
+        This accepts the same arguments as :meth:`Client.exec`. The command is
+        started in a worker thread, and the returned :class:`AsyncExecProcess`
+        waits for it in a worker thread too.
+        """
+        if self._sync_client is None:
+            self._sync_client = Client(
+                self.socket_path, base_url=self.base_url, timeout=self.timeout
+            )
+        process = await asyncio.to_thread(self._sync_client.exec, command, **kwargs)
+        return AsyncExecProcess(process)
+
+    async def send_signal(self, sig: int | str, services: Iterable[str]):
+        """Send the given signal to the list of services named.
+
+        See :meth:`Client.send_signal`.
+        """
+        with self._start_span('pebble send_signal') as span:
+            services = Client._services_list(services)
+            if isinstance(sig, int):
+                sig = signal.Signals(sig).name
+
+            body = {
+                'signal': sig,
+                'services': services,
+            }
+            span.set_attributes(body)
+            await self._request('POST', '/v1/signals', body=body)
+
+    async def get_logs(
+        self,
+        services: Iterable[str] | None = None,
+        *,
+        n: int | None = None,
+        follow: bool = False,
+    ) -> AsyncGenerator[LogEntry, None]:
+        """Get the most recent output of the named services, one line at a time.
+
+        See :meth:`Client.get_logs`.
+        """
+        query = Client._logs_query(services, n, follow)
+        with self._start_span('pebble get_logs') as span:
+            span.set_attributes(query)
+            response = await self._request_raw('GET', '/v1/logs', query)
+        if follow:
+            # New logs may not be written for a long time.
+            response._timeout = None
+        try:
+            while line := await response.readline():
+                if line.strip():
+                    yield LogEntry.from_dict(json.loads(line))
+        finally:
+            response.close()
+
+    async def get_checks(
+        self, level: CheckLevel | None = None, names: Iterable[str] | None = None
+    ) -> list[CheckInfo]:
+        """Get the check status for the configured checks.
+
+        See :meth:`Client.get_checks`.
+        """
+        with self._start_span('pebble get_checks') as span:
+            query: dict[str, Any] = {}
+            if level is not None:
+                query['level'] = level.value
+            if names:
+                query['names'] = list(names)
+            span.set_attributes(query)
+            resp = await self._request('GET', '/v1/checks', query)
+            return [CheckInfo.from_dict(info) for info in resp['result']]
+
+    async def start_checks(self, checks: Iterable[str]) -> list[str]:
+        """Start checks by name.
+
+        See :meth:`Client.start_checks`.
+        """
+        return await self._checks_action('start', checks)
+
+    async def stop_checks(self, checks: Iterable[str]) -> list[str]:
+        """Stop checks by name.
+
+        See :meth:`Client.stop_checks`.
+        """
+        return await self._checks_action('stop', checks)
+
+    async def _checks_action(self, action: str, checks: Iterable[str]) -> list[str]:
+        with self._start_span(f'pebble {action}_checks') as span:
+            checks = Client._checks_tuple(checks)
+            span.set_attribute('checks', checks)
+            body = {'action': action, 'checks': checks}
+            resp = await self._request('POST', '/v1/checks', body=body)
+            return resp['result']['changed'] or []
+
+    async def notify(
+        self,
+        type: NoticeType,
+        key: str,
+        *,
+        data: dict[str, str] | None = None,
+        repeat_after: datetime.timedelta | None = None,
+    ) -> str:
+        """Record an occurrence of a notice with the specified options.
+
+        See :meth:`Client.notify`.
+        """
+        with self._start_span('pebble notify') as span:
+            span.set_attributes({'type': type.value, 'key': key})
+            body: dict[str, Any] = {
+                'action': 'add',
+                'type': type.value,
+                'key': key,
+            }
+            if data is not None:
+                body['data'] = data
+            if repeat_after is not None:
+                body['repeat-after'] = _format_timeout(repeat_after.total_seconds())
+                span.set_attribute('repeat_after', _format_timeout(repeat_after.total_seconds()))
+            resp = await self._request('POST', '/v1/notices', body=body)
+            return resp['result']['id']
+
+    async def get_notice(self, id: str) -> Notice:
+        """Get details about a single notice by ID.
+
+        Raises:
+            APIError: if a notice with the given ID is not found (``code`` 404)
+        """
+        with self._start_span('pebble get_notice') as span:
+            span.set_attribute('id', id)
+            resp = await self._request('GET', f'/v1/notices/{id}')
+            return Notice.from_dict(resp['result'])
+
+    async def get_notices(
+        self,
+        *,
+        users: NoticesUsers | None = None,
+        user_id: int | None = None,
+        types: Iterable[NoticeType | str] | None = None,
+        keys: Iterable[str] | None = None,
+    ) -> list[Notice]:
+        """Query for notices that match all of the provided filters.
+
+        See :meth:`Client.get_notices`.
+        """
+        with self._start_span('pebble get_notices') as span:
+            query = Client._notices_query(users=users, user_id=user_id, types=types, keys=keys)
+            span.set_attributes(query)
+            resp = await self._request('GET', '/v1/notices', query)
+            return [Notice.from_dict(info) for info in resp['result']]
+
+    async def wait_notices(
+        self,
+        *,
+        after: NoticeCursor | datetime.datetime | None = None,
+        timeout: float = 30.0,
+        users: NoticesUsers | None = None,
+        user_id: int | None = None,
+        types: Iterable[NoticeType | str] | None = None,
+        keys: Iterable[str] | None = None,
+    ) -> tuple[list[Notice], NoticeCursor]:
+        """Wait for notices that occurred (or repeated) after a cursor, and match the filters.
+
+        See :meth:`Client.wait_notices`.
+        """
+        with self._start_span('pebble wait_notices') as span:
+            query = Client._wait_notices_query(
+                after=after, users=users, user_id=user_id, types=types, keys=keys
+            )
+            span.set_attributes(query)
+            deadline = time.time() + timeout
+
+            # Hit the notices endpoint every timeout-1 seconds to avoid long requests.
+            while True:
+                this_timeout = min(deadline - time.time(), max(self.timeout - 1, 1))
+                if this_timeout <= 0:
+                    return [], Client._notices_cursor([], after)
+                this_query = {**query, 'timeout': _format_timeout(this_timeout)}
+                resp = await self._request('GET', '/v1/notices', this_query)
+                if resp['result']:
+                    return Client._parse_notices(resp['result'], after)
+
+    async def watch_notices(
+        self,
+        *,
+        after: NoticeCursor | datetime.datetime | None = None,
+        timeout: float | None = None,
+        users: NoticesUsers | None = None,
+        user_id: int | None = None,
+        types: Iterable[NoticeType | str] | None = None,
+        keys: Iterable[str] | None = None,
+    ) -> AsyncGenerator[Notice, None]:
+        """Yield notices that match the filters as they occur (or repeat).
+
+        See :meth:`Client.watch_notices`.
+        """
+        types = list(types) if types is not None else None
+        keys = list(keys) if keys is not None else None
+        if after is None:
+            with self._start_span('pebble watch_notices') as span:
+                query = Client._notices_query(users=users, user_id=user_id, types=types, keys=keys)
+                span.set_attributes(query)
+                resp = await self._request('GET', '/v1/notices', query)
+                after = Client._notices_cursor(resp['result'], None)
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            this_timeout = 30.0
+            if deadline is not None:
+                this_timeout = min(deadline - time.time(), this_timeout)
+                if this_timeout <= 0:
+                    return
+            notices, after = await self.wait_notices(
+                after=after,
+                timeout=this_timeout,
+                users=users,
+                user_id=user_id,
+                types=types,
+                keys=keys,
+            )
+            for notice in notices:
+                yield notice
+
+    async def get_identities(self) -> dict[str, Identity]:
+        """Get all identities in Pebble.
+
+        See :meth:`Client.get_identities`.
+        """
+        with self._start_span('pebble get_identities'):
+            resp = await self._request('GET', '/v1/identities')
+            result = resp['result']
+            return {name: Identity.from_dict(d) for name, d in result.items()}
+
+    async def replace_identities(
+        self, identities: Mapping[str, IdentityDict | Identity | None]
+    ) -> None:
+        """Replace the named identities in Pebble with the given ones.
+
+        See :meth:`Client.replace_identities`.
+        """
+        with self._start_span('pebble replace_identities'):
+            identities_dict = {
+                name: identity.to_dict() if isinstance(identity, Identity) else identity
+                for name, identity in identities.items()
+            }
+            body = {'action': 'replace', 'identities': identities_dict}
+            await self._request('POST', '/v1/identities', body=body)
+
+    async def remove_identities(self, identities: Iterable[str]) -> None:
+        """Remove the named identities in Pebble.
+
+        See :meth:`Client.remove_identities`.
+        """
+        with self._start_span('pebble remove_identities'):
+            identities_dict = {name: None for name in identities}
+            body = {'action': 'remove', 'identities': identities_dict}
+            await self._request('POST', '/v1/identities', body=body)
+
+
+class AsyncExecProcess(Generic[AnyStr]):
+    """Represents a process started by :meth:`AsyncClient.exec`.
+
+    This wraps an :class:`ExecProcess`, running its blocking waits in a
+    worker thread. The :attr:`stdin`, :attr:`stdout`, and :attr:`stderr`
+    attributes are the (blocking) file-like objects of the wrapped process.
+    """
+
+    def __init__(self, process: ExecProcess[AnyStr]):
+        self._process = process
+        self.stdin = process.stdin
+        self.stdout = process.stdout
+        self.stderr = process.stderr
+
+    async def wait(self):
+        """Wait for the process to finish.
+
+        See :meth:`ExecProcess.wait`.
+        """
+        await asyncio.to_thread(self._process.wait)
+
+    async def wait_output(self) -> tuple[AnyStr, AnyStr | None]:
+        """Wait for the process to finish and return tuple of (stdout, stderr).
+
+        See :meth:`ExecProcess.wait_output`.
+        """
+        return await asyncio.to_thread(self._process.wait_output)
+
+    async def send_signal(self, sig: int | str):
+        """Send the given signal to the running process.
+
+        See :meth:`ExecProcess.send_signal`.
+        """
+        await asyncio.to_thread(self._process.send_signal, sig)
+
+
+class _SpooledFile:
+    """Pulled file content, kept in memory unless it grows larger than max_size.
+
+    Larger content is spilled to a temporary file on disk, which must be
+    removed with :meth:`remove`.
+    """
+
+    def __init__(self, max_size: int):
+        self.name = ''
+        self._max_size = max_size
+        self._data: bytearray | None = bytearray()
+        self._file: _Tempfile | None = None
+
+    def write(self, data: memoryview):
+        if self._data is not None:
+            if len(self._data) + len(data) <= self._max_size:
+                self._data.extend(data)
+                return
+            self._file = typing.cast('_Tempfile', tempfile.NamedTemporaryFile(delete=False))  # noqa: SIM115
+            self.name = self._file.name
+            self._file.write(self._data)
+            self._data = None
+        assert self._file is not None
+        self._file.write(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def open(self, encoding: str | None) -> _TextOrBinaryIO:
+        """Return a new file object to read the content."""
+        if self._data is not None:
+            binary = io.BytesIO(self._data)
+            if encoding is None:
+                return typing.cast('BinaryIO', binary)
+            return typing.cast('TextIO', io.TextIOWrapper(binary, encoding=encoding, newline=''))
+        mode = 'r' if encoding else 'rb'
+        # We're using text-based file I/O purely for file encoding purposes, not for
+        # newline normalization.  newline='' serves the line endings as-is.
+        newline = '' if encoding else None
+        file_io = open(self.name, mode, encoding=encoding, newline=newline)  # noqa: SIM115
+        # open() returns IO[Any]
+        return typing.cast('_TextOrBinaryIO', file_io)
+
+    def remove(self):
+        """Remove the temporary file, if the content was spilled to disk."""
+        if self._file is not None:
+            os.unlink(self.name)
+            self._file = None
+
+
+class _DestinationFile:
+    """Pulled file content, written to a local destination path.
+
+    The content is written to a temporary file alongside the destination,
+    which :meth:`commit` moves into place, so the destination is never left
+    partially written. If the content is not committed, :meth:`remove`
+    deletes the temporary file.
+    """
+
+    def __init__(self, destination: str):
+        self.destination = destination
+        directory, basename = os.path.split(destination)
+        while True:
+            self.name = os.path.join(directory, f'.{basename}.{os.urandom(4).hex()}.tmp')
+            try:
+                # Like open(..., 'wb') for the destination, the mode is subject to the umask.
+                fd = os.open(self.name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            except FileExistsError:
+                continue
+            break
+        self._file: BinaryIO | None = open(fd, 'wb')  # noqa: SIM115
+
+    def write(self, data: memoryview):
+        assert self._file is not None
+        self._file.write(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def commit(self):
+        """Move the complete content into place at the destination path."""
+        self.close()
+        os.replace(self.name, self.destination)
+        self._file = None
+
+    def remove(self):
+        """Remove the temporary file, if the content was not committed."""
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self.name)
+            self._file = None
+
+
+class _FilesParser:
+    """A limited purpose multi-part parser that spools large files to disk.
+
+    File content is kept in memory up to ``spool_max_size`` bytes per file,
+    and written to a temporary file beyond that. Files with a local path in
+    ``destinations`` are written to that path instead, once
+    :meth:`commit_files` is called.
+    """
+
+    _spool_max_size = 256 * 1024
+
+    def __init__(self, boundary: bytes | str, destinations: Mapping[str, str] | None = None):
+        self._response: _FilesResponse | None = None  # externally managed
+        self._part_type: Literal['response', 'files'] | None = None  # externally managed
+        self._files: dict[str, _SpooledFile | _DestinationFile] = {}
+        self._destinations = destinations or {}
+
+        # Prepare the MIME multipart boundary line patterns.
+        if isinstance(boundary, str):
+            boundary = boundary.encode()
+
+        # State vars, as we may enter the feed() function multiple times.
+        self._response_data = bytearray()
+
+        self._max_lookahead = 8 * 1024 * 1024
+
+        self._parser = _MultipartParser(
+            boundary, self._process_header, self._process_body, max_lookahead=self._max_lookahead
+        )
+
+        # RFC 2046 says that the boundary string needs to be preceded by a CRLF.
+        # Unfortunately, the request library's header parsing logic strips off one of
+        # these, so we'll prime the parser buffer with that missing sequence.
+        self._parser.feed(b'\r\n')
+
+    def _process_header(self, data: memoryview):
+        content_disposition, params = _parse_content_disposition(data)
+        if content_disposition != 'form-data':
+            raise ProtocolError(f'unexpected content disposition: {content_disposition!r}')
+
+        name = params.get('name')
+        if name == 'files':
+            filename = params.get('filename')
+            if filename is None:
+                raise ProtocolError('multipart "files" part missing filename')
+            self._prepare_tempfile(filename)
         elif name != 'response':
             raise ProtocolError(f'unexpected name in content-disposition header: {name!r}')
 
         self._part_type = typing.cast('Literal["response", "files"]', name)
 
-    def _process_body(self, data: bytearray, done: bool = False):
+    def _process_body(self, data: memoryview, done: bool = False):
         if self._part_type == 'response':
             self._response_data.extend(data)
             if done:
@@ -3659,16 +6202,21 @@ class _FilesParser:
                 outfile = self._get_open_tempfile()
                 outfile.write(data)
                 outfile.close()
-                self._headers = None
             else:
                 # Not the end of file data yet. Don't open/close file for intermediate writes
                 outfile = self._get_open_tempfile()
                 outfile.write(data)
 
+    def commit_files(self):
+        """Move the content of files with a destination path into place."""
+        for file in self._files.values():
+            if isinstance(file, _DestinationFile):
+                file.commit()
+
     def remove_files(self):
         """Remove all temporary files on disk."""
         for file in self._files.values():
-            os.unlink(file.name)
+            file.remove()
         self._files.clear()
 
     def feed(self, data: bytes):
@@ -3676,8 +6224,13 @@ class _FilesParser:
         self._parser.feed(data)
 
     def _prepare_tempfile(self, filename: str):
-        tf = tempfile.NamedTemporaryFile(delete=False)  # noqa: SIM115
-        self._files[filename] = tf  # type: ignore # we have a custom protocol for it
+        destination = self._destinations.get(filename)
+        tf: _SpooledFile | _DestinationFile
+        if destination is not None:
+            tf = _DestinationFile(destination)
+        else:
+            tf = _SpooledFile(self._spool_max_size)
+        self._files[filename] = tf
         self.current_filename = filename
 
     def _get_open_tempfile(self):
@@ -3693,19 +6246,57 @@ class _FilesParser:
 
     def get_file(self, path: str | pathlib.PurePath, encoding: str | None) -> _TextOrBinaryIO:
         """Return an open file object containing the data."""
-        path = str(path)
-        mode = 'r' if encoding else 'rb'
-        # We're using text-based file I/O purely for file encoding purposes, not for
-        # newline normalization.  newline='' serves the line endings as-is.
-        newline = '' if encoding else None
-        file_io = open(  # noqa: SIM115
-            self._files[path].name,
-            mode,
-            encoding=encoding,
-            newline=newline,
-        )
-        # open() returns IO[Any]
-        return typing.cast('_TextOrBinaryIO', file_io)
+        file = self._files[str(path)]
+        assert isinstance(file, _SpooledFile), 'file was written to a destination path'
+        return file.open(encoding)
+
+
+_DISPOSITION_PARAM_RE = re.compile(rb';\s*([^\s=;]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)')
+
+
+def _parse_content_disposition(header: memoryview) -> tuple[str | None, dict[str, str]]:
+    """Return the disposition type and parameters from a multipart part header.
+
+    This handles the simple headers that Pebble sends without the overhead of
+    the :mod:`email` package, and falls back to that for anything unusual
+    (folded lines or RFC 2231 extended parameters).
+    """
+    data = bytes(header)
+    value = None
+    for line in data.split(b'\r\n'):
+        if not line:
+            continue
+        name, sep, rest = line.partition(b':')
+        if not sep or line[:1] in (b' ', b'\t'):
+            return _parse_content_disposition_email(data)
+        if name.strip().lower() == b'content-disposition':
+            value = rest
+    if value is None:
+        return None, {}
+
+    disposition, _, rest = value.partition(b';')
+    params: dict[str, str] = {}
+    for match in _DISPOSITION_PARAM_RE.finditer(b';' + rest):
+        key, param = match.group(1).lower(), match.group(2).strip()
+        if key.endswith(b'*'):
+            return _parse_content_disposition_email(data)
+        if param.startswith(b'"'):
+            param = re.sub(rb'\\(.)', rb'\1', param[1:-1])
+        params[key.decode('ascii')] = param.decode('utf-8', 'surrogateescape')
+    return disposition.strip().lower().decode('ascii', 'replace'), params
+
+
+def _parse_content_disposition_email(data: bytes) -> tuple[str | None, dict[str, str]]:
+    parser = email.parser.BytesFeedParser()
+    parser.feed(data)
+    message = parser.close()
+    params = {
+        'name': message.get_param('name', header='content-disposition'),
+        'filename': message.get_filename(),
+    }
+    return message.get_content_disposition(), {
+        key: value for key, value in params.items() if isinstance(value, str)
+    }
 
 
 class _MultipartParser:
@@ -3733,6 +6324,9 @@ class _MultipartParser:
 
             max_boundary_length: maximum number of bytes that can make up a part
             boundary (e.g. \r\n--<marker>--\r\n")
+
+        The data passed to the handlers is a :class:`memoryview` of the parser's
+        buffer, which is only valid for the duration of the call.
         """
         self._marker = marker
         self._handle_header = handle_header
@@ -3740,8 +6334,9 @@ class _MultipartParser:
         self._max_lookahead = max_lookahead
         self._max_boundary_length = max_boundary_length
 
+        # Data not yet passed to a handler; consumed data is deleted from the front.
         self._buf = bytearray()
-        self._pos = 0  # current position in buf
+        self._in_body = False  # whether buf starts part way through a part body
         self._done = False  # whether we have found the terminal boundary and are done parsing
         self._header_terminator = b'\r\n\r\n'
 
@@ -3757,82 +6352,86 @@ class _MultipartParser:
         if not max_boundary_length:
             self._max_boundary_length = len(b'\r\n--' + marker + b'--\r\n') + 99
 
-    def feed(self, data: bytes):
+    def feed(self, data: bytes | bytearray | memoryview):
         """Feeds data incrementally into the parser."""
         if self._done:
             return
-        self._buf.extend(data)
+        buf = self._buf
+        buf += data
 
         while True:
-            # seek to a boundary if we aren't already on one
-            i, n, self._done = _next_part_boundary(self._buf, self._marker)
-            if i == -1 or self._done:
-                return  # waiting for more data or terminal boundary reached
-
-            if self._pos == 0:
-                # parse the part header
-                if self._max_lookahead and len(self._buf) - self._pos > self._max_lookahead:
-                    raise ProtocolError('header terminator not found')
-                term_index = self._buf.find(self._header_terminator)
+            if not self._in_body:
+                # seek to a boundary and parse the part header that follows it
+                i, n, self._done = _next_part_boundary(buf, self._marker)
+                if i == -1 or self._done:
+                    return  # waiting for more data or terminal boundary reached
+                start = i + n
+                # The boundary's CRLF is also the first half of an empty header's terminator.
+                term_index = buf.find(self._header_terminator, start - 2)
                 if term_index == -1:
+                    if self._max_lookahead and len(buf) > self._max_lookahead:
+                        raise ProtocolError('header terminator not found')
                     return  # waiting for more data
-
-                start = i + n
                 # data includes the double CRLF at the end of the header.
                 end = term_index + len(self._header_terminator)
+                with memoryview(buf)[start:end] as header:
+                    self._handle_header(header)
+                del buf[:end]
+                self._in_body = True
+
+            # parse the part body
+            i, _, self._done = _next_part_boundary(buf, self._marker)
+            if i != -1:
+                # part body is finished
+                with memoryview(buf)[:i] as body:
+                    self._handle_body(body, done=True)
+                del buf[:i]
+                self._in_body = False
+                if self._done:
+                    return  # terminal boundary reached
+                continue
 
-                self._handle_header(self._buf[start:end])
-                self._pos = end
-            else:
-                # parse the part body
-                ii, _, self._done = _next_part_boundary(self._buf, self._marker, start=self._pos)
-                safe_bound = max(0, len(self._buf) - self._max_boundary_length)
-                if ii != -1:
-                    # part body is finished
-                    self._handle_body(self._buf[self._pos : ii], done=True)
-                    self._buf = self._buf[ii:]
-                    self._pos = 0
-                    if self._done:
-                        return  # terminal boundary reached
-                elif safe_bound > self._pos:
-                    # write partial body data
-                    partial_data = self._buf[self._pos : safe_bound]
-                    self._pos = safe_bound
-                    self._handle_body(partial_data)
-                    return  # waiting for more data
-                else:
-                    return  # waiting for more data
+            # Write partial body data, holding back enough to find a boundary
+            # that is split across calls to feed.
+            safe_bound = len(buf) - self._max_boundary_length
+            if safe_bound > 0:
+                with memoryview(buf)[:safe_bound] as body:
+                    self._handle_body(body)
+                del buf[:safe_bound]
+            return  # waiting for more data
 
 
 def _next_part_boundary(buf: bytearray, marker: bytes, start: int = 0) -> tuple[int, int, bool]:
     """Returns the index of the next boundary marker in buf beginning at start.
 
+    Occurrences of the marker that are not followed by a valid boundary ending
+    (for example, in file content) are skipped.
+
     Returns:
         (index, length, is_terminal) or (-1, -1, False) if no boundary is found.
     """
     prefix = b'\r\n--' + marker
-    suffix = b'\r\n'
-    terminal_midfix = b'--'
-
-    i = buf.find(prefix, start)
-    if i == -1:
-        return -1, -1, False
-
-    pos = i + len(prefix)
-    is_terminal = False
-    if buf[pos:].startswith(terminal_midfix):
-        is_terminal = True
-        pos += len(terminal_midfix)
-
-    # Note: RFC 2046 notes optional "linear whitespace" (e.g. [ \t]) after the boundary pattern
-    # and the optional "--" suffix.
-    tail = buf[pos:]
-    for c in tail:
-        if c not in b' \t':
-            break
-        pos += 1
+    size = len(buf)
 
-    if buf[pos:].startswith(suffix):
-        pos += len(suffix)
-        return i, pos - i, is_terminal
-    return -1, -1, False
+    while True:
+        i = buf.find(prefix, start)
+        if i == -1:
+            return -1, -1, False
+
+        pos = i + len(prefix)
+        is_terminal = buf.startswith(b'--', pos)
+        if is_terminal:
+            pos += 2
+
+        # Note: RFC 2046 notes optional "linear whitespace" (e.g. [ \t]) after the boundary
+        # pattern and the optional "--" suffix.
+        while pos < size and buf[pos] in b' \t':
+            pos += 1
+
+        if buf.startswith(b'\r\n', pos):
+            pos += 2
+            return i, pos - i, is_terminal
+        tail = buf[pos:]
+        if len(tail) < 2 and (b'\r\n'.startswith(tail) or b'--'.startswith(tail)):
+            return -1, -1, False  # may be a boundary: wait for more data
+        start = i + 1
@@ -0,0 +1,183 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark tests for ops.pebble."""
+
+from __future__ import annotations
+
+import email.message
+import io
+import json
+import os
+import subprocess
+import sys
+import typing
+import urllib.request
+
+import pytest
+
+import test.fake_pebble as fake_pebble
+from ops import pebble
+
+
+@pytest.fixture
+def socket_path() -> typing.Generator[str, None, None]:
+    shutdown, socket_path = fake_pebble.start_server()
+    yield socket_path
+    shutdown()
+
+
+# Note: the 'benchmark' argument here is a fixture that pytest-benchmark
+# automatically makes available to all tests.
+@pytest.mark.parametrize('max_idle', [0, 4], ids=['new-connection', 'keep-alive'])
+def test_request_latency(benchmark, socket_path: str, max_idle: int):
+    opener = urllib.request.OpenerDirector()
+    opener.add_handler(pebble._UnixSocketHandler(socket_path, max_idle=max_idle))
+    opener.add_handler(urllib.request.HTTPDefaultErrorHandler())
+    opener.add_handler(urllib.request.HTTPErrorProcessor())
+    client = pebble.Client(socket_path=socket_path, opener=opener)
+    info = benchmark(client.get_system_info)
+    client.close()
+    assert info.version == '3.14.159'
+
+
+def test_import_time(benchmark):
+    # Each run is a fresh interpreter, so this includes the cost of starting
+    # Python, but changes in the time are from importing ops.pebble.
+    environ = os.environ.copy()
+    environ['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), environ.get('PYTHONPATH')]))
+    command = [sys.executable, '-c', 'import ops.pebble']
+    kwargs = {'env': environ, 'check': True}
+    benchmark.pedantic(subprocess.run, args=(command,), kwargs=kwargs, rounds=5)
+
+
+class _FilesClient(pebble.Client):
+    """A client that serves a canned multipart files response from memory."""
+
+    def __init__(self, body: bytes):
+        super().__init__(socket_path='/nonexistent')
+        self._body = body
+
+    def _request_raw(self, *args: typing.Any, **kwargs: typing.Any):
+        headers = email.message.Message()
+        headers['Content-Type'] = f'multipart/form-data; boundary={_BOUNDARY}'
+        return _FilesResponse(headers, self._body)
+
+
+class _FilesResponse:
+    def __init__(self, headers: email.message.Message, body: bytes):
+        self.headers = headers
+        reader = io.BytesIO(body)
+        self.read = reader.read
+        self.readinto = reader.readinto
+
+
+_BOUNDARY = '01234567890123456789012345678901'
+
+
+def _files_body(files: dict[str, bytes]) -> bytes:
+    parts: list[bytes] = []
+    for path, content in files.items():
+        parts.append(
+            f'--{_BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="files"; filename="{path}"\r\n'
+            '\r\n'.encode()
+            + content
+            + b'\r\n'
+        )
+    response = {'result': [{'path': path} for path in files], 'status-code': 200, 'type': 'sync'}
+    parts.append(
+        f'--{_BOUNDARY}\r\nContent-Disposition: form-data; name="response"\r\n\r\n'.encode()
+        + json.dumps(response).encode()
+        + f'\r\n--{_BOUNDARY}--\r\n'.encode()
+    )
+    # The client's HTTP layer strips the leading CRLF of the first boundary.
+    return b''.join(parts)
+
+
+def _pull_all(client: pebble.Client, paths: list[str]):
+    files = client.pull_many(paths, encoding=None)
+    for file in files.values():
+        file.close()
+
+
+@pytest.mark.parametrize(
+    'count,size',
+    [(1, 32 * 1024 * 1024), (4096, 4 * 1024)],
+    ids=['large-file', 'many-small-files'],
+)
+def test_pull_throughput(benchmark, count: int, size: int):
+    content = bytes(range(256)) * (size // 256)
+    files = {f'/data/file{i}': content for i in range(count)}
+    client = _FilesClient(_files_body(files))
+    benchmark(_pull_all, client, list(files))
+    benchmark.extra_info['MB/s'] = count * size / benchmark.stats.stats.mean / 1e6
+
+
+class _CannedClient(pebble.Client):
+    """A client that returns a canned JSON result for every request."""
+
+    def __init__(self, result: typing.Any):
+        super().__init__(socket_path='/nonexistent')
+        # Round-trip through JSON so each request decodes a fresh response.
+        self._body = json.dumps({'result': result, 'status-code': 200, 'type': 'sync'})
+
+    def _request(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        return json.loads(self._body)
+
+
+def _change_dict(i: int) -> dict[str, typing.Any]:
+    task = {
+        'id': str(i),
+        'kind': 'start',
+        'summary': 'Start service "svc"',
+        'status': 'Done',
+        'progress': {'label': '', 'done': 1, 'total': 1},
+        'spawn-time': '2024-01-02T03:04:05.123456789Z',
+        'ready-time': '2024-01-02T03:04:06.123456789Z',
+    }
+    return {
+        'id': str(i),
+        'kind': 'start',
+        'summary': 'Start service "svc"',
+        'status': 'Done',
+        'tasks': [task],
+        'ready': True,
+        'spawn-time': '2024-01-02T03:04:05.123456789Z',
+        'ready-time': '2024-01-02T03:04:06.123456789Z',
+    }
+
+
+def _notice_dict(i: int) -> dict[str, typing.Any]:
+    return {
+        'id': str(i),
+        'type': 'custom',
+        'key': f'example.com/key{i}',
+        'first-occurred': '2024-01-02T03:04:05.123456789Z',
+        'last-occurred': '2024-01-02T03:04:06.123456789Z',
+        'last-repeated': '2024-01-02T03:04:06.123456789Z',
+        'occurrences': 1,
+    }
+
+
+def test_get_changes(benchmark):
+    client = _CannedClient([_change_dict(i) for i in range(500)])
+    changes = benchmark(client.get_changes)
+    assert all(change.ready for change in changes)
+
+
+def test_get_notices(benchmark):
+    client = _CannedClient([_notice_dict(i) for i in range(500)])
+    notices = benchmark(client.get_notices)
+    assert len(notices) == 500
@@ -42,6 +42,8 @@ _Response = typing.TypedDict(
 
 
 class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
     _route = list[tuple[typing.Literal['GET', 'POST'], typing.Any, typing.Callable[..., None]]]
 
     def __init__(
@@ -63,10 +65,11 @@ class Handler(http.server.BaseHTTPRequestHandler):
 
     def respond(self, d: _Response, status: int = 200):
         self.send_response(status)
+        d_json = json.dumps(d, indent=4, sort_keys=True).encode('utf-8')
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(d_json)))
         self.end_headers()
-        d_json = json.dumps(d, indent=4, sort_keys=True)
-        self.wfile.write(d_json.encode('utf-8'))
+        self.wfile.write(d_json)
 
     def bad_request(self, message: str):
         d: _Response = {
@@ -187,7 +190,8 @@ def start_server() -> tuple[typing.Callable[[], None], str]:
     socket_dir = tempfile.mkdtemp(prefix='test-ops.pebble')
     socket_path = os.path.join(socket_dir, 'test.socket')
 
-    server = socketserver.UnixStreamServer(socket_path, Handler)
+    server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    server.daemon_threads = True
     thread = threading.Thread(target=server.serve_forever)
     thread.start()
 
@@ -1113,6 +1113,47 @@ def test_collect_app_and_unit_status(request: pytest.FixtureRequest, fake_script
     ]
 
 
+def test_add_cached_status(request: pytest.FixtureRequest, fake_script: FakeScript):
+    key = 'a'
+    calls: list[str] = []
+
+    class MyCharm(ops.CharmBase):
+        def __init__(self, framework: ops.Framework):
+            super().__init__(framework)
+            self.framework.observe(self.on.collect_unit_status, self._on_collect_status)
+
+        def _on_collect_status(self, event: ops.CollectStatusEvent):
+            event.add_cached_status('webapp', key, self._get_status)
+
+        def _get_status(self) -> ops.StatusBase:
+            calls.append(key)
+            return ops.BlockedStatus(f'key {key}')
+
+    fake_script.write('is-leader', 'echo false')
+    fake_script.write('status-set', 'exit 0')
+
+    framework = create_framework(request)
+    charm = MyCharm(framework)
+
+    def evaluate() -> ops.StatusBase:
+        charm.unit._collected_statuses.clear()
+        ops.charm._evaluate_status(charm)
+        return charm.unit.status
+
+    assert evaluate() == ops.BlockedStatus('key a')
+    assert evaluate() == ops.BlockedStatus('key a')
+    assert calls == ['a']
+    key = 'b'
+    assert evaluate() == ops.BlockedStatus('key b')
+    assert calls == ['a', 'b']
+
+    framework.commit()
+    stored = framework._storage.load_snapshot('StoredStateData[_stored]')
+    assert stored['collected_statuses'] == {
+        'collect_unit_status/webapp': ['b', 'blocked', 'key b'],
+    }
+
+
 def test_add_status_type_error(request: pytest.FixtureRequest, fake_script: FakeScript):
     class MyCharm(ops.CharmBase):
         def __init__(self, framework: ops.Framework):
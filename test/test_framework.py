@@ -347,6 +347,39 @@ class TestFramework:
             framework.observe(pub.baz, obs._on_baz)  # type: ignore
         framework.observe(pub.qux, obs._on_qux)
 
+    def test_config_changes_across_dispatches(
+        self, request: pytest.FixtureRequest, tmp_path: pathlib.Path
+    ):
+        config: dict[str, bool | int | float | str] = {'foo': 'a', 'bar': 1}
+
+        def dispatch(read_config: bool = True) -> ops.ConfigData:
+            model = create_model()
+            model._backend.config_get = lambda: dict(config)  # type: ignore
+            framework = create_framework(request, model=model, tmpdir=tmp_path)
+            if read_config:
+                _ = model.config['bar']
+            framework.commit()
+            framework.close()
+            return model.config
+
+        # Nothing has been recorded yet, so every option is reported as changed.
+        first = dispatch()
+        assert first.changed_keys() == {'foo', 'bar'}
+        assert first.diff() == {'foo': (None, 'a'), 'bar': (None, 1)}
+
+        assert dispatch().changed_keys() == set()
+
+        del config['foo']
+        config.update(bar=2, baz=True)
+        changed = dispatch()
+        assert changed.changed_keys() == {'foo', 'bar', 'baz'}
+        assert changed.diff() == {'foo': ('a', None), 'bar': (1, 2), 'baz': (None, True)}
+
+        # If the charm doesn't read its config, the recorded config is left alone.
+        config['bar'] = 3
+        dispatch(read_config=False)
+        assert dispatch().diff() == {'bar': (2, 3)}
+
     def test_on_pre_commit_emitted(self, request: pytest.FixtureRequest, tmp_path: pathlib.Path):
         framework = create_framework(request, tmpdir=tmp_path)
 
@@ -14,6 +14,7 @@
 
 from __future__ import annotations
 
+import importlib
 import os
 import pathlib
 import subprocess
@@ -22,6 +23,7 @@ import types
 
 import pytest
 
+import ops
 import ops.testing
 
 
@@ -52,6 +54,71 @@ def test_import(mod_name: str, tmp_path: pathlib.Path):
     assert proc.returncode == 0
 
 
+def test_import_skips_exec_dependencies():
+    # websocket-client is only needed for Pebble exec, so importing ops
+    # shouldn't import it.
+    code = 'import sys, ops.pebble; assert "websocket" not in sys.modules'
+    environ = os.environ.copy()
+    environ['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), environ.get('PYTHONPATH')]))
+    proc = subprocess.run([sys.executable, '-c', code], env=environ)
+    assert proc.returncode == 0
+
+
+def test_import_is_lazy():
+    # Hooks pay for "import ops" on every run, so it should only import what
+    # it needs to define the package, and the rest when it's first used.
+    environ = os.environ.copy()
+    environ['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), environ.get('PYTHONPATH')]))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ops'],
+        env=environ,
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    # Each line is "import time: <self us> | <cumulative us> | <indent><module>".
+    imported = {
+        line.split('|')[-1].strip()
+        for line in proc.stderr.splitlines()
+        if line.startswith('import time:')
+    }
+    ops_modules = {name for name in imported if name.startswith('ops')}
+    assert ops_modules <= {'ops', 'ops.main', 'ops.version'}
+    assert not imported & {'ops_tracing', 'opentelemetry', 'yaml', 'websocket'}
+
+
+@pytest.mark.parametrize('module_name', ['ops', 'ops.framework', 'ops.model', 'ops.charm'])
+def test_type_hints(module_name: str):
+    # Annotations can be resolved at runtime, whichever module is imported first.
+    code = (
+        f'import sys, typing, {module_name}, ops\n'
+        'typing.get_type_hints(ops.Framework.__init__)\n'
+        'typing.get_type_hints(ops.Object)\n'
+        'typing.get_type_hints(ops.main.__call__)\n'
+        'typing.get_type_hints(ops.main.main)\n'
+        "typing.get_type_hints(sys.modules['ops.main'].main)\n"
+    )
+    environ = os.environ.copy()
+    environ['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), environ.get('PYTHONPATH')]))
+    proc = subprocess.run(
+        [sys.executable, '-c', code], env=environ, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_lazy_names():
+    special_names = {'__version__', 'main', 'tracing', 'pebble'}
+    assert set(ops._lazy_names) == set(ops.__all__) - special_names
+    for name, module_name in ops._lazy_names.items():
+        module = importlib.import_module(f'ops.{module_name}')
+        assert getattr(ops, name) is getattr(module, name)
+    assert ops.pebble is importlib.import_module('ops.pebble')
+    assert isinstance(ops.main, ops._Main)
+    assert set(ops.__all__) <= set(dir(ops))
+    with pytest.raises(AttributeError):
+        ops.NotAName  # type: ignore
+
+
 def test_ops_testing_doc():
     """Ensure that ops.testing's documentation includes all the expected names."""
     # We only document public classes and functions.
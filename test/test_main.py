@@ -35,7 +35,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 import ops
-from ops._main import _should_use_controller_storage
+from ops._main import _load_charm_meta, _should_use_controller_storage
 from ops.jujucontext import JujuContext
 from ops.storage import SQLiteStorage
 
@@ -177,6 +177,33 @@ class TestCharmInit:
             self._check(MyCharm)
         assert warn_cm == []
 
+    def test_pebble_clients_closed(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(ops.model, '_pebble_clients', {})
+        closed: list[str] = []
+        monkeypatch.setattr(
+            ops.pebble.Client, 'close', lambda self: closed.append(self.socket_path)
+        )
+        socket_path = '/charm/containers/foo/pebble.socket'
+
+        class MyCharm(ops.CharmBase):
+            def __init__(self, framework: ops.Framework):
+                super().__init__(framework)
+                backend = framework.model._backend
+                assert backend.get_pebble(socket_path) is backend.get_pebble(socket_path)
+                assert not closed
+
+        self._check(MyCharm)
+        assert closed == [socket_path]
+        assert ops.model._pebble_clients == {}
+
+    def test_tracing_uses_charm_meta(self, monkeypatch: pytest.MonkeyPatch):
+        tracing = MagicMock()
+        monkeypatch.setattr(ops, 'tracing', tracing)
+        self._check(ops.CharmBase)
+        _, name, charm_meta = tracing._setup.call_args.args
+        assert name == 'CharmBase'
+        assert charm_meta.name == 'test'
+
     def test_storage_no_storage(self):
         # here we patch juju_backend_available so it refuses to set it up
         with patch('ops.storage.juju_backend_available') as juju_backend_available:
@@ -237,6 +264,115 @@ class TestDispatch:
         assert event == 'potatos'
 
 
+@patch('ops._main.setup_root_logging', new=lambda *a, **kw: None)  # type: ignore
+def test_unchanged_unit_status_not_set(request: pytest.FixtureRequest, tmp_path: Path):
+    fake_script = FakeScript(request)
+    fake_script.write('is-leader', 'echo false')
+    fake_script.write('status-set', 'exit 0')
+    statuses: list[ops.StatusBase] = []
+
+    class MyCharm(ops.CharmBase):
+        def __init__(self, framework: ops.Framework):
+            super().__init__(framework)
+            framework.observe(self.on.collect_unit_status, self._on_collect_status)
+
+        def _on_collect_status(self, event: ops.CollectStatusEvent):
+            event.add_status(statuses.pop(0))
+
+    (tmp_path / 'metadata.yaml').write_text('name: test')
+    fake_environ = {
+        'JUJU_UNIT_NAME': 'test_main/0',
+        'JUJU_MODEL_NAME': 'mymodel',
+        'JUJU_VERSION': '3.6.0',
+        'JUJU_CHARM_DIR': str(tmp_path),
+        'JUJU_DISPATCH_PATH': 'hooks/update-status',
+    }
+
+    def dispatch(status: ops.StatusBase) -> list[list[str]]:
+        statuses.append(status)
+        with patch.dict(os.environ, fake_environ):
+            ops.main(MyCharm)
+        calls = fake_script.calls(clear=True)
+        return [call for call in calls if call[0] == 'status-set']
+
+    assert dispatch(ops.ActiveStatus()) == [
+        ['status-set', '--application=False', 'active', '--', '']
+    ]
+    assert dispatch(ops.ActiveStatus()) == []
+    assert dispatch(ops.BlockedStatus('no db')) == [
+        ['status-set', '--application=False', 'blocked', '--', 'no db']
+    ]
+    assert dispatch(ops.BlockedStatus('no db')) == []
+
+    # If a dispatch fails after setting the status, the next dispatch can't
+    # rely on the recorded status.
+    class FailingCharm(MyCharm):
+        def __init__(self, framework: ops.Framework):
+            super().__init__(framework)
+            self.unit.status = ops.MaintenanceStatus('upgrading')
+            raise RuntimeError('failed')
+
+    with patch.dict(os.environ, fake_environ), pytest.raises(RuntimeError):
+        ops.main(FailingCharm)
+    fake_script.calls(clear=True)
+    assert dispatch(ops.BlockedStatus('no db')) == [
+        ['status-set', '--application=False', 'blocked', '--', 'no db']
+    ]
+
+
+def test_charm_meta_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    cache_path = tmp_path / '.unit-meta-cache.json'
+    (tmp_path / 'metadata.yaml').write_text('name: test\nrequires:\n  db:\n    interface: sql\n')
+    (tmp_path / 'config.yaml').write_text('options:\n  port:\n    type: int\n    default: 80\n')
+
+    meta = _load_charm_meta(tmp_path, cache_path)
+    assert meta.name == 'test'
+    assert list(meta.requires) == ['db']
+    assert meta.config['port'].default == 80
+    assert meta.actions == {}
+    assert cache_path.exists()
+
+    # The second load uses the cache rather than parsing the YAML.
+    def safe_load(stream: typing.Any):
+        raise AssertionError('YAML parsed')
+
+    monkeypatch.setattr(ops._main.yaml, 'safe_load', safe_load)
+    meta = _load_charm_meta(tmp_path, cache_path)
+    assert meta.name == 'test'
+    assert meta.requires['db'].interface_name == 'sql'
+    assert meta.config['port'].default == 80
+    monkeypatch.undo()
+
+    # Changing or adding a file invalidates the cache.
+    (tmp_path / 'config.yaml').write_text('options:\n  port:\n    type: int\n    default: 8080\n')
+    (tmp_path / 'actions.yaml').write_text('backup:\n  description: Back up the database.\n')
+    meta = _load_charm_meta(tmp_path, cache_path)
+    assert meta.config['port'].default == 8080
+    assert list(meta.actions) == ['backup']
+
+    # A broken cache is ignored, and replaced.
+    cache_path.write_text('{')
+    meta = _load_charm_meta(tmp_path, cache_path)
+    assert meta.config['port'].default == 8080
+    assert json.loads(cache_path.read_text())['config']['options']['port']['default'] == 8080
+
+
+def test_charm_meta_cache_not_json(tmp_path: Path):
+    cache_path = tmp_path / '.unit-meta-cache.json'
+    (tmp_path / 'metadata.yaml').write_text('name: test\n')
+    # YAML parses this as a date, which JSON can't represent.
+    config = 'options:\n  since:\n    type: string\n    default: 2024-01-02\n'
+    (tmp_path / 'config.yaml').write_text(config)
+    meta = _load_charm_meta(tmp_path, cache_path)
+    assert meta.config['since'].default == datetime.date(2024, 1, 2)
+    assert not cache_path.exists()
+
+
+def test_charm_meta_cache_missing_metadata(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        _load_charm_meta(tmp_path, tmp_path / '.unit-meta-cache.json')
+
+
 _event_test = list[tuple[EventSpec, dict[str, str | int | None]]]
 
 
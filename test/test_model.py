@@ -14,7 +14,9 @@
 
 from __future__ import annotations
 
+import dataclasses
 import datetime
+import hashlib
 import io
 import ipaddress
 import json
@@ -24,6 +26,7 @@ import pathlib
 import re
 import sys
 import tempfile
+import threading
 import typing
 import unittest
 import warnings
@@ -384,6 +387,43 @@ class TestModel:
             ],
         )
 
+    @pytest.mark.parametrize('max_workers', [1, 4])
+    def test_relation_data_load_all(
+        self, harness: ops.testing.Harness[ops.CharmBase], max_workers: int
+    ):
+        relation_id = harness.add_relation('db1', 'remoteapp1')
+        harness.update_relation_data(relation_id, 'remoteapp1', {'secret': 'cafedeadbeef'})
+        harness.update_relation_data(relation_id, 'myapp', {'ours': 'x'})
+        for i in range(3):
+            harness.add_relation_unit(relation_id, f'remoteapp1/{i}')
+            harness.update_relation_data(relation_id, f'remoteapp1/{i}', {'host': f'h{i}'})
+        harness.set_leader(False)
+        harness.model.relations._invalidate('db1')
+        self.resetBackendCalls(harness)
+
+        with harness._event_context('foo_event'):
+            rel_db1 = self.ensure_relation(harness, 'db1')
+            rel_db1.data.load_all(max_workers=max_workers)
+            calls = harness._get_backend_calls(reset=True)
+            loaded = sorted(call[2] for call in calls if call[0] == 'relation_get')
+            # A non-leader can't read its own application databag.
+            assert loaded == [
+                'myapp/0',
+                'remoteapp1',
+                'remoteapp1/0',
+                'remoteapp1/1',
+                'remoteapp1/2',
+            ]
+
+            for i, unit in enumerate(sorted(rel_db1.units, key=lambda u: u.name)):
+                assert rel_db1.data[unit] == {'host': f'h{i}'}
+            assert rel_db1.app is not None
+            assert rel_db1.data[rel_db1.app] == {'secret': 'cafedeadbeef'}
+            # Everything was already loaded.
+            rel_db1.data.load_all(max_workers=max_workers)
+            calls = harness._get_backend_calls(reset=True)
+            assert [call for call in calls if call[0] == 'relation_get'] == []
+
     def test_relation_data_modify_remote(self, harness: ops.testing.Harness[ops.CharmBase]):
         relation_id = harness.add_relation('db1', 'remoteapp1')
         with harness._event_context('foo_event'):
@@ -1034,6 +1074,51 @@ class TestModel:
         ]
         self.assertBackendCalls(harness, expected_calls)
 
+    def test_unchanged_status_not_set(self, harness: ops.testing.Harness[ops.CharmBase]):
+        harness.set_leader(True)
+        harness._get_backend_calls(reset=True)
+        harness.model.unit.status = ops.ActiveStatus('Green')
+        harness.model.unit.status = ops.ActiveStatus('Green')
+        harness.model.app.status = ops.BlockedStatus('Red')
+        harness.model.app.status = ops.BlockedStatus('Red')
+        harness.model.unit.status = ops.WaitingStatus('Green')
+        self.assertBackendCalls(
+            harness,
+            [
+                ('status_set', 'active', 'Green', {'is_app': False}),
+                ('is_leader',),
+                ('status_set', 'blocked', 'Red', {'is_app': True}),
+                ('is_leader',),
+                ('status_set', 'waiting', 'Green', {'is_app': False}),
+            ],
+        )
+
+    def test_forced_status_set(self, harness: ops.testing.Harness[ops.CharmBase]):
+        harness.set_leader(True)
+        harness.model.unit.status = ops.ActiveStatus('Green')
+        harness.model.app.status = ops.BlockedStatus('Red')
+        harness._get_backend_calls(reset=True)
+        harness.model.unit.set_status(ops.ActiveStatus('Green'), force=True)
+        harness.model.app.set_status(ops.BlockedStatus('Red'), force=True)
+        harness.model.unit.set_status(ops.ActiveStatus('Green'))
+        self.assertBackendCalls(
+            harness,
+            [
+                ('status_set', 'active', 'Green', {'is_app': False}),
+                ('is_leader',),
+                ('status_set', 'blocked', 'Red', {'is_app': True}),
+            ],
+        )
+        assert harness.model.unit.status == ops.ActiveStatus('Green')
+
+    def test_status_read_not_set_again(self, harness: ops.testing.Harness[ops.CharmBase]):
+        harness.model.unit.status = ops.ActiveStatus('Green')
+        harness.model.unit._invalidate()
+        harness._get_backend_calls(reset=True)
+        assert harness.model.unit.status == ops.ActiveStatus('Green')
+        harness.model.unit.status = ops.ActiveStatus('Green')
+        self.assertBackendCalls(harness, [('status_get', {'is_app': False})])
+
     def test_set_app_status_non_leader_raises(
         self,
         harness: ops.testing.Harness[ops.CharmBase],
@@ -1636,6 +1721,268 @@ def test_push_path_relative(case: PushPullCase, request: pytest.FixtureRequest):
             os.chdir(cwd)
 
 
+def test_pull_path_batches(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+):
+    harness = ops.testing.Harness(
+        ops.CharmBase,
+        meta="""
+        name: test-app
+        containers:
+          foo:
+            resource: foo-image
+        """,
+    )
+    request.addfinalizer(harness.cleanup)
+    harness.begin()
+    harness.set_can_connect('foo', True)
+    container = harness.model.unit.containers['foo']
+    for i in range(5):
+        container.push(f'/src/dir/file{i}', f'content {i}', make_dirs=True)
+    container.push('/src/other', 'other')
+
+    pebble_client = container._pebble
+    batches: list[list[str]] = []
+    original_pull_many = pebble_client.pull_many
+
+    def pull_many(paths: list[str], *, encoding: str | None = 'utf-8'):
+        batches.append(list(paths))
+        if '/src/dir/file3' in paths:
+            raise pebble.PathError('permission-denied', 'nope')
+        return original_pull_many(paths, encoding=encoding)
+
+    original_pull = pebble_client.pull
+
+    def pull(path: str, *, encoding: str | None = 'utf-8'):
+        if path == '/src/dir/file3':
+            raise pebble.PathError('permission-denied', 'nope')
+        return original_pull(path, encoding=encoding)
+
+    monkeypatch.setattr(pebble_client, 'pull_many', pull_many)
+    monkeypatch.setattr(pebble_client, 'pull', pull)
+    monkeypatch.setattr(ops.Container, '_pull_batch_files', 2)
+
+    with pytest.raises(ops.MultiPushPullError) as excinfo:
+        container.pull_path(['/src/dir', '/src/other', '/src/dir/file0'], tmp_path)
+
+    # The listing order isn't defined, but each source's files are batched in turn.
+    assert [len(batch) for batch in batches] == [2, 2, 2, 1]
+    pulled = [path for batch in batches[:3] for path in batch]
+    assert sorted(pulled[:5]) == [f'/src/dir/file{i}' for i in range(5)]
+    assert batches[2][1] == '/src/other'
+    assert batches[3] == ['/src/dir/file0']
+    assert [(src, str(err)) for src, err in excinfo.value.errors] == [
+        ('/src/dir', 'permission-denied - nope'),
+    ]
+    for i in range(5):
+        path = tmp_path / 'dir' / f'file{i}'
+        if i == 3:
+            assert not path.exists()
+        else:
+            assert path.read_text() == f'content {i}'
+    assert (tmp_path / 'other').read_text() == 'other'
+    assert (tmp_path / 'file0').read_text() == 'content 0'
+
+
+def test_push_path_batches(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+):
+    harness = ops.testing.Harness(
+        ops.CharmBase,
+        meta="""
+        name: test-app
+        containers:
+          foo:
+            resource: foo-image
+        """,
+    )
+    request.addfinalizer(harness.cleanup)
+    harness.begin()
+    harness.set_can_connect('foo', True)
+    container = harness.model.unit.containers['foo']
+
+    src = tmp_path / 'src'
+    for i in range(5):
+        (src / 'a' / 'b').mkdir(parents=True, exist_ok=True)
+        (src / 'a' / 'b' / f'file{i}').write_text(f'content {i}')
+    (src / 'script').write_text('script')
+    (src / 'script').chmod(0o755)
+    (src / 'empty' / 'nested').mkdir(parents=True)
+    (src / 'bad').write_text('bad')
+
+    pebble_client = container._pebble
+    calls: list[tuple[str, typing.Any]] = []
+    original_push_many = pebble_client.push_many
+    original_pebble_push = pebble_client.push
+    original_push = container.push
+    original_make_dir = container.make_dir
+
+    def push_many(files: dict[str, typing.Any], **kwargs: typing.Any):
+        calls.append(('push_many', sorted(str(path) for path in files)))
+        return original_push_many(files, **kwargs)
+
+    def pebble_push(path: str, source: typing.Any, **kwargs: typing.Any):
+        if str(path) == '/dst/src/bad':
+            raise pebble.PathError('permission-denied', 'nope')
+        return original_pebble_push(path, source, **kwargs)
+
+    def push(path: str, source: typing.Any, **kwargs: typing.Any):
+        calls.append(('push', str(path)))
+        return original_push(path, source, **kwargs)
+
+    def make_dir(path: str, **kwargs: typing.Any):
+        calls.append(('make_dir', str(path)))
+        return original_make_dir(path, **kwargs)
+
+    monkeypatch.setattr(pebble_client, 'push_many', push_many)
+    monkeypatch.setattr(pebble_client, 'push', pebble_push)
+    monkeypatch.setattr(container, 'push', push)
+    monkeypatch.setattr(container, 'make_dir', make_dir)
+    monkeypatch.setattr(ops.Container, '_push_batch_files', 3)
+
+    with pytest.raises(ops.MultiPushPullError) as excinfo:
+        container.push_path(src, '/dst')
+    assert [(path, str(err)) for path, err in excinfo.value.errors] == [
+        (str(src), 'permission-denied - nope'),
+    ]
+
+    # Only directories that don't contain another are created explicitly.
+    assert sorted(path for kind, path in calls if kind == 'make_dir') == [
+        '/dst/src/a/b',
+        '/dst/src/empty/nested',
+    ]
+    # Each file has its own mode, so files with different modes share a batch.
+    push_many_calls = [paths for kind, paths in calls if kind == 'push_many']
+    assert sorted(len(paths) for paths in push_many_calls) == [1, 3, 3]
+    # The batch with the bad file fell back to one push per file.
+    bad_batch = next(paths for paths in push_many_calls if '/dst/src/bad' in paths)
+    assert sorted(path for kind, path in calls if kind == 'push') == bad_batch
+
+    for i in range(5):
+        with container.pull(f'/dst/src/a/b/file{i}') as f:
+            assert f.read() == f'content {i}'
+    with container.pull('/dst/src/script') as f:
+        assert f.read() == 'script'
+    assert container.list_files('/dst/src/script')[0].permissions == 0o755
+    file0_mode = (src / 'a' / 'b' / 'file0').stat().st_mode & 0o777
+    assert container.list_files('/dst/src/a/b/file0')[0].permissions == file0_mode
+    assert container.isdir('/dst/src/empty/nested')
+    assert not container.exists('/dst/src/bad')
+
+
+def test_pull_path_max_workers(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+):
+    harness = ops.testing.Harness(
+        ops.CharmBase,
+        meta="""
+        name: test-app
+        containers:
+          foo:
+            resource: foo-image
+        """,
+    )
+    request.addfinalizer(harness.cleanup)
+    harness.begin()
+    harness.set_can_connect('foo', True)
+    container = harness.model.unit.containers['foo']
+    for d in range(4):
+        for i in range(3):
+            container.push(f'/src/dir{d}/sub/file{i}', f'content {d} {i}', make_dirs=True)
+
+    pebble_client = container._pebble
+    threads: set[int] = set()
+    original_list_files = pebble_client.list_files
+    original_pull_many = pebble_client.pull_many
+
+    def list_files(path: str, **kwargs: typing.Any):
+        threads.add(threading.get_ident())
+        if str(path) == '/src/dir2':
+            raise pebble.APIError({}, 403, 'Forbidden', 'cannot list dir2')
+        return original_list_files(path, **kwargs)
+
+    def pull_many(paths: list[str], *, encoding: str | None = 'utf-8'):
+        threads.add(threading.get_ident())
+        if '/src/dir1/sub/file1' in paths:
+            raise pebble.PathError('permission-denied', 'nope')
+        return original_pull_many(paths, encoding=encoding)
+
+    original_pull = pebble_client.pull
+
+    def pull(path: str, *, encoding: str | None = 'utf-8'):
+        if path == '/src/dir1/sub/file1':
+            raise pebble.PathError('permission-denied', 'nope')
+        return original_pull(path, encoding=encoding)
+
+    monkeypatch.setattr(pebble_client, 'list_files', list_files)
+    monkeypatch.setattr(pebble_client, 'pull_many', pull_many)
+    monkeypatch.setattr(pebble_client, 'pull', pull)
+    monkeypatch.setattr(ops.Container, '_pull_batch_files', 2)
+
+    sources = ['/src/dir0', '/src/dir1', '/src/dir2', '/src/dir3']
+    with pytest.raises(ops.MultiPushPullError) as excinfo:
+        container.pull_path(sources, tmp_path, max_workers=4)
+
+    # Subdirectories are listed, and files pulled, in worker threads.
+    assert threads - {threading.get_ident()}
+    # The errors are in the same order as when pulling one file at a time.
+    assert [(src, str(err)) for src, err in excinfo.value.errors] == [
+        ('/src/dir1', 'permission-denied - nope'),
+        ('/src/dir2', 'cannot list dir2'),
+    ]
+    for d in (0, 1, 3):
+        for i in range(3):
+            path = tmp_path / f'dir{d}' / 'sub' / f'file{i}'
+            if (d, i) == (1, 1):
+                assert not path.exists()
+            else:
+                assert path.read_text() == f'content {d} {i}'
+    assert not (tmp_path / 'dir2').exists()
+
+
+def test_push_path_max_workers(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+):
+    harness = ops.testing.Harness(
+        ops.CharmBase,
+        meta="""
+        name: test-app
+        containers:
+          foo:
+            resource: foo-image
+        """,
+    )
+    request.addfinalizer(harness.cleanup)
+    harness.begin()
+    harness.set_can_connect('foo', True)
+    container = harness.model.unit.containers['foo']
+
+    src = tmp_path / 'src'
+    for d in range(4):
+        (src / f'dir{d}').mkdir(parents=True)
+        for i in range(3):
+            (src / f'dir{d}' / f'file{i}').write_text(f'content {d} {i}')
+
+    pebble_client = container._pebble
+    threads: set[int] = set()
+    original_push_many = pebble_client.push_many
+
+    def push_many(files: dict[str, typing.Any], **kwargs: typing.Any):
+        threads.add(threading.get_ident())
+        return original_push_many(files, **kwargs)
+
+    monkeypatch.setattr(pebble_client, 'push_many', push_many)
+    monkeypatch.setattr(ops.Container, '_push_batch_files', 2)
+
+    container.push_path(src, '/dst', max_workers=4)
+
+    assert threads and threading.get_ident() not in threads
+    for d in range(4):
+        for i in range(3):
+            with container.pull(f'/dst/src/dir{d}/file{i}') as f:
+                assert f.read() == f'content {d} {i}'
+
+
 class TestApplication:
     @pytest.fixture
     def harness(self):
@@ -1901,6 +2248,32 @@ containers:
             container.restart('foo')
         assert excinfo.value.code == 500
 
+    def test_no_wait(self, container: ops.Container):
+        def services_action(action: str):
+            def method(*args: typing.Any, **kwargs: typing.Any):
+                container.pebble.requests.append((action, *args, kwargs))  # type: ignore
+                return pebble.ChangeID(str(len(container.pebble.requests)))  # type: ignore
+
+            return method
+
+        for action in ('autostart', 'replan', 'start', 'restart', 'stop'):
+            setattr(container.pebble, f'{action}_services', services_action(action))
+
+        assert container.autostart(wait=False) == '1'
+        assert container.replan(wait=False) == '2'
+        assert container.start('foo', wait=False) == '3'
+        assert container.restart('foo', 'bar', wait=False) == '4'
+        assert container.stop('foo', wait=False) == '5'
+        container.replan()
+        assert container.pebble.requests == [  # type: ignore
+            ('autostart', {'timeout': 0}),
+            ('replan', {'timeout': 0}),
+            ('start', ('foo',), {'timeout': 0}),
+            ('restart', ('foo', 'bar'), {'timeout': 0}),
+            ('stop', ('foo',), {'timeout': 0}),
+            ('replan', {}),
+        ]
+
     def test_restart_no_arguments(self, container: ops.Container):
         with pytest.raises(TypeError):
             container.restart()
@@ -1947,6 +2320,87 @@ containers:
         assert isinstance(plan, pebble.Plan)
         assert plan.to_yaml() == yaml.safe_dump(yaml.safe_load(plan_yaml))
 
+    def test_get_plan_cached(self, container: ops.Container):
+        client = typing.cast('MockPebbleClient', container._pebble)
+        client.responses.append(pebble.Plan('services:\n foo:\n  command: bar'))
+        plan = container.get_plan()
+        plan.services['foo'].command = 'changed'
+        assert container.get_plan().services['foo'].command == 'bar'
+        assert client.requests == [('get_plan',)]
+
+        # Adding a layer may change the plan, so it's fetched again.
+        container.add_layer('a', 'summary: str\n')
+        client.responses.append(pebble.Plan('services:\n foo:\n  command: baz'))
+        assert container.get_plan().services['foo'].command == 'baz'
+        assert client.requests == [
+            ('get_plan',),
+            ('add_layer', 'a', 'summary: str\n', False),
+            ('get_plan',),
+        ]
+
+        # As may anything done with the client directly.
+        client.responses.append(pebble.Plan('services:\n foo:\n  command: qux'))
+        assert container.pebble is client
+        assert container.get_plan().services['foo'].command == 'qux'
+        assert len(client.requests) == 4
+
+    def test_add_layer_skip_if_unchanged(self, container: ops.Container):
+        client = typing.cast('MockPebbleClient', container._pebble)
+        plan_yaml = """
+services:
+  foo:
+    override: replace
+    command: bar
+    startup: enabled
+    environment: {A: '1', B: '2'}
+checks:
+  up:
+    override: replace
+    http: {url: 'http://localhost/health'}
+"""
+        client.responses.append(pebble.Plan(plan_yaml))
+        unchanged: list[str | pebble.LayerDict | pebble.Layer] = [
+            'summary: same\nservices:\n foo:\n  override: merge\n  command: bar\n',
+            {'services': {'foo': {'override': 'merge', 'environment': {'B': '2'}}}},
+            pebble.Layer({
+                'checks': {
+                    'up': {'override': 'replace', 'http': {'url': 'http://localhost/health'}}
+                }
+            }),
+        ]
+        for layer in unchanged:
+            assert not container.add_layer('a', layer, combine=True, skip_if_unchanged=True)
+        assert client.requests == [('get_plan',)]
+
+        changed = [
+            'services:\n foo:\n  override: merge\n  command: baz\n',
+            # Replacing the service drops its environment.
+            'services:\n foo:\n  override: replace\n  command: bar\n  startup: enabled\n',
+            'services:\n new:\n  override: merge\n  command: bar\n',
+            # Not valid, so left for Pebble to reject.
+            'services:\n foo:\n  command: bar\n',
+        ]
+        for layer in changed:
+            assert container.pebble is client  # Clears the cached plan.
+            client.requests.clear()
+            client.responses.append(pebble.Plan(plan_yaml))
+            assert container.add_layer('a', layer, combine=True, skip_if_unchanged=True)
+            assert client.requests == [('get_plan',), ('add_layer', 'a', layer, True)]
+
+        # Fields that ops doesn't know about can't be compared, so the layer is always added.
+        unknown: list[str | pebble.LayerDict] = [
+            'services:\n foo:\n  override: merge\n  command: bar\n  new-field: x\n',
+            typing.cast(
+                'pebble.LayerDict',
+                {'services': {'foo': {'override': 'merge', 'command': 'bar', 'new-field': 'x'}}},
+            ),
+            typing.cast('pebble.LayerDict', {'new-section': {'foo': {'override': 'merge'}}}),
+        ]
+        for layer in unknown:
+            client.requests.clear()
+            assert container.add_layer('a', layer, combine=True, skip_if_unchanged=True)
+            assert [request[:2] for request in client.requests] == [('add_layer', 'a')]
+
     @staticmethod
     def _make_service(name: str, startup: str, current: str):
         return pebble.ServiceInfo.from_dict({'name': name, 'startup': startup, 'current': current})
@@ -2260,6 +2714,19 @@ containers:
         assert len(caplog.records) == 1
         assert 'api error!' in caplog.text
 
+    def test_can_connect_pebble_client(
+        self,
+        caplog: pytest.LogCaptureFixture,
+        container: ops.Container,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        client = pebble.Client(socket_path='does_not_exist')
+        monkeypatch.setattr(container, '_pebble', client)
+        monkeypatch.setattr(client, 'get_system_info', lambda: pytest.fail('unexpected request'))
+        with caplog.at_level(level='DEBUG', logger='ops'):
+            assert not container.can_connect()
+        assert 'Pebble API is not ready' in caplog.text
+
     def test_exec(self, container: ops.Container, monkeypatch: pytest.MonkeyPatch):
         monkeypatch.setattr(container, '_juju_version', JujuVersion('3.1.6'))
         container.pebble.responses.append('fake_exec_process')  # type: ignore
@@ -2869,6 +3336,24 @@ class TestModelBackend:
             with pytest.raises(TypeError):
                 backend.relation_get(1, 'fooentity', is_app=is_app_v)  # type: ignore
 
+    def test_get_pebble_shared(self, backend: _ModelBackend, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(ops.model, '_pebble_clients', {})
+        client = backend.get_pebble('/charm/containers/foo/pebble.socket')
+        assert client.socket_path == '/charm/containers/foo/pebble.socket'
+        assert backend.get_pebble('/charm/containers/foo/pebble.socket') is client
+        other_backend = _ModelBackend('myapp/0')
+        assert other_backend.get_pebble('/charm/containers/foo/pebble.socket') is client
+        assert backend.get_pebble('/charm/containers/bar/pebble.socket') is not client
+
+        closed: list[str] = []
+        monkeypatch.setattr(pebble.Client, 'close', lambda self: closed.append(self.socket_path))
+        ops.model._close_pebble_clients()
+        assert sorted(closed) == [
+            '/charm/containers/bar/pebble.socket',
+            '/charm/containers/foo/pebble.socket',
+        ]
+        assert backend.get_pebble('/charm/containers/foo/pebble.socket') is not client
+
     def test_is_leader_refresh(self, fake_script: FakeScript, backend: _ModelBackend):
         meta = ops.CharmMeta.from_yaml("""
             name: myapp
@@ -4829,5 +5314,251 @@ def test_departing_unit_data_available(fake_script: FakeScript):
     assert ['relation-get', '--format=json', '-r', 'db:1', '-', 'db/1'] in calls
 
 
+@pytest.mark.parametrize(
+    'raw',
+    [
+        '{}',
+        ' { }\n',
+        '{"a": "b"}',
+        '{"a": "b"} ',
+        '{"a": "b\\"c\\\\", "k\\u00e9": "\\ud83d\\ude00 {\\"x\\": 1}"}\n',
+        '{"a": "b", "a": "c"}',
+    ],
+)
+def test_compact_databag(raw: str, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ops.model._CompactDatabag, '_min_size', 0)
+    bag = ops.model._CompactDatabag.from_json(raw)
+    assert isinstance(bag, ops.model._CompactDatabag)
+    assert bag == json.loads(raw)
+    assert dict(bag) == json.loads(raw)
+    assert 'missing' not in bag
+    with pytest.raises(KeyError):
+        bag['missing']
+
+
+def test_compact_databag_caches_values(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ops.model._CompactDatabag, '_min_size', 0)
+    bag = ops.model._CompactDatabag.from_json('{"a": "long value a", "b": "long value b"}')
+    assert isinstance(bag, ops.model._CompactDatabag)
+    value = bag['a']
+    assert bag['a'] is value
+    assert bag._raw
+    assert bag['b'] == 'long value b'
+    # Once every value has been decoded, the JSON text isn't needed.
+    assert bag._raw == ''
+    assert dict(bag) == {'a': 'long value a', 'b': 'long value b'}
+
+
+def test_compact_databag_too_small():
+    bag = ops.model._CompactDatabag.from_json('{"a": "b"}')
+    assert type(bag) is dict
+    assert bag == {'a': 'b'}
+
+
+@pytest.mark.parametrize('raw', ['{"a": 1}', '{"a": {"b": "c"}}', '["a"]', '"a"'])
+def test_compact_databag_not_strings(raw: str, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ops.model._CompactDatabag, '_min_size', 0)
+    bag = ops.model._CompactDatabag.from_json(raw)
+    assert type(bag) is type(json.loads(raw))
+    assert bag == json.loads(raw)
+
+
+def test_large_relation_data(fake_script: FakeScript, tmp_path: pathlib.Path):
+    dashboard = json.dumps({'panels': ['x' * 1000] * 100})
+    data = {'dashboard': dashboard, 'name': 'grafana'}
+    (tmp_path / 'data.json').write_text(json.dumps(data))
+    fake_script.write('relation-ids', """echo '["db:1"]'""")
+    fake_script.write('relation-list', """echo '["db/0"]'""")
+    fake_script.write('relation-get', f'cat {tmp_path / "data.json"}')
+    fake_script.write('relation-set', 'exit 0')
+
+    meta = ops.charm.CharmMeta({'name': 'mycharm', 'requires': {'db': {'interface': 'db'}}})
+    model = ops.model.Model(meta, ops.model._ModelBackend('myapp/0'))
+    relation = model.get_relation('db')
+    assert relation is not None
+    unit = model.get_unit('db/0')
+    content = relation.data[unit]
+    assert content == data
+    assert isinstance(content._lazy_data, ops.model._CompactDatabag)
+
+    @dataclasses.dataclass
+    class Dashboard:
+        dashboard: dict[str, Any]
+
+    # Only the fields of the class are decoded, so the non-JSON name is ignored.
+    loaded = relation.load(Dashboard, unit)
+    assert loaded.dashboard == json.loads(dashboard)
+
+    # Changing the databag (in this case, allowed as no hook is running)
+    # switches it to a regular dict.
+    content['name'] = 'prometheus'
+    assert isinstance(content._lazy_data, dict)
+    assert content == {'dashboard': dashboard, 'name': 'prometheus'}
+
+
 if __name__ == '__main__':
     unittest.main()
+
+
+def test_pull_path_large_files_direct(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+):
+    harness = ops.testing.Harness(
+        ops.CharmBase,
+        meta="""
+        name: test-app
+        containers:
+          foo:
+            resource: foo-image
+        """,
+    )
+    request.addfinalizer(harness.cleanup)
+    harness.begin()
+    harness.set_can_connect('foo', True)
+    container = harness.model.unit.containers['foo']
+    container.push('/src/small', 'small', make_dirs=True)
+    container.push('/src/large', 'large content')
+
+    pebble_client = container._pebble
+    batches: list[list[str]] = []
+    direct: list[str] = []
+    original_pull_many = pebble_client.pull_many
+    original_pull_to = pebble_client.pull_to
+
+    def pull_many(paths: list[str], *, encoding: str | None = 'utf-8'):
+        batches.append(list(paths))
+        return original_pull_many(paths, encoding=encoding)
+
+    def pull_to(path: str, local_path: str):
+        direct.append(path)
+        return original_pull_to(path, local_path)
+
+    monkeypatch.setattr(pebble_client, 'pull_many', pull_many)
+    monkeypatch.setattr(pebble_client, 'pull_to', pull_to)
+    monkeypatch.setattr(ops.Container, '_pull_direct_size', 10)
+
+    container.pull_path('/src', tmp_path)
+
+    assert batches == [['/src/small']]
+    assert direct == ['/src/large']
+    assert (tmp_path / 'src' / 'small').read_text() == 'small'
+    assert (tmp_path / 'src' / 'large').read_text() == 'large content'
+
+
+@pytest.fixture
+def sync_harness(request: pytest.FixtureRequest):
+    harness = ops.testing.Harness(
+        ops.CharmBase,
+        meta="""
+        name: test-app
+        containers:
+          foo:
+            resource: foo-image
+        """,
+    )
+    request.addfinalizer(harness.cleanup)
+    harness.begin()
+    harness.set_can_connect('foo', True)
+    return harness
+
+
+def test_sync_path(sync_harness: ops.testing.Harness[ops.CharmBase], tmp_path: pathlib.Path):
+    container = sync_harness.model.unit.containers['foo']
+    (tmp_path / 'conf.d').mkdir()
+    (tmp_path / 'conf.d' / 'a.conf').write_text('a')
+    (tmp_path / 'main.conf').write_text('main')
+    (tmp_path / 'empty').mkdir()
+
+    assert container.sync_path(tmp_path, '/etc/app') == [
+        '/etc/app',
+        '/etc/app/conf.d',
+        '/etc/app/conf.d/a.conf',
+        '/etc/app/empty',
+        '/etc/app/main.conf',
+    ]
+    assert container.pull('/etc/app/conf.d/a.conf').read() == 'a'
+    assert container.isdir('/etc/app/empty')
+
+    # Nothing has changed, so nothing is pushed.
+    push_many = mock.Mock(wraps=container._pebble.push_many)
+    container._pebble.push_many = push_many
+    assert container.sync_path(tmp_path, '/etc/app') == []
+    push_many.assert_not_called()
+
+    # Changed files are pushed and stale ones removed, including a remote
+    # file where there is now a local directory.
+    (tmp_path / 'main.conf').write_text('main 2')
+    (tmp_path / 'empty').rmdir()
+    (tmp_path / 'empty').write_text('not empty')
+    container.push('/etc/app/stale/b.conf', 'b', make_dirs=True)
+    container.push('/etc/app/conf.d/c.conf', 'c')
+    assert container.sync_path(tmp_path, '/etc/app') == [
+        '/etc/app/conf.d/c.conf',
+        '/etc/app/empty',
+        '/etc/app/main.conf',
+        '/etc/app/stale',
+    ]
+    assert container.pull('/etc/app/main.conf').read() == 'main 2'
+    assert container.pull('/etc/app/empty').read() == 'not empty'
+    assert not container.exists('/etc/app/stale')
+    assert not container.exists('/etc/app/conf.d/c.conf')
+
+    # Unless asked not to, in which case only the local changes are pushed.
+    container.push('/etc/app/conf.d/c.conf', 'c')
+    (tmp_path / 'main.conf').write_text('main 3')
+    assert container.sync_path(tmp_path, '/etc/app', delete=False) == ['/etc/app/main.conf']
+    assert container.exists('/etc/app/conf.d/c.conf')
+
+
+def test_sync_path_checksum(
+    sync_harness: ops.testing.Harness[ops.CharmBase], tmp_path: pathlib.Path
+):
+    container = sync_harness.model.unit.containers['foo']
+    (tmp_path / 'a.conf').write_text('a')
+    (tmp_path / 'b.conf').write_text('b')
+    container.push('/etc/app/a.conf', 'a', make_dirs=True)
+    container.push('/etc/app/b.conf', 'x')
+    # The local files look newer, so they would be pushed without a checksum.
+    now = datetime.datetime.now().timestamp() + 60
+    for path in tmp_path.iterdir():
+        os.utime(path, (now, now))
+
+    # Without sha256sum, files that look the same are pushed.
+    assert container.sync_path(tmp_path, '/etc/app', checksum=True) == [
+        '/etc/app/a.conf',
+        '/etc/app/b.conf',
+    ]
+
+    root = sync_harness.get_filesystem_root('foo')
+    commands: list[list[str]] = []
+
+    def sha256sum(args: ops.testing.ExecArgs):
+        commands.append(args.command)
+        stdout = ''.join(
+            f'{hashlib.sha256((root / path[1:]).read_bytes()).hexdigest()}  {path}\n'
+            for path in args.command[2:]
+        )
+        return ops.testing.ExecResult(stdout=stdout)
+
+    sync_harness.handle_exec('foo', ['sha256sum'], handler=sha256sum)
+    container.push('/etc/app/b.conf', 'x')
+    assert container.sync_path(tmp_path, '/etc/app', checksum=True) == ['/etc/app/b.conf']
+    assert commands == [['sha256sum', '--', '/etc/app/a.conf', '/etc/app/b.conf']]
+    assert container.pull('/etc/app/b.conf').read() == 'b'
+
+
+def test_sync_path_errors(
+    sync_harness: ops.testing.Harness[ops.CharmBase], tmp_path: pathlib.Path
+):
+    container = sync_harness.model.unit.containers['foo']
+    container.push('/etc/app/a.conf', 'a', make_dirs=True)
+
+    with pytest.raises(ops.MultiPushPullError) as excinfo:
+        container.sync_path(tmp_path / 'missing', '/etc/app')
+    assert [src for src, _ in excinfo.value.errors] == [str(tmp_path / 'missing')]
+    # Nothing is removed if the local directory can't be listed.
+    assert container.exists('/etc/app/a.conf')
+
+    with pytest.raises(ops.MultiPushPullError) as excinfo:
+        container.sync_path(tmp_path, '/etc/app/a.conf')
+    assert [src for src, _ in excinfo.value.errors] == ['/etc/app/a.conf']
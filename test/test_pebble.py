@@ -14,12 +14,17 @@
 
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
 import dataclasses
 import datetime
 import email.message
 import email.parser
+import http.client
 import io
 import json
+import os
+import pathlib
 import signal
 import socket
 import tempfile
@@ -27,6 +32,7 @@ import threading
 import typing
 import unittest
 import unittest.util
+import urllib.request
 
 import pytest
 import websocket
@@ -382,6 +388,46 @@ single log
         assert change.ready_time == datetime_utc(2021, 1, 28, 14, 37, 4, 291518)
         assert change.spawn_time == datetime_utc(2021, 1, 28, 14, 37, 2, 247202)
 
+    def test_change_times_parsed_lazily(self, monkeypatch: pytest.MonkeyPatch):
+        parsed: list[str] = []
+        parse_rfc3339 = pebble.timeconv.parse_rfc3339
+
+        def parse(s: str):
+            parsed.append(s)
+            return parse_rfc3339(s)
+
+        monkeypatch.setattr(pebble.timeconv, 'parse_rfc3339', parse)
+        task: pebble._TaskDict = {
+            'id': '78',
+            'kind': 'start',
+            'progress': {'done': 0, 'label': '', 'total': 1},
+            'spawn-time': '2021-01-28T14:37:02Z',
+            'status': 'Doing',
+            'summary': 'Start service "svc"',
+        }
+        change = pebble.Change.from_dict({
+            'id': '70',
+            'kind': 'start',
+            'ready': False,
+            'spawn-time': '2021-01-28T14:37:01Z',
+            'status': 'Doing',
+            'summary': 'Start service "svc"',
+            'tasks': [task],
+        })
+        assert not change.ready
+        assert parsed == []
+
+        assert change.spawn_time == datetime_utc(2021, 1, 28, 14, 37, 1)
+        assert change.spawn_time == datetime_utc(2021, 1, 28, 14, 37, 1)
+        assert change.ready_time is None
+        assert change.tasks[0].spawn_time == datetime_utc(2021, 1, 28, 14, 37, 2)
+        assert parsed == ['2021-01-28T14:37:01Z', '2021-01-28T14:37:02Z']
+
+        change.ready_time = datetime_utc(2021, 1, 28, 14, 37, 3)
+        assert change.ready_time == datetime_utc(2021, 1, 28, 14, 37, 3)
+        with pytest.raises(AttributeError):
+            change.foo = 'bar'  # type: ignore
+
     def test_file_type(self):
         assert list(pebble.FileType) == [
             pebble.FileType.FILE,
@@ -1428,6 +1474,7 @@ class MockClient(pebble.Client):
         self.requests: list[typing.Any] = []
         self.responses: list[typing.Any] = []
         self.timeout = 5
+        self.raw_timeouts: list[typing.Any] = []
         self.websockets: dict[typing.Any, MockWebsocket] = {}
 
     def _request(
@@ -1452,8 +1499,11 @@ class MockClient(pebble.Client):
         query: dict[str, typing.Any] | None = None,
         headers: dict[str, str] | None = None,
         data: bytes | _bytes_generator | None = None,
+        *,
+        timeout: typing.Any = pebble._not_provided,
     ):
         self.requests.append((method, path, query, headers, data))
+        self.raw_timeouts.append(timeout)
         headers, body = self.responses.pop(0)
         assert headers is not None
         return MockHTTPResponse(headers, body)
@@ -1470,10 +1520,13 @@ class MockHTTPResponse:
         self.headers = message
         reader = io.BytesIO(body)
         self.read = reader.read
+        self.readinto = reader.readinto
+        self.readline = reader.readline
+        self.close = reader.close
 
 
 class MockTime:
-    """Mocked versions of time.time() and time.sleep().
+    """Mocked versions of time.time(), time.monotonic() and time.sleep().
 
     MockTime.sleep() advances the clock and MockTime.time() returns the current time.
     """
@@ -1484,6 +1537,9 @@ class MockTime:
     def time(self):
         return self._time
 
+    def monotonic(self):
+        return self._time
+
     def sleep(self, delay: float):
         self._time += delay
 
@@ -1608,6 +1664,13 @@ class TestMultipartParser:
                 [b'foo bar', b'foo baz'],
                 want_bodies_done=[True, True],
             ),
+            MultipartParserTestCase(
+                'marker in body',
+                b'\r\n--qwerty\r\nheader foo\r\n\r\nfoo\r\n--qwertyX\r\n--qwerty-\r\n--qwerty\r\n',
+                [b'header foo\r\n\r\n'],
+                [b'foo\r\n--qwertyX\r\n--qwerty-'],
+                want_bodies_done=[True],
+            ),
             MultipartParserTestCase(
                 'ignore after terminal boundary',
                 b'\r\n--qwerty \t \r\nheader foo\r\n\r\nfoo bar\r\n--qwerty--\r\nheader bar\r\n\r\nfoo baz\r\n--qwerty--\r\n',  # noqa
@@ -1667,6 +1730,42 @@ class TestMultipartParser:
                 assert test.want_bodies_done == bodies_done, msg
 
 
+@pytest.mark.parametrize(
+    'header,disposition,params',
+    [
+        (
+            b'Content-Disposition: form-data; name="files"; filename="/etc/hosts"\r\n\r\n',
+            'form-data',
+            {'name': 'files', 'filename': '/etc/hosts'},
+        ),
+        (
+            b'content-type: text/plain\r\ncontent-disposition: Form-Data;name=response\r\n\r\n',
+            'form-data',
+            {'name': 'response'},
+        ),
+        (
+            b'Content-Disposition: form-data; name="files"; '
+            b'filename="/a \\"b\\" ;c \xf0\x9f\x98\x80"\r\n\r\n',
+            'form-data',
+            {'name': 'files', 'filename': '/a "b" ;c \U0001f600'},
+        ),
+        (
+            b'Content-Disposition: form-data; name="files";\r\n filename="/etc/hosts"\r\n\r\n',
+            'form-data',
+            {'name': 'files', 'filename': '/etc/hosts'},
+        ),
+        (
+            b"Content-Disposition: form-data; name=files; filename*=utf-8''%2Fetc%2Fhosts\r\n\r\n",
+            'form-data',
+            {'name': 'files', 'filename': '/etc/hosts'},
+        ),
+        (b'Content-Type: text/plain\r\n\r\n', None, {}),
+    ],
+)
+def test_parse_content_disposition(header: bytes, disposition: str | None, params: dict[str, str]):
+    assert pebble._parse_content_disposition(memoryview(header)) == (disposition, params)
+
+
 @pytest.fixture
 def time():
     return MockTime()
@@ -2042,6 +2141,51 @@ class TestClient:
             ('GET', '/v1/changes/70/wait', {'timeout': '4.000s'}, None),
         ]
 
+    def test_wait_changes(self, client: MockClient):
+        other = MockClient('/charm/containers/c2/pebble.socket')
+        other_waiting = threading.Event()
+
+        def first_response():
+            # Only returns if the other change is waited for at the same time.
+            assert other_waiting.wait(timeout=5)
+            return {'result': build_mock_change_dict('70'), 'status-code': 200, 'type': 'sync'}
+
+        def other_response():
+            other_waiting.set()
+            return {'result': build_mock_change_dict('71'), 'status-code': 200, 'type': 'sync'}
+
+        client.responses.append(first_response)
+        other.responses.append(other_response)
+
+        changes = pebble.wait_changes([
+            (client, pebble.ChangeID('70')),
+            (other, pebble.ChangeID('71')),
+        ])
+        assert [change.id for change in changes] == ['70', '71']
+        assert client.requests == [('GET', '/v1/changes/70/wait', {'timeout': '4.000s'}, None)]
+        assert other.requests == [('GET', '/v1/changes/71/wait', {'timeout': '4.000s'}, None)]
+
+    def test_wait_changes_error(self, client: MockClient):
+        other = MockClient('/charm/containers/c2/pebble.socket')
+        change = build_mock_change_dict('70')
+        change['err'] = 'Some kind of service error'
+        client.responses.append({'result': change, 'status-code': 200, 'type': 'sync'})
+        other.responses.append({
+            'result': build_mock_change_dict('71'),
+            'status-code': 200,
+            'type': 'sync',
+        })
+
+        with pytest.raises(pebble.ChangeError) as excinfo:
+            pebble.wait_changes([
+                (client, pebble.ChangeID('70')),
+                (other, pebble.ChangeID('71')),
+            ])
+        assert excinfo.value.err == 'Some kind of service error'
+        assert excinfo.value.change.id == '70'
+        # Both changes are still waited for.
+        assert len(other.requests) == 1
+
     def test_wait_change_success_timeout_none(self, client: MockClient):
         self.test_wait_change_success(client, timeout=None)
 
@@ -2332,7 +2476,7 @@ Content-Disposition: form-data; name="response"\r
 """,
         ))
 
-        client._chunk_size = 13
+        client._read_chunk_size = 13
         with client.pull('/etc/hosts') as infile:
             content = infile.read()
         assert content == '127.0.0.1 localhost  # 😀\nfoo\r\nbar'
@@ -2417,6 +2561,176 @@ Content-Disposition: form-data; name="response"\r
             ),
         ]
 
+    def _pull_response(self, content: bytes, path: str = '/etc/hosts'):
+        return (
+            {'Content-Type': 'multipart/form-data; boundary=01234567890123456789012345678901'},
+            b'--01234567890123456789012345678901\r\n'
+            + f'Content-Disposition: form-data; name="files"; filename="{path}"\r\n'.encode()
+            + b'\r\n'
+            + content
+            + b'\r\n--01234567890123456789012345678901\r\n'
+            + b'Content-Disposition: form-data; name="response"\r\n'
+            + b'\r\n'
+            + json.dumps({'result': [{'path': path}], 'status-code': 200, 'type': 'sync'}).encode()
+            + b'\r\n--01234567890123456789012345678901--\r\n',
+        )
+
+    def test_pull_small_file_in_memory(self, client: MockClient, monkeypatch: pytest.MonkeyPatch):
+        def no_tempfile(*args: typing.Any, **kwargs: typing.Any):
+            raise AssertionError('small files should not be written to disk')
+
+        monkeypatch.setattr(tempfile, 'NamedTemporaryFile', no_tempfile)
+        client.responses.append(self._pull_response(b'foo\r\nbar \xf0\x9f\x98\x80'))
+        with client.pull('/etc/hosts') as f:
+            assert f.read() == 'foo\r\nbar 😀'
+
+    def test_pull_large_file_spooled(self, client: MockClient, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(pebble._FilesParser, '_spool_max_size', 10)
+        names: list[str] = []
+        original = tempfile.NamedTemporaryFile
+
+        def named_tempfile(*args: typing.Any, **kwargs: typing.Any):
+            file = original(*args, **kwargs)
+            names.append(file.name)
+            return file
+
+        monkeypatch.setattr(tempfile, 'NamedTemporaryFile', named_tempfile)
+        content = bytes(range(256)) * 10
+        client._read_chunk_size = 13
+        client.responses.append(self._pull_response(content))
+        with client.pull('/etc/hosts', encoding=None) as f:
+            assert f.read() == content
+        assert len(names) == 1
+        assert not os.path.exists(names[0])
+
+    def test_pull_to(self, client: MockClient, tmp_path: pathlib.Path):
+        content = bytes(range(256)) * 1000
+        client.responses.append(self._pull_response(content))
+        local_path = tmp_path / 'hosts'
+        local_path.write_bytes(b'old content that is replaced')
+        client.pull_to('/etc/hosts', local_path)
+        assert local_path.read_bytes() == content
+        assert list(tmp_path.iterdir()) == [local_path]
+        assert client.requests == [
+            (
+                'GET',
+                '/v1/files',
+                {'action': 'read', 'path': '/etc/hosts'},
+                {'Accept': 'multipart/form-data'},
+                None,
+            ),
+        ]
+
+    def test_pull_to_truncated(self, client: MockClient, tmp_path: pathlib.Path):
+        headers, body = self._pull_response(b'new content' * 1000)
+        body = body[: body.index(b'name="response"')]
+        client.responses.append((headers, body))
+        local_path = tmp_path / 'hosts'
+        local_path.write_bytes(b'old content')
+        with pytest.raises(pebble.ProtocolError):
+            client.pull_to('/etc/hosts', local_path)
+        assert local_path.read_bytes() == b'old content'
+        assert list(tmp_path.iterdir()) == [local_path]
+
+    def test_pull_to_path_error(self, client: MockClient, tmp_path: pathlib.Path):
+        client.responses.append((
+            {'Content-Type': 'multipart/form-data; boundary=01234567890123456789012345678901'},
+            b"""\
+--01234567890123456789012345678901\r
+Content-Disposition: form-data; name="response"\r
+\r
+{
+    "result": [
+        {"path": "/etc/hosts", "error": {"kind": "not-found", "message": "not found"}}
+    ],
+    "status": "OK",
+    "status-code": 200,
+    "type": "sync"
+}\r
+--01234567890123456789012345678901--\r
+""",
+        ))
+        local_path = tmp_path / 'hosts'
+        with pytest.raises(pebble.PathError) as excinfo:
+            client.pull_to('/etc/hosts', local_path)
+        assert excinfo.value.kind == 'not-found'
+        assert not local_path.exists()
+
+    def test_pull_many(self, client: MockClient):
+        client.responses.append((
+            {'Content-Type': 'multipart/form-data; boundary=01234567890123456789012345678901'},
+            b"""\
+--01234567890123456789012345678901\r
+Content-Disposition: form-data; name="files"; filename="/etc/hosts"\r
+\r
+127.0.0.1 localhost\r
+--01234567890123456789012345678901\r
+Content-Disposition: form-data; name="files"; filename="/etc/hostname"\r
+\r
+\xf0\x9f\x98\x80\r
+--01234567890123456789012345678901\r
+Content-Disposition: form-data; name="response"\r
+\r
+{
+    "result": [{"path": "/etc/hosts"}, {"path": "/etc/hostname"}],
+    "status": "OK",
+    "status-code": 200,
+    "type": "sync"
+}\r
+--01234567890123456789012345678901--\r
+""",
+        ))
+
+        files = client.pull_many(['/etc/hosts', pathlib.Path('/etc/hostname'), '/etc/hosts'])
+        assert list(files) == ['/etc/hosts', '/etc/hostname']
+        with files['/etc/hosts'] as f:
+            assert f.read() == '127.0.0.1 localhost'
+        with files['/etc/hostname'] as f:
+            assert f.read() == '😀'
+
+        assert client.requests == [
+            (
+                'GET',
+                '/v1/files',
+                {'action': 'read', 'path': ['/etc/hosts', '/etc/hostname']},
+                {'Accept': 'multipart/form-data'},
+                None,
+            ),
+        ]
+
+    def test_pull_many_empty(self, client: MockClient):
+        assert client.pull_many([]) == {}
+        assert client.requests == []
+
+    def test_pull_many_path_error(self, client: MockClient):
+        client.responses.append((
+            {'Content-Type': 'multipart/form-data; boundary=01234567890123456789012345678901'},
+            b"""\
+--01234567890123456789012345678901\r
+Content-Disposition: form-data; name="files"; filename="/etc/hosts"\r
+\r
+127.0.0.1 localhost\r
+--01234567890123456789012345678901\r
+Content-Disposition: form-data; name="response"\r
+\r
+{
+    "result": [
+        {"path": "/etc/hosts"},
+        {"path": "/etc/nope", "error": {"kind": "not-found", "message": "not found"}}
+    ],
+    "status": "OK",
+    "status-code": 200,
+    "type": "sync"
+}\r
+--01234567890123456789012345678901--\r
+""",
+        ))
+
+        with pytest.raises(pebble.PathError) as excinfo:
+            client.pull_many(['/etc/hosts', '/etc/nope'], encoding=None)
+        assert excinfo.value.kind == 'not-found'
+        assert excinfo.value.message == 'not found'
+
     def test_pull_path_error(self, client: MockClient):
         client.responses.append((
             {'Content-Type': 'multipart/form-data; boundary=01234567890123456789012345678901'},
@@ -2697,6 +3011,103 @@ bad path\r
             'files': [{'path': '/foo/bar'}],
         }
 
+    def test_push_many(self, client: MockClient):
+        client.responses.append((
+            {'Content-Type': 'application/json'},
+            b"""
+{
+    "result": [{"path": "/foo/bar"}, {"path": "/foo/baz"}, {"path": "/foo/qux"}],
+    "status": "OK",
+    "status-code": 200,
+    "type": "sync"
+}
+""",
+        ))
+
+        client.push_many(
+            {
+                '/foo/bar': 'content 😀',
+                pathlib.PurePath('/foo/baz'): io.BytesIO(b'\x00\xff'),
+                '/foo/qux': pebble.PushSource(b'', permissions=0o755, group='staff'),
+            },
+            make_dirs=True,
+            permissions=0o600,
+            user='bob',
+        )
+
+        assert len(client.requests) == 1
+        request = client.requests[0]
+        assert request[:3] == ('POST', '/v1/files', None)
+        headers, body = request[3:]
+        message = self._parse_multipart_message(headers['Content-Type'], body)
+        parts = [
+            (part.get_param('name', header='Content-Disposition'), part)
+            for part in message.walk()
+            if not part.is_multipart()
+        ]
+        name, request_part = parts[0]
+        assert name == 'request'
+        assert json.loads(typing.cast('str', request_part.get_payload())) == {
+            'action': 'write',
+            'files': [
+                {'path': '/foo/bar', 'make-dirs': True, 'permissions': '600', 'user': 'bob'},
+                {'path': '/foo/baz', 'make-dirs': True, 'permissions': '600', 'user': 'bob'},
+                {
+                    'path': '/foo/qux',
+                    'make-dirs': True,
+                    'permissions': '755',
+                    'user': 'bob',
+                    'group': 'staff',
+                },
+            ],
+        }
+        files = [(name, p.get_filename(), p.get_payload(decode=True)) for name, p in parts]
+        assert files[1:] == [
+            ('files', '/foo/bar', 'content 😀'.encode()),
+            ('files', '/foo/baz', b'\x00\xff'),
+            ('files', '/foo/qux', b''),
+        ]
+
+    def test_push_many_path_error(self, client: MockClient):
+        client.responses.append((
+            {'Content-Type': 'application/json'},
+            b"""
+{
+    "result": [
+        {"path": "/foo/bar"},
+        {"path": "/foo/baz", "error": {"kind": "permission-denied", "message": "nope"}}
+    ],
+    "status": "OK",
+    "status-code": 200,
+    "type": "sync"
+}
+""",
+        ))
+
+        with pytest.raises(pebble.PathError) as excinfo:
+            client.push_many({'/foo/bar': 'a', '/foo/baz': 'b'})
+        assert excinfo.value.kind == 'permission-denied'
+        assert excinfo.value.message == 'nope'
+
+    def test_push_many_empty(self, client: MockClient):
+        client.push_many({})
+        assert client.requests == []
+
+    def _parse_multipart_message(self, content_type: str, body: _bytes_generator):
+        message = email.message.Message()
+        message['Content-Type'] = content_type
+        boundary = message.get_param('boundary')
+        assert isinstance(boundary, str)
+        parser = email.parser.BytesFeedParser()
+        parser.feed(
+            b'Content-Type: multipart/form-data; boundary='
+            + boundary.encode('utf-8')
+            + b'\r\n\r\n'
+        )
+        for b in body:
+            parser.feed(b)
+        return parser.close()
+
     def _parse_write_multipart(self, content_type: str, body: _bytes_generator):
         message = email.message.Message()
         message['Content-Type'] = content_type
@@ -2990,6 +3401,35 @@ bad path\r
         with pytest.raises(TypeError):
             client.send_signal('SIGHUP', [1, 2])  # type: ignore
 
+    def test_get_logs(self, client: MockClient):
+        body = (
+            b'{"time":"2024-01-02T03:04:05.123456Z","service":"a","message":"one\\n"}\n'
+            b'{"time":"2024-01-02T03:04:06Z","service":"b","message":"two\\n"}\n'
+        )
+        client.responses.append(({'Content-Type': 'application/x-ndjson'}, body))
+        logs = client.get_logs(['a', 'b'], n=10)
+        assert client.requests == []  # nothing is requested until iterated
+        assert list(logs) == [
+            pebble.LogEntry(
+                time=datetime_utc(2024, 1, 2, 3, 4, 5, 123456), service='a', message='one\n'
+            ),
+            pebble.LogEntry(time=datetime_utc(2024, 1, 2, 3, 4, 6), service='b', message='two\n'),
+        ]
+        assert client.requests == [
+            ('GET', '/v1/logs', {'services': 'a,b', 'n': 10}, None, None),
+        ]
+        assert client.raw_timeouts == [pebble._not_provided]
+
+    def test_get_logs_follow(self, client: MockClient):
+        body = b'{"time":"2024-01-02T03:04:05Z","service":"a","message":"one\\n"}\n'
+        client.responses.append(({'Content-Type': 'application/x-ndjson'}, body))
+        logs = client.get_logs(follow=True)
+        entry = next(logs)
+        assert entry.message == 'one\n'
+        logs.close()
+        assert client.requests == [('GET', '/v1/logs', {'follow': 'true'}, None, None)]
+        assert client.raw_timeouts == [None]
+
     def test_get_checks_all(self, client: MockClient):
         client.responses.append({
             'result': [
@@ -3271,6 +3711,119 @@ bad path\r
             ('GET', '/v1/notices', query, None),
         ]
 
+    @staticmethod
+    def _notice_dict(id: str, last_repeated: str) -> pebble._NoticeDict:
+        return {
+            'id': id,
+            'type': 'custom',
+            'key': f'example.com/{id}',
+            'first-occurred': '2023-12-07T17:01:02.123456789Z',
+            'last-occurred': last_repeated,
+            'last-repeated': last_repeated,
+            'occurrences': 1,
+        }
+
+    def test_wait_notices(self, client: MockClient, time: MockTime):
+        def no_notices():
+            time.sleep(4)  # simulate the long-poll timing out
+            return {'result': [], 'status': 'OK', 'status-code': 200, 'type': 'sync'}
+
+        client.responses.append(no_notices)
+        client.responses.append({
+            'result': [self._notice_dict('124', '2023-12-07T17:01:05.987654321Z')],
+            'status': 'OK',
+            'status-code': 200,
+            'type': 'sync',
+        })
+
+        after = pebble.NoticeCursor.from_rfc3339('2023-12-07T17:01:04.123456789Z')
+        notices, cursor = client.wait_notices(after=after, keys=['example.com/124'], timeout=10)
+        assert [notice.id for notice in notices] == ['124']
+        assert str(cursor) == '2023-12-07T17:01:05.987654321Z'
+        assert cursor > after
+
+        query = {
+            'keys': ['example.com/124'],
+            'after': '2023-12-07T17:01:04.123456789Z',
+            'timeout': '4.000s',
+        }
+        assert client.requests == [
+            ('GET', '/v1/notices', query, None),
+            ('GET', '/v1/notices', query, None),
+        ]
+
+    def test_wait_notices_timeout(self, client: MockClient, time: MockTime):
+        def no_notices():
+            time.sleep(4)  # simulate the long-poll timing out
+            return {'result': [], 'status': 'OK', 'status-code': 200, 'type': 'sync'}
+
+        client.responses.append(no_notices)
+        client.responses.append(no_notices)
+
+        after = datetime.datetime(2023, 12, 7, 17, 1, 4, 123456, tzinfo=datetime.timezone.utc)
+        notices, cursor = client.wait_notices(after=after, timeout=5)
+        assert notices == []
+        assert cursor == pebble.NoticeCursor.from_datetime(after)
+        assert str(cursor) == '2023-12-07T17:01:04.123456000Z'
+
+        assert client.requests == [
+            ('GET', '/v1/notices', {'after': str(cursor), 'timeout': '4.000s'}, None),
+            ('GET', '/v1/notices', {'after': str(cursor), 'timeout': '1.000s'}, None),
+        ]
+
+    def test_watch_notices(self, client: MockClient, time: MockTime):
+        def ok(*notices: pebble._NoticeDict):
+            return {'result': list(notices), 'status': 'OK', 'status-code': 200, 'type': 'sync'}
+
+        def no_notices():
+            time.sleep(10)  # simulate the long-poll timing out
+            return ok()
+
+        client.responses.append(ok(self._notice_dict('123', '2023-12-07T17:01:04.123456789Z')))
+        client.responses.append(
+            ok(
+                self._notice_dict('124', '2023-12-07T17:01:05.000000001Z'),
+                self._notice_dict('125', '2023-12-07T17:01:05.000000002Z'),
+            )
+        )
+        client.responses.append(no_notices)
+
+        notices = list(client.watch_notices(types=[pebble.NoticeType.CUSTOM], timeout=10))
+        # Only notices that occur after watching starts are yielded.
+        assert [notice.id for notice in notices] == ['124', '125']
+
+        assert client.requests == [
+            ('GET', '/v1/notices', {'types': ['custom']}, None),
+            (
+                'GET',
+                '/v1/notices',
+                {
+                    'types': ['custom'],
+                    'after': '2023-12-07T17:01:04.123456789Z',
+                    'timeout': '4.000s',
+                },
+                None,
+            ),
+            (
+                'GET',
+                '/v1/notices',
+                {
+                    'types': ['custom'],
+                    'after': '2023-12-07T17:01:05.000000002Z',
+                    'timeout': '4.000s',
+                },
+                None,
+            ),
+        ]
+
+    def test_notice_cursor(self):
+        cursor = pebble.NoticeCursor.from_rfc3339('2023-12-07T17:01:04.123456789Z')
+        assert pebble.NoticeCursor.from_rfc3339(str(cursor)) == cursor
+        # A datetime can't represent the nanoseconds, so it's before the cursor.
+        dt = datetime.datetime(2023, 12, 7, 17, 1, 4, 123456, tzinfo=datetime.timezone.utc)
+        assert pebble.NoticeCursor.from_datetime(dt) < cursor
+        assert cursor.timestamp_ns - pebble.NoticeCursor.from_datetime(dt).timestamp_ns == 789
+
     def test_get_identities(self, client: MockClient):
         client.responses.append({
             'result': {
@@ -3378,6 +3931,506 @@ class TestSocketClient:
         finally:
             shutdown()
 
+    def test_connection_reused(self, monkeypatch: pytest.MonkeyPatch):
+        connects: list[str] = []
+        original_connect = pebble._UnixSocketConnection.connect
+
+        def connect(conn: pebble._UnixSocketConnection):
+            connects.append(conn.socket_path)
+            original_connect(conn)
+
+        monkeypatch.setattr(pebble._UnixSocketConnection, 'connect', connect)
+        shutdown, socket_path = fake_pebble.start_server()
+        client = pebble.Client(socket_path=socket_path)
+        try:
+            for _ in range(3):
+                assert client.get_system_info().version == '3.14.159'
+            with pytest.raises(pebble.APIError):
+                client.start_services(['bar'], timeout=0)
+            assert client.start_services(['foo'], timeout=0) == '1234'
+            assert connects == [socket_path]
+        finally:
+            client.close()
+            shutdown()
+
+    def test_concurrent_requests(self):
+        shutdown, socket_path = fake_pebble.start_server()
+        client = pebble.Client(socket_path=socket_path)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+                futures = [executor.submit(client.get_system_info) for _ in range(32)]
+                versions = {future.result().version for future in futures}
+            assert versions == {'3.14.159'}
+            handler = next(
+                h for h in client.opener.handlers if isinstance(h, pebble._UnixSocketHandler)
+            )
+            assert 1 <= len(handler._idle) <= handler.max_idle
+        finally:
+            client.close()
+            shutdown()
+
+    @pytest.mark.parametrize('looks_idle', [False, True])
+    def test_reconnect_when_closed(self, monkeypatch: pytest.MonkeyPatch, looks_idle: bool):
+        shutdown, socket_path = fake_pebble.start_server()
+        client = pebble.Client(socket_path=socket_path)
+        try:
+            client.get_system_info()
+            handler = next(
+                h for h in client.opener.handlers if isinstance(h, pebble._UnixSocketHandler)
+            )
+            # Simulate Pebble going away (container restart) by replacing the
+            # pooled connection's socket with one whose peer has been closed.
+            [conn] = handler._idle
+            assert conn.sock is not None
+            conn.sock.close()
+            conn.sock, peer = socket.socketpair()
+            peer.close()
+            if looks_idle:
+                # Skip the idle check so the failure happens when sending.
+                monkeypatch.setattr(pebble.select, 'select', lambda *args: ([], [], []))  # type: ignore
+
+            assert client.get_system_info().version == '3.14.159'
+            assert client.start_services(['foo'], timeout=0) == '1234'
+        finally:
+            client.close()
+            shutdown()
+
+    def test_no_resend_unless_idempotent(self, monkeypatch: pytest.MonkeyPatch):
+        sent: list[str] = []
+        fail = False
+        original_request = pebble._UnixSocketConnection.request
+        original_getresponse = pebble._UnixSocketConnection.getresponse
+
+        def request(
+            conn: pebble._UnixSocketConnection,
+            method: str,
+            url: str,
+            *args: typing.Any,
+            **kwargs: typing.Any,
+        ):
+            sent.append(f'{method} {url}')
+            original_request(conn, method, url, *args, **kwargs)
+
+        def getresponse(conn: pebble._UnixSocketConnection):
+            if fail:
+                # Pebble dropped the connection after reading the request.
+                raise http.client.RemoteDisconnected('Remote end closed connection')
+            return original_getresponse(conn)
+
+        monkeypatch.setattr(pebble._UnixSocketConnection, 'request', request)
+        monkeypatch.setattr(pebble._UnixSocketConnection, 'getresponse', getresponse)
+        shutdown, socket_path = fake_pebble.start_server()
+        client = pebble.Client(socket_path=socket_path)
+        try:
+            # Pebble may already have started the service, so it's not started again.
+            client.get_system_info()
+            fail = True
+            sent.clear()
+            with pytest.raises(pebble.ConnectionError):
+                client.start_services(['foo'], timeout=0)
+            assert sent == ['POST /v1/services']
+
+            fail = False
+            client.get_system_info()
+            fail = True
+            sent.clear()
+            with pytest.raises(pebble.ConnectionError):
+                client.get_system_info()
+            assert sent == ['GET /v1/system-info', 'GET /v1/system-info']
+        finally:
+            client.close()
+            shutdown()
+
+    def test_can_connect(self, monkeypatch: pytest.MonkeyPatch):
+        requests: list[str] = []
+        original_request_raw = pebble.Client._request_raw
+
+        def request_raw(client: pebble.Client, method: str, path: str, *args: typing.Any):
+            requests.append(path)
+            return original_request_raw(client, method, path, *args)
+
+        monkeypatch.setattr(pebble.Client, '_request_raw', request_raw)
+        shutdown, socket_path = fake_pebble.start_server()
+        client = pebble.Client(socket_path=socket_path)
+        try:
+            # Pebble is up, and the check doesn't need an API request.
+            assert client._can_connect()
+            assert client._can_connect()
+            assert requests == []
+            client.get_system_info()
+            assert client._can_connect()
+            assert requests == ['/v1/system-info']
+        finally:
+            client.close()
+            shutdown()
+
+        # Until it expires, a successful request shows that Pebble is up ...
+        assert client._can_connect()
+        # ... but a request that can't connect shows that it isn't.
+        with pytest.raises(pebble.ConnectionError):
+            client.get_system_info()
+        assert not client._can_connect()
+
+    def test_can_connect_expires(self, monkeypatch: pytest.MonkeyPatch):
+        time = MockTime()
+        monkeypatch.setattr('ops.pebble.time', time)
+        shutdown, socket_path = fake_pebble.start_server()
+        client = pebble.Client(socket_path=socket_path)
+        try:
+            client.get_system_info()
+        finally:
+            client.close()
+            shutdown()
+        assert client._can_connect()
+        time.sleep(client._alive_ttl)
+        assert not client._can_connect()
+
+    def test_can_connect_socket_not_found(self):
+        client = pebble.Client(socket_path='does_not_exist')
+        assert not client._can_connect()
+
+    def test_can_connect_websocket_error(self, tmp_path: pathlib.Path):
+        socket_path = str(tmp_path / 'pebble.socket')
+        client = pebble.Client(socket_path=socket_path)
+        pebble.Client._set_alive(socket_path, True)
+        assert client._can_connect()
+        with pytest.raises(FileNotFoundError):
+            client._connect_websocket('123', 'control')
+        assert not client._can_connect()
+
+    def test_no_pooling(self):
+        shutdown, socket_path = fake_pebble.start_server()
+        opener = urllib.request.OpenerDirector()
+        handler = pebble._UnixSocketHandler(socket_path, max_idle=0)
+        opener.add_handler(handler)
+        opener.add_handler(urllib.request.HTTPErrorProcessor())
+        opener.add_handler(urllib.request.HTTPDefaultErrorHandler())
+        client = pebble.Client(socket_path=socket_path, opener=opener)
+        try:
+            assert client.get_system_info().version == '3.14.159'
+            assert client.get_system_info().version == '3.14.159'
+            assert handler._idle == []
+        finally:
+            shutdown()
+
+
+class _CannedServer:
+    """Asyncio Unix socket server that sends canned HTTP responses in order."""
+
+    def __init__(self, socket_path: str, responses: list[bytes]):
+        self.socket_path = socket_path
+        self.responses = responses
+        self.requests: list[tuple[str, bytes]] = []
+        self.connections = 0
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_unix_server(self._handle, self.socket_path)
+        return self
+
+    async def __aexit__(self, *exc_info: typing.Any):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        while self.responses:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except asyncio.IncompleteReadError:
+                break
+            request_line, *header_lines = head.decode().split('\r\n')
+            headers = dict(line.split(': ', 1) for line in header_lines if line)
+            body = b''
+            if 'Content-Length' in headers:
+                body = await reader.readexactly(int(headers['Content-Length']))
+            elif headers.get('Transfer-Encoding') == 'chunked':
+                while size := int((await reader.readline()).strip(), 16):
+                    body += await reader.readexactly(size)
+                    await reader.readexactly(2)
+                await reader.readexactly(2)
+            self.requests.append((request_line, body))
+            response = self.responses.pop(0)
+            if not response:
+                break  # Drop the connection without responding.
+            writer.write(response)
+            await writer.drain()
+        writer.close()
+
+
+def _http_response(body: bytes, status: str = '200 OK', chunked: bool = False, **headers: str):
+    headers.setdefault('Content-Type', 'application/json')
+    if chunked:
+        headers['Transfer-Encoding'] = 'chunked'
+        body = b''.join(b'%x\r\n%s\r\n' % (len(c), c) for c in (body[:10], body[10:]) if c)
+        body += b'0\r\n\r\n'
+    else:
+        headers['Content-Length'] = str(len(body))
+    head = ''.join(f'{k.replace("_", "-")}: {v}\r\n' for k, v in headers.items())
+    return f'HTTP/1.1 {status}\r\n{head}\r\n'.encode() + body
+
+
+def _json_response(result: typing.Any, status: str = '200 OK', chunked: bool = False, **extra):
+    body = {'result': result, 'status-code': int(status.split()[0]), 'type': 'sync', **extra}
+    return _http_response(json.dumps(body).encode(), status, chunked)
+
+
+class TestAsyncClient:
+    @pytest.fixture
+    def socket_path(self, tmp_path: pathlib.Path):
+        return str(tmp_path / 'pebble.socket')
+
+    def test_real_client(self):
+        shutdown, socket_path = fake_pebble.start_server()
+
+        async def run():
+            async with pebble.AsyncClient(socket_path=socket_path) as client:
+                infos = await asyncio.gather(*(client.get_system_info() for _ in range(5)))
+                assert {info.version for info in infos} == {'3.14.159'}
+
+                change_id = await client.start_services(['foo'], timeout=0)
+                assert change_id == '1234'
+
+                with pytest.raises(pebble.APIError) as excinfo:
+                    await client.start_services(['bar'], timeout=0)
+                assert excinfo.value.code == 400
+                assert excinfo.value.status == 'Bad Request'
+                assert excinfo.value.message == 'service "bar" does not exist'
+
+        try:
+            asyncio.run(run())
+        finally:
+            shutdown()
+
+    def test_socket_not_found(self):
+        async def run():
+            client = pebble.AsyncClient(socket_path='does_not_exist')
+            with pytest.raises(pebble.ConnectionError) as excinfo:
+                await client.get_system_info()
+            assert 'Could not connect to Pebble' in str(excinfo.value)
+
+        asyncio.run(run())
+
+    def test_connection_error_shared_with_client(self, socket_path: str):
+        responses = [_json_response({'version': '1.2.3'}), b'']
+
+        async def run():
+            async with _CannedServer(socket_path, responses):
+                async with pebble.AsyncClient(socket_path=socket_path) as client:
+                    # A request that reaches Pebble shows that it's up ...
+                    await client.get_system_info()
+                    assert socket_path in pebble.Client._alive_times
+                    # ... and one that can't connect shows that it isn't.
+                    with pytest.raises(pebble.ConnectionError):
+                        await client.get_system_info()
+                    assert socket_path not in pebble.Client._alive_times
+
+        asyncio.run(run())
+
+    @pytest.mark.parametrize('chunked', [False, True])
+    def test_connection_reused(self, socket_path: str, chunked: bool):
+        responses = [
+            _json_response({'version': '1.2.3'}, chunked=chunked),
+            _json_response(
+                {'kind': 'generic-file-error', 'message': 'nope'},
+                status='404 Not Found',
+                chunked=chunked,
+            ),
+            _json_response(
+                [{'name': 'svc', 'startup': 'enabled', 'current': 'active'}], chunked=chunked
+            ),
+        ]
+
+        async def run():
+            async with _CannedServer(socket_path, responses) as server:
+                async with pebble.AsyncClient(socket_path=socket_path) as client:
+                    info = await client.get_system_info()
+                    assert info.version == '1.2.3'
+                    with pytest.raises(pebble.APIError) as excinfo:
+                        await client.get_notice('42')
+                    assert excinfo.value.code == 404
+                    assert excinfo.value.message == 'nope'
+                    [service] = await client.get_services(['svc'])
+                    assert service.name == 'svc'
+                    assert service.is_running()
+                assert server.connections == 1
+                assert [request for request, _ in server.requests] == [
+                    'GET /v1/system-info HTTP/1.1',
+                    'GET /v1/notices/42 HTTP/1.1',
+                    'GET /v1/services?names=svc HTTP/1.1',
+                ]
+
+        asyncio.run(run())
+
+    def test_get_logs(self, socket_path: str):
+        lines = [
+            {'time': '2024-01-02T03:04:05Z', 'service': 'a', 'message': 'one\n'},
+            {'time': '2024-01-02T03:04:06Z', 'service': 'a', 'message': 'two\n'},
+            # Longer than the size of each read.
+            {'time': '2024-01-02T03:04:07Z', 'service': 'a', 'message': 'x' * 100_000},
+        ]
+        body = b''.join(json.dumps(line).encode() + b'\n' for line in lines)
+        responses = [_http_response(body, chunked=True)]
+
+        async def run():
+            async with _CannedServer(socket_path, responses) as server:
+                async with pebble.AsyncClient(socket_path=socket_path) as client:
+                    logs = [entry async for entry in client.get_logs(['a'], n=2)]
+                assert [entry.message for entry in logs] == ['one\n', 'two\n', 'x' * 100_000]
+                assert logs[0].time == datetime_utc(2024, 1, 2, 3, 4, 5)
+                assert [request for request, _ in server.requests] == [
+                    'GET /v1/logs?services=a&n=2 HTTP/1.1',
+                ]
+
+        asyncio.run(run())
+
+    def test_reconnect_when_closed(self, socket_path: str):
+        responses = [_json_response({'version': '1.2.3'}) + b'unexpected']
+        responses.append(_json_response({'version': '4.5.6'}))
+
+        async def run():
+            async with _CannedServer(socket_path, responses) as server:
+                client = pebble.AsyncClient(socket_path=socket_path)
+                assert (await client.get_system_info()).version == '1.2.3'
+                await asyncio.sleep(0)  # let the stray bytes arrive
+                assert (await client.get_system_info()).version == '4.5.6'
+                await client.close()
+                assert server.connections == 2
+
+        asyncio.run(run())
+
+    def test_no_resend_unless_idempotent(self, socket_path: str):
+        responses = [
+            _json_response({'version': '1.2.3'}),
+            b'',
+            _json_response({'version': '4.5.6'}),
+            b'',
+        ]
+
+        async def run():
+            async with _CannedServer(socket_path, responses) as server:
+                async with pebble.AsyncClient(socket_path=socket_path) as client:
+                    assert (await client.get_system_info()).version == '1.2.3'
+                    # Dropped after the request was read, so it's sent again.
+                    assert (await client.get_system_info()).version == '4.5.6'
+                    # Pebble may already have replanned, so it's not sent again.
+                    with pytest.raises(pebble.ConnectionError):
+                        await client.replan_services()
+                assert server.connections == 2
+                assert [request for request, _ in server.requests] == [
+                    'GET /v1/system-info HTTP/1.1',
+                    'GET /v1/system-info HTTP/1.1',
+                    'GET /v1/system-info HTTP/1.1',
+                    'POST /v1/services HTTP/1.1',
+                ]
+
+        asyncio.run(run())
+
+    def test_wait_change(self, socket_path: str):
+        change = build_mock_change_dict()
+        responses = [
+            _json_response(None, status='202 Accepted', change='70'),
+            _json_response(change),
+        ]
+
+        async def run():
+            async with _CannedServer(socket_path, responses) as server:
+                async with pebble.AsyncClient(socket_path=socket_path) as client:
+                    change_id = await client.replan_services()
+                assert change_id == '70'
+                assert server.requests[0] == (
+                    'POST /v1/services HTTP/1.1',
+                    b'{"action": "replan", "services": []}',
+                )
+                assert server.requests[1][0].startswith('GET /v1/changes/70/wait?timeout=')
+
+        asyncio.run(run())
+
+    @pytest.mark.parametrize('chunked', [False, True])
+    def test_pull(self, socket_path: str, chunked: bool):
+        body = (
+            b'--01234567890123456789012345678901\r\n'
+            b'Content-Disposition: form-data; name="files"; filename="/etc/hosts"\r\n'
+            b'\r\n'
+            b'127.0.0.1 localhost\r\n'
+            b'--01234567890123456789012345678901\r\n'
+            b'Content-Disposition: form-data; name="response"\r\n'
+            b'\r\n'
+            b'{"result": [{"path": "/etc/hosts"}], "status-code": 200, "type": "sync"}\r\n'
+            b'--01234567890123456789012345678901--\r\n'
+        )
+        content_type = 'multipart/form-data; boundary=01234567890123456789012345678901'
+        responses = [_http_response(body, chunked=chunked, Content_Type=content_type)]
+
+        async def run():
+            async with _CannedServer(socket_path, responses):
+                async with pebble.AsyncClient(socket_path=socket_path) as client:
+                    with await client.pull('/etc/hosts') as infile:
+                        assert infile.read() == '127.0.0.1 localhost'
+
+        asyncio.run(run())
+
+    def test_push(self, socket_path: str):
+        responses = [_json_response([{'path': '/srv/foo'}])]
+
+        async def run():
+            async with _CannedServer(socket_path, responses) as server:
+                async with pebble.AsyncClient(socket_path=socket_path) as client:
+                    await client.push('/srv/foo', 'content', make_dirs=True)
+                [(request, body)] = server.requests
+                assert request == 'POST /v1/files HTTP/1.1'
+                assert b'"make-dirs": true' in body
+                assert b'\r\n\r\ncontent\r\n--' in body
+
+        asyncio.run(run())
+
+    def test_push_slow_source(self, socket_path: str):
+        responses = [_json_response([{'path': '/srv/foo'}])]
+        threads: set[threading.Thread] = set()
+
+        class SlowSource(io.BytesIO):
+            def read(self, size: int | None = -1) -> bytes:
+                threads.add(threading.current_thread())
+                threading.Event().wait(0.05)  # The "time" fixture shadows the module.
+                return super().read(4)
+
+        async def run():
+            async with _CannedServer(socket_path, responses) as server:
+                # The whole upload takes longer than the timeout, but each step doesn't.
+                async with pebble.AsyncClient(socket_path=socket_path, timeout=0.2) as client:
+                    await client.push('/srv/foo', SlowSource(b'x' * 40))
+                [(_, body)] = server.requests
+                assert b'\r\n\r\n' + b'x' * 40 + b'\r\n--' in body
+
+        asyncio.run(run())
+        # The source is read outside the event loop.
+        assert threading.main_thread() not in threads
+
+    def test_exec(self, socket_path: str):
+        calls: list[tuple[str, typing.Any]] = []
+
+        class FakeProcess:
+            stdin = stdout = stderr = None
+
+            def wait_output(self):
+                calls.append(('wait_output', threading.current_thread()))
+                return 'out', ''
+
+        class FakeClient:
+            def exec(self, command: list[str], **kwargs: typing.Any):
+                calls.append(('exec', (command, kwargs)))
+                return FakeProcess()
+
+        async def run():
+            client = pebble.AsyncClient(socket_path=socket_path)
+            client._sync_client = FakeClient()  # type: ignore
+            process = await client.exec(['echo', 'out'], environment={'A': 'B'})
+            assert await process.wait_output() == ('out', '')
+
+        asyncio.run(run())
+        assert calls[0] == ('exec', (['echo', 'out'], {'environment': {'A': 'B'}}))
+        assert calls[1][0] == 'wait_output'
+        assert calls[1][1] is not threading.main_thread()
+
 
 class TestExecError:
     def test_init(self):
@@ -3831,6 +4884,83 @@ class TestExec:
         ]
         assert stdio.sends == []
 
+    def test_iter_lines(self, client: MockClient):
+        stdio, stderr, _ = self.add_responses(client, '123', 0)
+        stdio.receives.append(b'one\ntw')
+        stdio.receives.append(b'o\nthree')
+        stdio.receives.append('{"command":"end"}')
+        stderr.receives.append('{"command":"end"}')
+
+        process = client.exec(['foo'])
+        assert list(process.iter_lines()) == ['one', 'two', 'three']
+        assert client.requests == [
+            ('POST', '/v1/exec', None, self.build_exec_data(['foo'])),
+            ('GET', '/v1/changes/123/wait', {'timeout': '4.000s'}, None),
+        ]
+
+    @pytest.mark.parametrize(
+        'chunks,lines',
+        [
+            ([], []),
+            (['\n'], ['']),
+            (['a\n\nb'], ['a', '', 'b']),
+            (['a', 'b', 'c\nd', '', 'e\n'], ['abc', 'de']),
+            (['a\r\n', 'b\r', '\n'], ['a\r', 'b\r']),
+        ],
+    )
+    def test_split_lines(self, chunks: list[str], lines: list[str]):
+        assert list(pebble._split_lines(chunks, '\n')) == lines
+        encoded = [chunk.encode() for chunk in chunks]
+        assert list(pebble._split_lines(encoded, b'\n')) == [line.encode() for line in lines]
+
+    def test_iter_chunks(self, client: MockClient):
+        stdio, stderr, _ = self.add_responses(client, '123', 0)
+        stdio.receives.append(b'foo')
+        stdio.receives.append(b'bar')
+        stdio.receives.append('{"command":"end"}')
+        stderr.receives.append('{"command":"end"}')
+
+        process = client.exec(['foo'], encoding=None)
+        chunks = process.iter_chunks(2)
+        assert next(chunks) == b'fo'
+        # Output is only received as it's consumed.
+        assert stdio.receives == [b'bar', '{"command":"end"}']
+        assert list(chunks) == [b'o', b'ba', b'r']
+
+    def test_iter_chunks_decodes_split_characters(self, client: MockClient):
+        stdio, stderr, _ = self.add_responses(client, '123', 0)
+        stdio.receives.append(b'caf\xc3')
+        stdio.receives.append(b'\xa9\n')
+        stdio.receives.append('{"command":"end"}')
+        stderr.receives.append('{"command":"end"}')
+
+        process = client.exec(['foo'])
+        assert list(process.iter_chunks()) == ['caf', '\xe9\n']
+
+    def test_iter_lines_exit_nonzero(self, client: MockClient):
+        stdio, stderr, _ = self.add_responses(client, '123', 1)
+        stdio.receives.append(b'out\n')
+        stdio.receives.append('{"command":"end"}')
+        stderr.receives.append(b'oops\n')
+        stderr.receives.append('{"command":"end"}')
+
+        process = client.exec(['foo'])
+        lines: list[str] = []
+        excinfo: pytest.ExceptionInfo[pebble.ExecError[str]]
+        with pytest.raises(pebble.ExecError) as excinfo:  # type: ignore
+            lines.extend(process.iter_lines())
+        assert lines == ['out']
+        assert excinfo.value.exit_code == 1
+        assert excinfo.value.stdout is None
+        assert excinfo.value.stderr == 'oops\n'
+
+    def test_iter_chunks_passed_stdout(self, client: MockClient):
+        self.add_responses(client, '123', 0)
+        process = client.exec(['foo'], stdout=io.StringIO())
+        with pytest.raises(TypeError):
+            next(process.iter_chunks())
+        process._waited = True
+
     def test_wait_passed_output(self, client: MockClient):
         io_ws, stderr, _ = self.add_responses(client, '123', 0)
         io_ws.receives.append(b'foo\n')
@@ -4136,41 +5266,105 @@ class TestExec:
         }
         return (stdio, stderr, control)
 
-    def test_wait_change_error_reaps_io_threads(
+    def add_socket_responses(self, client: MockClient, change_id: str):
+        """Set up an exec response whose websockets are real, over socket pairs.
+
+        Returns the server (Pebble) end of the stdio and stderr websockets.
+        """
+        self.add_responses(client, change_id, 0)
+        task_id = f'T{change_id}'
+        server_ends: list[websocket.WebSocket] = []
+        for name in ('stdio', 'stderr', 'control'):
+            client_end = websocket.WebSocket(skip_utf8_validation=True)
+            server_end = websocket.WebSocket(skip_utf8_validation=True)
+            client_end.sock, server_end.sock = socket.socketpair()
+            client_end.connected = server_end.connected = True
+            client.websockets[task_id, name] = typing.cast('MockWebsocket', client_end)
+            server_ends.append(server_end)
+        return server_ends[0], server_ends[1]
+
+    def test_socket_io_large_stdin_and_stdout(self, client: MockClient):
+        """Input and output far larger than the socket buffers must not deadlock."""
+        stdio, stderr = self.add_socket_responses(client, '123')
+
+        def cat():
+            # Like Pebble running cat: echo each chunk of input before
+            # reading the next, so input only flows if output is read.
+            while True:
+                chunk = stdio.recv()
+                if isinstance(chunk, str):
+                    break
+                stdio.send_binary(chunk)
+            stdio.send('{"command":"end"}')
+            stderr.send('{"command":"end"}')
+
+        thread = threading.Thread(target=cat)
+        thread.start()
+        data = os.urandom(4 * 1024 * 1024)
+        process = client.exec(['cat'], stdin=data, encoding=None)
+        out, err = process.wait_output()
+        thread.join()
+        assert out == data
+        assert err == b''
+
+    def test_socket_io_streams_in_threads(self, client: MockClient):
+        stdio, stderr = self.add_socket_responses(client, '123')
+
+        def upper():
+            while True:
+                chunk = stdio.recv()
+                if isinstance(chunk, str):
+                    break
+                stdio.send_binary(chunk.upper())
+            stdio.send('{"command":"end"}')
+            stderr.send('{"command":"end"}')
+
+        server = threading.Thread(target=upper)
+        server.start()
+        process = client.exec(['awk', '{ print toupper($0) }'])
+        assert process.stdin is not None and process.stdout is not None
+        lines = [f'line {i}\n' for i in range(100)]
+
+        def write_stdin():
+            assert process.stdin is not None
+            for line in lines:
+                process.stdin.write(line)
+                process.stdin.flush()
+            process.stdin.close()
+
+        writer = threading.Thread(target=write_stdin)
+        writer.start()
+        # The reading and writing threads share the I/O for the process.
+        assert list(process.stdout) == [line.upper() for line in lines]
+        writer.join()
+        process.wait()
+        server.join()
+
+    def test_wait_timeout_tears_down_websockets(
         self, client: MockClient, time: MockTime, monkeypatch: pytest.MonkeyPatch
     ):
-        """If wait_change raises, the I/O threads must be unblocked and reaped.
+        """If the exec doesn't finish in time, the websockets must be torn down.
 
-        Regression test for canonical/operator#2556. The exec change didn't
-        finish before the client-side timeout, so wait_change() raises; the
-        I/O threads were left blocked in recv() on the still-open websockets,
-        and being non-daemon they then hung interpreter shutdown.
+        Regression test for canonical/operator#2556: the websockets were
+        left open (and the I/O threads blocked reading from them).
         """
         thread_errors: list[threading.ExceptHookArgs] = []
         monkeypatch.setattr(threading, 'excepthook', thread_errors.append)
 
         stdio, stderr, control = self.add_blocking_responses(client, '123')
 
-        def timeout_response():
-            time.sleep(3)  # simulate passing of time due to wait_change call
-            raise pebble.APIError({}, 504, 'Gateway Timeout', 'timed out')
-
-        client.responses.append(timeout_response)
-
-        process = client.exec(['foo'], timeout=1)
+        process = client.exec(['foo'], timeout=0.01)
         with pytest.raises(pebble.TimeoutError):
             process.wait_output()
 
-        for thread in process._threads:
-            thread.join(timeout=5)
-        assert [t.name for t in process._threads if t.is_alive()] == []
+        assert process._io.closed
         assert thread_errors == []
         for ws in (stdio, stderr, control):
             assert ws.shutdown_calls > 0
 
     def test_wait_change_error_with_stdin(self, client: MockClient, time: MockTime):
-        """A failed wait must also stop the stdin thread and close the cancel pipe."""
-        self.add_blocking_responses(client, '123')
+        """A failed wait must also stop sending stdin and close the websockets."""
+        stdio, _, _ = self.add_blocking_responses(client, '123')
 
         def timeout_response():
             time.sleep(3)  # simulate passing of time due to wait_change call
@@ -4185,32 +5379,24 @@ class TestExec:
             with pytest.raises(pebble.TimeoutError):
                 process.wait()
 
-        for thread in process._threads:
-            thread.join(timeout=5)
-        assert [t.name for t in process._threads if t.is_alive()] == []
-        # The cancel pipe must have been closed (and not be double-closed if
-        # wait() is called again).
-        assert process._cancel_stdin is None
-        assert process._cancel_reader is None
+        assert process._io.closed
+        assert stdio.shutdown_calls > 0
 
-    def test_io_threads_are_daemon(self, client: MockClient):
+    def test_exec_starts_no_threads(self, client: MockClient, monkeypatch: pytest.MonkeyPatch):
+        def start(thread: threading.Thread):
+            raise AssertionError('exec must not start threads')
+
+        monkeypatch.setattr(threading.Thread, 'start', start)
         stdio, stderr, _ = self.add_responses(client, '123', 0)
+        stdio.receives.append(b'foo\n')
         stdio.receives.append('{"command":"end"}')
         stderr.receives.append('{"command":"end"}')
 
-        process = client.exec(['true'])
-        process.wait_output()
-
-        assert process._threads
-        assert all(thread.daemon for thread in process._threads)
+        process = client.exec(['cat'], stdin='foo\n')
+        assert process.wait_output() == ('foo\n', '')
 
-    def test_wait_twice_does_not_double_close_cancel_pipe(self, client: MockClient):
-        """A successful _wait() must clear the cancel pipe so a second call is safe.
-
-        wait() and wait_output() both call _wait(); calling them in turn (or
-        wait() twice) used to os.close() the already-closed cancel_reader fd
-        and re-run _cancel_stdin(), raising OSError on the second call.
-        """
+    def test_wait_twice(self, client: MockClient):
+        """A second _wait() (for example, wait() then wait_output()) must be safe."""
         self.add_responses(client, '123', 0)
         # A second wait_change response for the second _wait() call.
         change = build_mock_change_dict('123')
@@ -4223,9 +5409,8 @@ class TestExec:
             stdin.seek(0)
             process = client.exec(['foo'], stdin=stdin, encoding=None)
             process.wait()
-            assert process._cancel_stdin is None
-            assert process._cancel_reader is None
-            # Must not raise (e.g. OSError from closing the fd a second time).
+            assert process._io.closed
+            # Must not raise (e.g. from using the closed selector).
             process._wait()
 
     def test_connect_websocket_error_closes_connected_websockets(self):
@@ -4263,7 +5448,7 @@ class TestExec:
         assert reader.read() == b''
         assert reader.read() == b''  # Still EOF when called again.
 
-    def test_websocket_to_writer_stops_on_closed_connection(self):
+    def test_output_to_writer_stops_on_closed_connection(self):
         ws = MockWebsocket()
         chunks: list[bytes] = [b'foo']
 
@@ -4274,26 +5459,24 @@ class TestExec:
 
         ws.recv = recv
         out = io.BytesIO()
-        pebble._websocket_to_writer(
-            typing.cast('pebble._WebSocket', ws),
-            typing.cast('pebble._WebsocketWriter', out),
-            None,
-        )  # Must return cleanly rather than raise.
+        exec_io = pebble._ExecIO()
+        exec_io.add_output(typing.cast('pebble._WebSocket', ws), out, None)
+        # Must return cleanly rather than raise.
+        assert exec_io.finish(read_output=False, deadline=None)
         assert out.getvalue() == b'foo'
 
-    def test_reader_to_websocket_stops_on_closed_connection(self):
+    def test_input_from_reader_stops_on_closed_connection(self):
         ws = MockWebsocket()
 
         def send_binary(b: bytes):
             raise websocket.WebSocketConnectionClosedException('socket is already closed.')
 
         ws.send_binary = send_binary
-        reader = io.BytesIO(b'foo')
-        pebble._reader_to_websocket(
-            typing.cast('pebble._WebsocketReader', reader),
-            typing.cast('pebble._WebSocket', ws),
-            'utf-8',
-        )  # Must return cleanly rather than raise.
+        exec_io = pebble._ExecIO()
+        exec_io.add_input(typing.cast('pebble._WebSocket', ws), io.BytesIO(b'foo'), 'utf-8')
+        # Must return cleanly rather than raise.
+        assert exec_io.finish(read_output=False, deadline=None)
+        assert ws.sends == []
 
 
 class TestIdentity:
@@ -4927,6 +4927,43 @@ class TestTestingPebbleClient:
         assert foo_info.startup == pebble.ServiceStartup.ENABLED
         assert foo_info.current == pebble.ServiceStatus.ACTIVE
 
+    def test_wait_changes(self, client: _TestingPebbleClient):
+        client.add_layer(
+            'foo',
+            """\
+            summary: foo
+            services:
+              foo:
+                summary: Foo
+                startup: enabled
+                command: '/bin/echo foo'
+              bar:
+                summary: Bar
+                command: '/bin/echo bar'
+            """,
+        )
+        replan_id = client.replan_services(timeout=0)
+        start_id = client.start_services(['bar'], timeout=0)
+        changes = pebble.wait_changes([(client, replan_id), (client, start_id)])
+        assert [change.id for change in changes] == [replan_id, start_id]
+        assert [change.kind for change in changes] == ['replan', 'start']
+        assert changes[0].summary == 'Replan service foo'
+        assert all(change.ready for change in changes)
+
+    def test_get_logs(self, client: _TestingPebbleClient):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        client._logs = [
+            pebble.LogEntry(time=now, service=service, message=f'{i}\n')
+            for i, service in enumerate(['foo', 'bar'] * 20)
+        ]
+        logs = list(client.get_logs())
+        assert len(logs) == 30
+        assert logs == client._logs[-30:]
+        logs = list(client.get_logs(['bar'], n=2))
+        assert [entry.message for entry in logs] == ['37\n', '39\n']
+        assert list(client.get_logs(['foo', 'bar'], n=-1, follow=True)) == client._logs
+        assert list(client.get_logs(n=0)) == []
+
     def test_start_started_service(self, client: _TestingPebbleClient):
         # Pebble maintains idempotency even if you start a service
         # which is already started.
@@ -6473,6 +6510,27 @@ class TestHandleExec:
         assert stdout == 'hello2'
         assert stderr == ''
 
+    def test_iter_lines(
+        self,
+        harness: ops.testing.Harness[ops.CharmBase],
+        container: ops.Container,
+    ):
+        harness.handle_exec(container, ['foo'], result=b'one\ntwo\n')
+        assert list(container.exec(['foo']).iter_lines()) == ['one', 'two']
+        assert list(container.exec(['foo'], encoding=None).iter_chunks(4)) == [
+            b'one\n',
+            b'two\n',
+        ]
+
+        with pytest.raises(TypeError):
+            list(container.exec(['foo'], stdout=io.StringIO()).iter_lines())
+
+        harness.handle_exec(container, ['foo'], result=ExecResult(exit_code=1, stderr='oops'))
+        excinfo: pytest.ExceptionInfo[pebble.ExecError[str]]
+        with pytest.raises(pebble.ExecError) as excinfo:  # type: ignore
+            list(container.exec(['foo']).iter_lines())
+        assert excinfo.value.stderr == 'oops'
+
     def test_register_with_handler(
         self,
         harness: ops.testing.Harness[ops.CharmBase],
@@ -7083,6 +7141,23 @@ class PebbleNoticesMixin:
         assert notices[1].key == key3
         assert notices[0].last_repeated < notices[1].last_repeated
 
+    def test_wait_notices(self, client: PebbleClientType):
+        key1 = 'example.com/' + os.urandom(16).hex()
+        key2 = 'example.com/' + os.urandom(16).hex()
+
+        client.notify(pebble.NoticeType.CUSTOM, key1)
+        notices, cursor = client.wait_notices(keys=[key1, key2], timeout=1)
+        assert [notice.key for notice in notices] == [key1]
+
+        time.sleep(0.000_001)  # Ensure times are different.
+        client.notify(pebble.NoticeType.CUSTOM, key2)
+        notices, cursor = client.wait_notices(after=cursor, keys=[key1, key2], timeout=1)
+        assert [notice.key for notice in notices] == [key2]
+
+        notices, new_cursor = client.wait_notices(after=cursor, keys=[key1, key2], timeout=0.1)
+        assert notices == []
+        assert new_cursor == cursor
+
 
 class TestNotices(PebbleNoticesMixin):
     @pytest.fixture
@@ -91,6 +91,26 @@ def test_parse_rfc3339():
         timeconv.parse_rfc3339('2021-02-10T04:36:22.118970777-99:99')
 
 
+@pytest.mark.parametrize(
+    'input,expected',
+    [
+        ('1970-01-01T00:00:00Z', 0),
+        ('2021-02-10T04:36:22.118970777Z', 1612931782_118970777),
+        ('2021-02-10T04:36:22.1Z', 1612931782_100000000),
+        ('2021-02-10T17:36:22.118970777+13:00', 1612931782_118970777),
+        ('1969-12-31T23:59:59.999999999Z', -1),
+    ],
+)
+def test_parse_rfc3339_ns(input: str, expected: int):
+    assert timeconv.parse_rfc3339_ns(input) == expected
+
+
+def test_format_rfc3339_ns():
+    assert timeconv.format_rfc3339_ns(0) == '1970-01-01T00:00:00.000000000Z'
+    assert timeconv.format_rfc3339_ns(1612931782_118970777) == '2021-02-10T04:36:22.118970777Z'
+    assert timeconv.format_rfc3339_ns(-1) == '1969-12-31T23:59:59.999999999Z'
+
+
 @pytest.mark.parametrize(
     'input,expected',
     [
@@ -14,7 +14,7 @@ import datetime
 import io
 import shutil
 import uuid
-from collections.abc import Mapping
+from collections.abc import Generator, Mapping
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
@@ -45,7 +45,7 @@ from ops.model import (
     _ModelBackend,
     _SettableStatusName,
 )
-from ops.pebble import Client, ExecError
+from ops.pebble import Client, ExecError, _split_lines
 
 from .errors import ActionMissingFromContextError
 from .logger import logger as scenario_logger
@@ -122,6 +122,27 @@ class _MockExecProcess:
             )
         return stdout, stderr
 
+    def iter_chunks(self, size: int = 64 * 1024) -> Generator[Any, None, None]:
+        """Yield the (mock) process's stdout in chunks, then wait for it to finish."""
+        self._close_stdin()
+        self._waited = True
+        if self.stdout is not None:
+            while chunk := self.stdout.read(size):
+                yield chunk
+        if self._return_code != 0:
+            stderr = self.stderr.read() if self.stderr is not None else None
+            raise ExecError(
+                list(self._args.command),
+                self._return_code,
+                None,
+                stderr,  # type: ignore
+            )
+
+    def iter_lines(self) -> Generator[Any, None, None]:
+        """Yield each line of the (mock) process's stdout, then wait for it to finish."""
+        newline = '\n' if isinstance(self.stdout, io.TextIOBase) else b'\n'
+        yield from _split_lines(self.iter_chunks(), newline)
+
     def send_signal(self, sig: int | str) -> NoReturn:
         """Send the given signal to the (mock) process."""
         raise NotImplementedError()
@@ -843,14 +864,16 @@ class _MockPebbleClient(_TestingPebbleClient):
         # load any existing notices and check information from the state
         self._notices: dict[tuple[str, str], pebble.Notice] = {}
         self._check_infos: dict[str, pebble.CheckInfo] = {}
+        self._logs: list[pebble.LogEntry] = []
         try:
             container = state.get_container(self._container_name)
         except KeyError:
             # The container is in the metadata but not in the state - perhaps
             # this is an install event, at which point the container doesn't
-            # exist yet. This means there will be no notices or check infos.
+            # exist yet. This means there will be no notices, check infos, or logs.
             pass
         else:
+            self._logs = list(container.logs)
             for notice in container.notices:
                 if hasattr(notice.type, 'value'):
                     notice_type = cast('pebble.NoticeType', notice.type).value
@@ -904,9 +927,10 @@ class _MockPebbleClient(_TestingPebbleClient):
             infos.add(check_info)
         object.__setattr__(self._container, 'check_infos', frozenset(infos))
 
-    def replan_services(self, timeout: float = 30.0, delay: float = 0.1):
-        super().replan_services(timeout=timeout, delay=delay)
+    def replan_services(self, timeout: float = 30.0, delay: float = 0.1) -> pebble.ChangeID:
+        change_id = super().replan_services(timeout=timeout, delay=delay)
         self._update_state_check_infos()
+        return change_id
 
     def add_layer(
         self,
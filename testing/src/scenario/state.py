@@ -1269,6 +1269,18 @@ class Container:
     check_infos: frozenset[CheckInfo]
     """All Pebble health checks that have been added to the container."""
 
+    logs: Sequence[pebble.LogEntry]
+    """The output that the container's services have written, oldest first.
+
+    The charm can read these with :meth:`ops.pebble.Client.get_logs`. For example::
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        container = Container(
+            name='foo',
+            logs=[pebble.LogEntry(time=now, service='srv', message='started\\n')],
+        )
+    """
+
     def __init__(
         self,
         name: str,
@@ -1285,6 +1297,7 @@ class Container:
         execs: Iterable[Exec] = (),
         notices: Iterable[Notice] = (),
         check_infos: Iterable[CheckInfo] = (),
+        logs: Iterable[pebble.LogEntry] = (),
     ):
         # Juju passes the charm container name verbatim through to Kubernetes,
         # so the Kubernetes naming rules (RFC 1123 DNS label) apply.
@@ -1308,6 +1321,7 @@ class Container:
         # Stored as list for backwards compatibility.
         object.__setattr__(self, 'notices', list(notices))
         object.__setattr__(self, 'check_infos', frozenset(check_infos))
+        object.__setattr__(self, 'logs', tuple(logs))
 
     def __hash__(self) -> int:
         return hash(self.name)
@@ -390,6 +390,24 @@ def test_exec_wait_output(command: list[str]):
         assert ctx.exec_history[container.name][0].command == command
 
 
+def test_exec_iter_lines():
+    state = State(
+        containers={
+            Container(
+                name='foo',
+                can_connect=True,
+                execs={Exec(['foo'], stdout='hello\npebble\n')},
+            )
+        }
+    )
+
+    ctx = Context(Charm, meta={'name': 'foo', 'containers': {'foo': {}}})
+    with ctx(ctx.on.start(), state) as mgr:
+        container = mgr.charm.unit.get_container('foo')
+        proc = container.exec(['foo'])
+        assert list(proc.iter_lines()) == ['hello', 'pebble']
+
+
 def test_exec_wait_output_error():
     state = State(
         containers={
@@ -409,6 +427,21 @@ def test_exec_wait_output_error():
             proc.wait_output()
 
 
+def test_get_logs():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    logs = [
+        pebble.LogEntry(time=now, service='foo', message='started\n'),
+        pebble.LogEntry(time=now, service='bar', message='ready\n'),
+    ]
+    state = State(containers={Container(name='foo', can_connect=True, logs=logs)})
+
+    ctx = Context(Charm, meta={'name': 'foo', 'containers': {'foo': {}}})
+    with ctx(ctx.on.start(), state) as mgr:
+        client = mgr.charm.unit.get_container('foo').pebble
+        assert list(client.get_logs()) == logs
+        assert list(client.get_logs(['bar'])) == logs[1:]
+
+
 def test_pebble_custom_notice():
     notices = [
         Notice(key='example.com/foo'),
@@ -24,7 +24,7 @@ from opentelemetry.trace import get_tracer_provider, set_tracer_provider
 from ops._private import yaml
 
 if TYPE_CHECKING:
-    from ops import JujuContext
+    from ops import CharmMeta, JujuContext
 
 from ._buffer import Destination
 from ._export import BufferingSpanExporter
@@ -36,19 +36,28 @@ _exporter: BufferingSpanExporter | None = None
 """A reference to the exporter that we passed to OpenTelemetry SDK at setup."""
 
 
-def setup(juju_context: JujuContext, charm_class_name: str) -> None:
+def setup(
+    juju_context: JujuContext, charm_class_name: str, charm_meta: CharmMeta | None = None
+) -> None:
     """Set up the tracing subsystem and configure OpenTelemetry.
 
     Args:
         juju_context: the context for this dispatch, for annotation
         charm_class_name: the name of the charm class, for annotation
+        charm_meta: the charm's metadata, for annotation; if not provided,
+            the charm name is read from ``metadata.yaml``
     """
     app_name, unit_number = juju_context.unit_name.split('/', 1)
-    try:
-        meta = yaml.safe_load((juju_context.charm_dir / 'metadata.yaml').read_text())
-        charmhub_charm_name = meta['name']
-    except FileNotFoundError:
-        charmhub_charm_name = '[unknown]'
+    if charm_meta is None:
+        try:
+            meta = yaml.safe_load((juju_context.charm_dir / 'metadata.yaml').read_text())
+            charmhub_charm_name = meta['name']
+        except FileNotFoundError:
+            charmhub_charm_name = '[unknown]'
+    elif charm_meta.name:
+        charmhub_charm_name = charm_meta.name
+    else:
+        raise ValueError("charm metadata doesn't specify the charm's 'name'")
 
     resource = Resource.create(
         attributes={
@@ -18,6 +18,7 @@ import pathlib
 import ssl
 from unittest.mock import ANY, patch
 
+import ops
 import pytest
 from opentelemetry.trace import get_tracer_provider
 
@@ -79,6 +80,11 @@ def test_juju_topology_labels(setup_tracing: None):
     }
 
 
+def test_setup_charm_meta_without_name(juju_context: ops.JujuContext):
+    with pytest.raises(ValueError, match="doesn't specify the charm's 'name'"):
+        _backend.setup(juju_context, 'DummyCharm', ops.CharmMeta({}))
+
+
 def test_exporter_ssl_context(tmp_path: pathlib.Path):
     exporter = BufferingSpanExporter(tmp_path / 'buffer')
     context = exporter.ssl_context(None)